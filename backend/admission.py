@@ -0,0 +1,166 @@
+"""Admission control for code execution, one gate per language.
+
+A gate admits whole runs, and each run executes up to ``case_workers`` of
+its cases at once, so the two together bound the case slots of a language:
+by default one case per core.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+CPU_COUNT = os.cpu_count() or 1
+EXECUTION_LIMITS = {
+    "python": int(os.environ.get("CODE_GYM_MAX_RUNNING_PYTHON", str(CPU_COUNT))),
+    "javascript": int(
+        os.environ.get("CODE_GYM_MAX_RUNNING_JAVASCRIPT", str(CPU_COUNT)),
+    ),
+}
+# Cases of one submission the tester may run concurrently; unset fits every
+# admitted run's cases into the cores
+TEST_WORKERS = int(os.environ.get("CODE_GYM_TEST_WORKERS", "0"))
+ADMISSION_QUEUE_SIZE = int(os.environ.get("CODE_GYM_ADMISSION_QUEUE_SIZE", "32"))
+ADMISSION_MAX_WAIT_SECONDS = float(
+    os.environ.get("CODE_GYM_ADMISSION_MAX_WAIT_SECONDS", "30"),
+)
+# Weight of the latest run in the moving averages of wait and run times
+SMOOTHING = 0.2
+
+
+def _smooth(mean: float, sample: float, *, first: bool) -> float:
+    """Fold ``sample`` into an exponential moving average."""
+    return sample if first else mean + SMOOTHING * (sample - mean)
+
+
+class AdmissionRejectedError(RuntimeError):
+    """Raised when a run cannot be admitted; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        """Keep the suggested delay next to the message."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """Let at most ``limit`` runs execute at once, queueing the rest in order.
+
+    At most ``max_waiting`` callers may wait, each for at most
+    ``max_wait_seconds``; beyond that ``admit`` raises ``AdmissionRejectedError``
+    so the caller can shed load instead of letting every run slow down.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_waiting: int = ADMISSION_QUEUE_SIZE,
+        max_wait_seconds: float = ADMISSION_MAX_WAIT_SECONDS,
+    ) -> None:
+        """Create an idle gate."""
+        self.name = name
+        self.limit = max(limit, 1)
+        self.max_waiting = max_waiting
+        self.max_wait_seconds = max_wait_seconds
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.mean_wait_seconds = 0.0
+        self.mean_run_seconds = 0.0
+        self._waiting: deque[object] = deque()
+        # Reentrant, so retry_after() can be called with the lock held
+        self._condition = threading.Condition(threading.RLock())
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds when a new run could be admitted."""
+        with self._condition:
+            backlog = len(self._waiting) + 1
+            return max(math.ceil(self.mean_run_seconds * backlog / self.limit), 1)
+
+    def _reject(self, message: str) -> AdmissionRejectedError:
+        self.rejected += 1
+        return AdmissionRejectedError(message, self.retry_after())
+
+    @contextmanager
+    def admit(self, *, bounded: bool = True) -> Iterator[None]:
+        """Hold one execution slot for the duration of the ``with`` block.
+
+        Callers are admitted first come, first served. ``bounded=False``
+        waits for as long as it takes regardless of the queue size, for
+        callers whose backlog is already bounded elsewhere.
+        """
+        ticket = object()
+        queued_at = time.monotonic()
+        with self._condition:
+            if bounded and len(self._waiting) >= self.max_waiting:
+                error_msg = f"Too many {self.name} runs waiting"
+                raise self._reject(error_msg)
+            self._waiting.append(ticket)
+            deadline = queued_at + self.max_wait_seconds if bounded else None
+            while self._waiting[0] is not ticket or self.running >= self.limit:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    self._waiting.remove(ticket)
+                    self._condition.notify_all()
+                    error_msg = f"Timed out waiting for a {self.name} slot"
+                    raise self._reject(error_msg)
+                self._condition.wait(timeout)
+            self._waiting.popleft()
+            self.running += 1
+            self.admitted += 1
+            started_at = time.monotonic()
+            self.mean_wait_seconds = _smooth(
+                self.mean_wait_seconds,
+                started_at - queued_at,
+                first=self.admitted == 1,
+            )
+            # The next caller in line may also fit
+            self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.running -= 1
+                self.completed += 1
+                self.mean_run_seconds = _smooth(
+                    self.mean_run_seconds,
+                    time.monotonic() - started_at,
+                    first=self.completed == 1,
+                )
+                self._condition.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        """Return the gate's limits, queue depth, counters and average times."""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "running": self.running,
+                "waiting": len(self._waiting),
+                "max_waiting": self.max_waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "mean_wait_ms": round(self.mean_wait_seconds * 1000, 1),
+                "mean_run_ms": round(self.mean_run_seconds * 1000, 1),
+            }
+
+
+def case_workers(language: str) -> int:
+    """Return how many cases one run of ``language`` may execute at once.
+
+    ``CODE_GYM_TEST_WORKERS`` wins when set; otherwise the cores are split
+    between the runs the language's gate admits, at least one case each.
+    """
+    if TEST_WORKERS > 0:
+        return TEST_WORKERS
+    return max(CPU_COUNT // max(EXECUTION_LIMITS[language], 1), 1)
+
+
+gates = {
+    language: AdmissionGate(language, limit)
+    for language, limit in EXECUTION_LIMITS.items()
+}
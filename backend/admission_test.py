@@ -0,0 +1,92 @@
+"""Tests for the per-language admission gates."""
+
+import threading
+import time
+
+import admission
+import pytest
+from admission import AdmissionGate, AdmissionRejectedError, case_workers
+
+
+def test_gate_limits_running_runs() -> None:
+    """No more than ``limit`` runs hold a slot at once."""
+    gate = AdmissionGate("python", 2, max_waiting=8, max_wait_seconds=5)
+    peak = 0
+    lock = threading.Lock()
+
+    def run() -> None:
+        nonlocal peak
+        with gate.admit():
+            with lock:
+                peak = max(peak, gate.running)
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+    assert gate.stats()["admitted"] == 6
+    assert gate.stats()["running"] == 0
+
+
+def wait_in_line(gate: AdmissionGate) -> threading.Thread:
+    """Start a thread that waits for a slot of ``gate`` without a bound."""
+
+    def run() -> None:
+        with gate.admit(bounded=False):
+            pass
+
+    waiting = gate.stats()["waiting"]
+    thread = threading.Thread(target=run)
+    thread.start()
+    while gate.stats()["waiting"] == waiting:
+        time.sleep(0.001)
+    return thread
+
+
+def test_full_queue_rejects_with_retry_after() -> None:
+    """A run that finds the queue full is rejected at once."""
+    gate = AdmissionGate("python", 1, max_waiting=1, max_wait_seconds=5)
+    with gate.admit():
+        waiter = wait_in_line(gate)
+        with pytest.raises(AdmissionRejectedError) as rejected, gate.admit():
+            pass
+    waiter.join()
+    assert rejected.value.retry_after >= 1
+    assert gate.stats()["rejected"] == 1
+
+
+def test_wait_times_out() -> None:
+    """A bounded run gives up after ``max_wait_seconds``."""
+    gate = AdmissionGate("python", 1, max_waiting=4, max_wait_seconds=0.05)
+    with gate.admit(), pytest.raises(AdmissionRejectedError), gate.admit():
+        pass
+    assert gate.stats()["waiting"] == 0
+
+
+def test_unbounded_run_ignores_queue_size() -> None:
+    """``bounded=False`` waits even when the queue is full."""
+    gate = AdmissionGate("python", 1, max_waiting=1, max_wait_seconds=0.01)
+    with gate.admit():
+        first = wait_in_line(gate)
+        second = wait_in_line(gate)
+    first.join()
+    second.join()
+    assert gate.stats()["admitted"] == 3
+    assert gate.stats()["rejected"] == 0
+
+
+def test_case_workers_split_the_cores(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Admitted runs times case workers stay within the cores by default."""
+    monkeypatch.setattr(admission, "CPU_COUNT", 8)
+    monkeypatch.setattr(admission, "TEST_WORKERS", 0)
+    limits = {"python": 8, "javascript": 2}
+    monkeypatch.setattr(admission, "EXECUTION_LIMITS", limits)
+    assert case_workers("python") == 1
+    assert case_workers("javascript") == 4
+    monkeypatch.setattr(admission, "EXECUTION_LIMITS", {"python": 16})
+    assert case_workers("python") == 1
+    monkeypatch.setattr(admission, "TEST_WORKERS", 3)
+    assert case_workers("python") == 3
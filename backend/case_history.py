@@ -0,0 +1,50 @@
+"""Per-case failure history used to schedule fail-fast runs."""
+
+import threading
+from typing import Any
+
+
+class CaseHistory:
+    """Counts how often each test case of a problem has failed.
+
+    Fail-fast runs stop at the first failing case, so running the cases that
+    fail most often first, then the cheapest ones, rejects wrong submissions
+    with the least work.
+    """
+
+    def __init__(self) -> None:
+        """Start with no recorded runs."""
+        # (problem_id, case_id) -> [runs, failures]
+        self._counts: dict[tuple[str, str], list[int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, problem_id: str, outcomes: dict[str, bool]) -> None:
+        """Record one submission's outcomes, keyed by case ID (True = passed)."""
+        with self._lock:
+            for case_id, passed in outcomes.items():
+                counts = self._counts.setdefault((problem_id, case_id), [0, 0])
+                counts[0] += 1
+                if not passed:
+                    counts[1] += 1
+
+    def failure_rate(self, problem_id: str, case_id: str) -> float:
+        """Return the share of recorded runs in which the case failed."""
+        with self._lock:
+            runs, failures = self._counts.get((problem_id, case_id), (0, 0))
+        return failures / runs if runs else 0.0
+
+    def run_order(self, problem_id: str, cases: list[dict[str, Any]]) -> list[int]:
+        """Return case indices, most often failing first, then cheapest first.
+
+        Cost is estimated from the size of the input and expected output.
+        """
+
+        def sort_key(index: int) -> tuple[float, int, int]:
+            case = cases[index]
+            cost = len(case.get("input", "")) + len(case.get("expected_output", ""))
+            return (-self.failure_rate(problem_id, case["id"]), cost, index)
+
+        return sorted(range(len(cases)), key=sort_key)
+
+
+case_history = CaseHistory()
@@ -0,0 +1,375 @@
+"""Course catalog parsed once from ``config.yaml`` and indexed by ID.
+
+The API and the submission engine read courses, topics and questions from
+here instead of parsing the config themselves. The catalog reloads when the
+file's modification time changes; a reload builds complete new indexes and
+swaps them in at once, so readers see either the old or the new catalog,
+never a mix.
+
+Parsing YAML is slow, so the parsed indexes are also compiled into a
+snapshot file next to the config, which later processes load with
+``marshal`` instead of parsing YAML. A snapshot that no longer matches its source is
+ignored and rewritten. To validate the config and compile the snapshot
+ahead of deployment::
+
+    python catalog.py [--check]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+CATALOG_PATH = Path(
+    os.environ.get(
+        "CODE_GYM_CATALOG_PATH",
+        str(Path(__file__).parent / "config.yaml"),
+    ),
+)
+CATALOG_SNAPSHOT_PATH = Path(
+    os.environ.get(
+        "CODE_GYM_CATALOG_SNAPSHOT_PATH",
+        str(CATALOG_PATH.with_suffix(".snapshot")),
+    ),
+)
+# How often a read may check the file for changes; 0 checks on every read
+CATALOG_CHECK_SECONDS = float(os.environ.get("CODE_GYM_CATALOG_CHECK_SECONDS", "1"))
+# marshal's format may change between Python versions, so the version is
+# part of the snapshot's magic
+SNAPSHOT_MAGIC = b"CGCAT1" + bytes(sys.version_info[:2])
+
+
+class CatalogIndex:
+    """One immutable parse of the config, with lookups by ID."""
+
+    def __init__(
+        self,
+        courses: dict[str, dict[str, Any]],
+        topics: dict[tuple[str, str], dict[str, Any]],
+        questions: dict[str, dict[str, Any]],
+        *,  # Force keyword arguments after this point
+        source_hash: str,
+        stat: os.stat_result,
+    ) -> None:
+        """Wrap indexes built from the file with ``stat`` and ``source_hash``."""
+        self.courses = courses
+        self.topics = topics
+        self.questions = questions
+        self.source_hash = source_hash
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+
+    @classmethod
+    def from_config(
+        cls,
+        config: dict[str, Any],
+        *,  # Force keyword arguments after this point
+        source_hash: str,
+        stat: os.stat_result,
+    ) -> "CatalogIndex":
+        """Index the courses, topics and questions of a parsed config."""
+        courses: dict[str, dict[str, Any]] = {}
+        topics: dict[tuple[str, str], dict[str, Any]] = {}
+        questions: dict[str, dict[str, Any]] = {}
+        for course in config.get("courses", []):
+            course_id = course["id"]
+            courses[course_id] = course
+            for topic in course.get("topics", []):
+                topics[course_id, topic["topic_id"]] = topic
+                for question in topic.get("questions", []):
+                    questions[question["id"]] = question
+        return cls(courses, topics, questions, source_hash=source_hash, stat=stat)
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """Whether the index was built from a file with this stat."""
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+def _question_errors(question: object, where: str) -> list[str]:
+    """Check one question of the config; ``where`` names it if it has no ID."""
+    if not isinstance(question, dict) or "id" not in question:
+        return [f"The {where} has no id"]
+    test_cases = question.get("test_cases")
+    if not isinstance(test_cases, dict):
+        return [f"Question {question['id']} has no test_cases"]
+    return [
+        f"A case in {kind} of question {question['id']} has no expected_output"
+        for kind in ("visible_cases", "hidden_cases")
+        for case in test_cases.get(kind) or []
+        if not isinstance(case, dict) or "expected_output" not in case
+    ]
+
+
+def validate_config(config: object) -> tuple[list[str], list[str]]:
+    """Check a parsed config for problems the catalog cannot serve.
+
+    Returns errors, which make the config unusable, and warnings. A
+    duplicate ID is only a warning: the later definition wins, as it
+    always has.
+    """
+    errors: list[str] = []
+    if not isinstance(config, dict):
+        return ["The config is not a mapping"], []
+    if not isinstance(config.get("courses"), list):
+        return ["The config has no list of courses"], []
+
+    question_ids: Counter[str] = Counter()
+    course_ids: Counter[str] = Counter()
+    for i, course in enumerate(config["courses"]):
+        if not isinstance(course, dict) or "id" not in course:
+            errors.append(f"Course {i} has no id")
+            continue
+        course_ids[course["id"]] += 1
+        topic_ids: Counter[str] = Counter()
+        for j, topic in enumerate(course.get("topics", [])):
+            if not isinstance(topic, dict) or "topic_id" not in topic:
+                errors.append(f"Topic {j} of course {course['id']} has no topic_id")
+                continue
+            topic_ids[topic["topic_id"]] += 1
+            for k, question in enumerate(topic.get("questions", [])):
+                where = f"question {k} of topic {topic['topic_id']}"
+                errors.extend(_question_errors(question, where))
+                if isinstance(question, dict) and "id" in question:
+                    question_ids[question["id"]] += 1
+        errors.extend(
+            f"Topic ID {topic_id} appears {count} times in course {course['id']}"
+            for topic_id, count in topic_ids.items()
+            if count > 1
+        )
+
+    warnings = [
+        f"{kind} ID {item_id} appears {count} times; the last one is served"
+        for kind, ids in (("Course", course_ids), ("Question", question_ids))
+        for item_id, count in ids.items()
+        if count > 1
+    ]
+    return errors, warnings
+
+
+def read_snapshot(path: Path) -> dict[str, Any] | None:
+    """Return the contents of a snapshot, or None if it cannot be used."""
+    try:
+        data = path.read_bytes()
+        if not data.startswith(SNAPSHOT_MAGIC):
+            return None
+        with memoryview(data)[len(SNAPSHOT_MAGIC) :] as payload:
+            # Security note: marshal trusts its input; the snapshot is only
+            # written by this module, next to the config it is compiled from
+            return marshal.loads(payload)
+    except (OSError, ValueError, EOFError, TypeError):
+        # Missing, empty, truncated or written by another format
+        return None
+
+
+def write_snapshot(path: Path, index: CatalogIndex) -> None:
+    """Write ``index`` to a snapshot file, replacing it atomically."""
+    payload = marshal.dumps({
+        "source_hash": index.source_hash,
+        "mtime_ns": index.mtime_ns,
+        "size": index.size,
+        "courses": index.courses,
+        "topics": index.topics,
+        "questions": index.questions,
+    })
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(SNAPSHOT_MAGIC + payload)
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def parse_config(path: Path) -> tuple[Any, str, os.stat_result]:
+    """Parse the config at ``path``; also return its hash and stat."""
+    stat = path.stat()
+    source = path.read_bytes()
+    return yaml.safe_load(source) or {}, hashlib.sha256(source).hexdigest(), stat
+
+
+def compile_index(path: Path) -> CatalogIndex:
+    """Parse the config at ``path`` into an index."""
+    config, source_hash, stat = parse_config(path)
+    return CatalogIndex.from_config(config, source_hash=source_hash, stat=stat)
+
+
+class Catalog:
+    """Indexed course catalog that follows changes to its config file.
+
+    Lookups return the parsed config's own dicts, which callers must treat
+    as read-only. A config that fails to load leaves the previous catalog
+    in place and is reported by ``stats``.
+    """
+
+    def __init__(
+        self,
+        path: Path = CATALOG_PATH,
+        snapshot_path: Path | None = CATALOG_SNAPSHOT_PATH,
+        check_seconds: float = CATALOG_CHECK_SECONDS,
+    ) -> None:
+        """Load the catalog; a missing or invalid config fails here.
+
+        A ``snapshot_path`` of None always parses the config.
+        """
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.check_seconds = check_seconds
+        self.reloads = 0
+        self.from_snapshot = False
+        self.last_error: str | None = None
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._index = self._load()
+
+    def _load(self) -> CatalogIndex:
+        """Load the index from the snapshot if it is current, else parse it.
+
+        A snapshot whose stat differs from the config's is still used when
+        its source hash matches, e.g. after a checkout touched the file.
+        """
+        stat = self.path.stat()
+        snapshot = None
+        if self.snapshot_path is not None:
+            snapshot = read_snapshot(self.snapshot_path)
+        if snapshot is not None:
+            stamp = (snapshot["mtime_ns"], snapshot["size"])
+            source_matches = stamp == (stat.st_mtime_ns, stat.st_size) or (
+                hashlib.sha256(self.path.read_bytes()).hexdigest()
+                == snapshot["source_hash"]
+            )
+            if source_matches:
+                self.from_snapshot = True
+                return CatalogIndex(
+                    snapshot["courses"],
+                    snapshot["topics"],
+                    snapshot["questions"],
+                    source_hash=snapshot["source_hash"],
+                    stat=stat,
+                )
+
+        index = compile_index(self.path)
+        self.from_snapshot = False
+        if self.snapshot_path is not None:
+            # The catalog works without a snapshot, e.g. on a read-only disk
+            # or for values marshal cannot store
+            with contextlib.suppress(OSError, ValueError):
+                write_snapshot(self.snapshot_path, index)
+        return index
+
+    def _current(self) -> CatalogIndex:
+        """Return the index, reloading it first if the file has changed."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_seconds:
+            return self._index
+        with self._lock:
+            if now - self._checked_at < self.check_seconds:
+                return self._index
+            self._checked_at = now
+            try:
+                if not self._index.matches(self.path.stat()):
+                    self._index = self._load()
+                    self.reloads += 1
+                    self.last_error = None
+            except (OSError, yaml.YAMLError, KeyError, TypeError) as e:
+                # Keep serving the last good catalog until the file is fixed
+                self.last_error = f"{type(e).__name__}: {e!s}"
+            return self._index
+
+    def version(self) -> str:
+        """Return the hash of the config the catalog was built from."""
+        return self._current().source_hash
+
+    def question(self, question_id: str) -> dict[str, Any] | None:
+        """Return the question with ``question_id``, if any."""
+        return self._current().questions.get(question_id)
+
+    def questions(self) -> dict[str, dict[str, Any]]:
+        """Return every question by ID."""
+        return self._current().questions
+
+    def course(self, course_id: str) -> dict[str, Any] | None:
+        """Return the course with ``course_id``, if any."""
+        return self._current().courses.get(course_id)
+
+    def courses(self) -> list[dict[str, Any]]:
+        """Return every course in config order."""
+        return list(self._current().courses.values())
+
+    def topic(self, course_id: str, topic_id: str) -> dict[str, Any] | None:
+        """Return topic ``topic_id`` of course ``course_id``, if any."""
+        return self._current().topics.get((course_id, topic_id))
+
+    def stats(self) -> dict[str, Any]:
+        """Return the catalog's size, reload count and last load error."""
+        index = self._current()
+        return {
+            "path": str(self.path),
+            "courses": len(index.courses),
+            "topics": len(index.topics),
+            "questions": len(index.questions),
+            "source_hash": index.source_hash,
+            "from_snapshot": self.from_snapshot,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+_catalog: Catalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def __getattr__(name: str) -> Catalog:
+    """Load the shared ``catalog`` on first use.
+
+    Loading lazily keeps ``python catalog.py`` from failing on the config
+    it is meant to check.
+    """
+    global _catalog  # noqa: PLW0603
+    if name != "catalog":
+        error_msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(error_msg)
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = Catalog()
+    return _catalog
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", type=Path, default=CATALOG_PATH)
+    parser.add_argument("--snapshot", type=Path, default=CATALOG_SNAPSHOT_PATH)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only validate the config, without writing the snapshot",
+    )
+    args = parser.parse_args()
+
+    config, source_hash, stat = parse_config(args.config)
+    errors, warnings = validate_config(config)
+    for warning in warnings:
+        sys.stderr.write(f"warning: {warning}\n")
+    for error in errors:
+        sys.stderr.write(f"error: {error}\n")
+    if errors:
+        sys.exit(1)
+    index = CatalogIndex.from_config(config, source_hash=source_hash, stat=stat)
+    if not args.check:
+        write_snapshot(args.snapshot, index)
+    sys.stdout.write(
+        f"{len(index.courses)} courses, {len(index.topics)} topics and"
+        f" {len(index.questions)} questions in {args.config}"
+        + ("" if args.check else f", compiled to {args.snapshot}")
+        + "\n",
+    )
@@ -0,0 +1,247 @@
+"""Pre-serialized catalog responses with strong ETags and gzip.
+
+Catalog endpoints render each response once per catalog version: the JSON
+bytes, their gzip encoding and an ETag are cached until the catalog
+reloads, so repeated page loads cost a dictionary lookup and a conditional
+request costs nothing more than a 304.
+
+Responses show the public view of the catalog: reference solutions and
+hidden test cases never leave the server. List endpoints can project each
+item to a few ``fields`` and return one page of ``offset`` and ``limit``,
+with the unpaged count in ``X-Total-Count``. The editor loads everything it
+shows in one ``editor_view``.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from catalog import catalog
+from fastapi import Response
+
+CATALOG_RESPONSE_CACHE_SIZE = int(
+    os.environ.get("CODE_GYM_CATALOG_RESPONSE_CACHE_SIZE", "256"),
+)
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+def public_question(question: dict[str, Any]) -> dict[str, Any]:
+    """Return a question without its solution and hidden test cases."""
+    public = {key: value for key, value in question.items() if key != "solution"}
+    test_cases = question.get("test_cases")
+    if isinstance(test_cases, dict):
+        public["test_cases"] = {
+            key: value for key, value in test_cases.items() if key != "hidden_cases"
+        }
+    return public
+
+
+def public_topic(topic: dict[str, Any]) -> dict[str, Any]:
+    """Return a topic with the public view of each question."""
+    return {
+        **topic,
+        "questions": [public_question(q) for q in topic.get("questions", [])],
+    }
+
+
+def public_course(course: dict[str, Any]) -> dict[str, Any]:
+    """Return a course with the public view of each topic."""
+    return {
+        **course,
+        "topics": [public_topic(t) for t in course.get("topics", [])],
+    }
+
+
+def editor_view(
+    course: dict[str, Any],
+    topic: dict[str, Any],
+    position: int,
+) -> dict[str, Any]:
+    """Return what the editor shows for the question at ``position`` of ``topic``.
+
+    That is the question's statement, starter code and visible cases, the
+    titles of its topic and course and the IDs of the questions before
+    and after it in the topic, for navigation.
+    """
+    questions = topic.get("questions", [])
+    question = questions[position]
+    test_cases = question.get("test_cases") or {}
+    return {
+        "course": {
+            "id": course["id"],
+            "title": course.get("title", ""),
+            "language": course.get("language"),
+        },
+        "topic": {
+            "topic_id": topic["topic_id"],
+            "topic_title": topic.get("topic_title", ""),
+        },
+        "question": {
+            **project(
+                question,
+                (
+                    "complexity",
+                    "description",
+                    "id",
+                    "input",
+                    "input_constraints",
+                    "starter_code",
+                    "title",
+                ),
+            ),
+            "visible_cases": test_cases.get("visible_cases") or [],
+        },
+        "previous_question_id": questions[position - 1]["id"] if position > 0 else None,
+        "next_question_id": (
+            questions[position + 1]["id"] if position + 1 < len(questions) else None
+        ),
+    }
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """Turn a comma-separated ``fields`` parameter into a sorted key."""
+    if not fields:
+        return None
+    return tuple(sorted({name.strip() for name in fields.split(",") if name.strip()}))
+
+
+def project(item: dict[str, Any], fields: tuple[str, ...] | None) -> dict[str, Any]:
+    """Keep only ``fields`` of ``item``; unknown fields are ignored."""
+    if fields is None:
+        return item
+    return {name: item[name] for name in fields if name in item}
+
+
+class CachedBody:
+    """One rendered response body, its gzip encoding and its ETag."""
+
+    def __init__(self, payload: object, total: int | None = None) -> None:
+        """Serialize ``payload``; ``total`` is the unpaged count of a list."""
+        self.body = json.dumps(
+            payload,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+        self.gzipped = (
+            gzip.compress(self.body, mtime=0)
+            if len(self.body) >= GZIP_MIN_BYTES
+            else None
+        )
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.total = total
+
+    def etag_for(self, *, gzipped: bool) -> str:
+        """Return the strong ETag of the plain or the gzip representation."""
+        return f'{self.etag[:-1]}-gzip"' if gzipped else self.etag
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Whether ``If-None-Match`` names either representation.
+
+        ``If-None-Match`` uses the weak comparison, so ``W/`` is ignored.
+        """
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return bool(
+            "*" in tags
+            or self.etag_for(gzipped=False) in tags
+            or self.etag_for(gzipped=True) in tags,
+        )
+
+    def response(
+        self,
+        *,  # Force keyword arguments after this point
+        if_none_match: str | None,
+        accept_encoding: str | None,
+    ) -> Response:
+        """Answer with 304, the gzip body or the plain body."""
+        gzipped = self.gzipped is not None and "gzip" in (accept_encoding or "")
+        headers = {
+            "ETag": self.etag_for(gzipped=gzipped),
+            # The catalog reloads, so clients revalidate every time
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if self.total is not None:
+            headers["X-Total-Count"] = str(self.total)
+        if self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+            body = self.gzipped
+        else:
+            body = self.body
+        return Response(body, media_type="application/json", headers=headers)
+
+
+def render_list(
+    items: list[dict[str, Any]],
+    *,  # Force keyword arguments after this point
+    fields: tuple[str, ...] | None,
+    offset: int,
+    limit: int | None,
+) -> CachedBody:
+    """Render one projected page of ``items``."""
+    end = None if limit is None else offset + limit
+    page = [project(item, fields) for item in items[offset:end]]
+    return CachedBody(page, total=len(items))
+
+
+class CatalogResponses:
+    """LRU of rendered catalog responses, emptied when the catalog reloads."""
+
+    def __init__(self, max_entries: int = CATALOG_RESPONSE_CACHE_SIZE) -> None:
+        """Create an empty cache holding at most ``max_entries`` bodies."""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version = ""
+        self._bodies: OrderedDict[tuple[Any, ...], CachedBody] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: tuple[Any, ...],
+        render: Callable[[], CachedBody],
+    ) -> CachedBody:
+        """Return the cached body for ``key``, rendering it on a miss."""
+        version = catalog.version()
+        with self._lock:
+            if version != self._version:
+                self._bodies.clear()
+                self._version = version
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+
+        # Render outside the lock; a concurrent miss renders the same bytes
+        body = render()
+        with self._lock:
+            if version == self._version:
+                self._bodies[key] = body
+                while len(self._bodies) > self.max_entries:
+                    self._bodies.popitem(last=False)
+        return body
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit and miss counters and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._bodies),
+                "max_entries": self.max_entries,
+            }
+
+
+catalog_responses = CatalogResponses()
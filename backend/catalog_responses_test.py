@@ -0,0 +1,117 @@
+"""Tests for the cached, pre-serialized catalog responses."""
+
+import gzip
+import json
+
+import catalog_responses as responses_module
+import pytest
+from catalog_responses import (
+    GZIP_MIN_BYTES,
+    CachedBody,
+    CatalogResponses,
+    editor_view,
+    parse_fields,
+    public_course,
+    render_list,
+)
+
+QUESTION = {
+    "id": "sum",
+    "title": "Sum",
+    "solution": "print(sum(map(int, input().split())))",
+    "test_cases": {
+        "visible_cases": [{"input": "1 2", "expected_output": "3"}],
+        "hidden_cases": [{"input": "5 5", "expected_output": "10"}],
+    },
+}
+
+
+def test_public_view_hides_solutions_and_hidden_cases() -> None:
+    """Neither reference solutions nor hidden cases reach a response."""
+    course = {"id": "py", "topics": [{"topic_id": "basics", "questions": [QUESTION]}]}
+    question = public_course(course)["topics"][0]["questions"][0]
+    assert "solution" not in question
+    visible_cases = QUESTION["test_cases"]["visible_cases"]
+    assert question["test_cases"] == {"visible_cases": visible_cases}
+    assert "solution" in QUESTION
+
+
+def test_list_pages_are_projected_and_counted() -> None:
+    """A page keeps only the requested fields and counts every item."""
+    items = [{"id": str(i), "title": f"Q{i}", "body": "x"} for i in range(5)]
+    fields = parse_fields(" title, id,,title")
+    assert fields == ("id", "title")
+    body = render_list(items, fields=fields, offset=1, limit=2)
+    assert json.loads(body.body) == [
+        {"id": "1", "title": "Q1"},
+        {"id": "2", "title": "Q2"},
+    ]
+    response = body.response(if_none_match=None, accept_encoding=None)
+    assert response.headers["X-Total-Count"] == "5"
+
+
+def test_conditional_requests_and_gzip() -> None:
+    """Large bodies are gzipped, and either ETag answers with 304."""
+    payload = {"text": "a" * GZIP_MIN_BYTES}
+    body = CachedBody(payload)
+    plain = body.response(if_none_match=None, accept_encoding=None)
+    assert "Content-Encoding" not in plain.headers
+    assert json.loads(plain.body) == payload
+    zipped = body.response(if_none_match=None, accept_encoding="gzip, br")
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(zipped.body)) == payload
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+
+    for etag in (plain.headers["ETag"], f"W/{zipped.headers['ETag']}", "*"):
+        response = body.response(if_none_match=etag, accept_encoding="gzip")
+        assert response.status_code == 304
+        assert response.body == b""
+    stale = body.response(if_none_match='"other"', accept_encoding=None)
+    assert stale.status_code == 200
+    assert CachedBody({"text": "a"}).gzipped is None
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """The cache keeps the most recently used bodies up to its size."""
+    cache = CatalogResponses(max_entries=2)
+    renders = []
+
+    def render(key: str) -> CachedBody:
+        renders.append(key)
+        return CachedBody(key)
+
+    for key in ("a", "b", "a", "c", "a", "b"):
+        cache.get((key,), lambda key=key: render(key))
+    assert renders == ["a", "b", "c", "b"]
+    assert cache.stats() == {"hits": 2, "misses": 4, "entries": 2, "max_entries": 2}
+
+
+def test_cache_is_emptied_when_the_catalog_reloads(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Bodies rendered for an older catalog version are not served."""
+    version = "1"
+    monkeypatch.setattr(responses_module.catalog, "version", lambda: version)
+    cache = CatalogResponses()
+    first = cache.get(("courses",), lambda: CachedBody(["old"]))
+    assert cache.get(("courses",), lambda: CachedBody(["unused"])) is first
+    version = "2"
+    assert json.loads(cache.get(("courses",), lambda: CachedBody(["new"])).body) == [
+        "new",
+    ]
+
+
+def test_editor_view_links_neighbouring_questions() -> None:
+    """The editor gets the public question and its neighbours' IDs."""
+    questions = [{**QUESTION, "id": name} for name in ("a", "b", "c")]
+    topic = {"topic_id": "basics", "topic_title": "Basics", "questions": questions}
+    course = {"id": "py", "title": "Python", "language": "python"}
+    first = editor_view(course, topic, 0)
+    assert (first["previous_question_id"], first["next_question_id"]) == (None, "b")
+    last = editor_view(course, topic, 2)
+    assert (last["previous_question_id"], last["next_question_id"]) == ("b", None)
+    assert "solution" not in first["question"]
+    assert first["question"]["visible_cases"] == QUESTION["test_cases"][
+        "visible_cases"
+    ]
+    assert first["topic"] == {"topic_id": "basics", "topic_title": "Basics"}
@@ -0,0 +1,91 @@
+"""Tests for the indexed course catalog and its snapshot."""
+
+import os
+from pathlib import Path
+
+import catalog as catalog_module
+import pytest
+from catalog import SNAPSHOT_MAGIC, Catalog, read_snapshot
+
+CONFIG = """
+courses:
+  - id: py
+    title: Python
+    topics:
+      - topic_id: basics
+        questions:
+          - id: sum
+            title: Sum
+            test_cases:
+              visible_cases:
+                - {input: "1 2", expected_output: "3"}
+"""
+
+
+def write_config(path: Path, text: str, mtime_ns: int) -> None:
+    """Write ``text`` to ``path`` and give it a distinct modification time."""
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_lookups_by_id(tmp_path: Path) -> None:
+    """Courses, topics and questions are found by their IDs."""
+    config = tmp_path / "config.yaml"
+    write_config(config, CONFIG, 1_000_000_000)
+    catalog = Catalog(config, None, check_seconds=0)
+    assert catalog.course("py")["title"] == "Python"
+    assert catalog.topic("py", "basics")["topic_id"] == "basics"
+    assert catalog.question("sum")["title"] == "Sum"
+    assert catalog.question("missing") is None
+
+
+def test_reloads_changed_config(tmp_path: Path) -> None:
+    """A changed file is picked up on the next read."""
+    config = tmp_path / "config.yaml"
+    write_config(config, CONFIG, 1_000_000_000)
+    catalog = Catalog(config, None, check_seconds=0)
+    write_config(config, CONFIG.replace("title: Sum", "title: Add"), 2_000_000_000)
+    assert catalog.question("sum")["title"] == "Add"
+    assert catalog.stats()["reloads"] == 1
+
+
+def test_broken_config_keeps_last_catalog(tmp_path: Path) -> None:
+    """A config that fails to parse leaves the previous catalog in place."""
+    config = tmp_path / "config.yaml"
+    write_config(config, CONFIG, 1_000_000_000)
+    catalog = Catalog(config, None, check_seconds=0)
+    write_config(config, "courses: [", 2_000_000_000)
+    assert catalog.question("sum")["title"] == "Sum"
+    assert catalog.stats()["last_error"].startswith("ParserError")
+
+
+def test_snapshot_is_used_and_refreshed(tmp_path: Path) -> None:
+    """A current snapshot skips the parse; a stale one is rewritten."""
+    config, snapshot = tmp_path / "config.yaml", tmp_path / "config.snapshot"
+    write_config(config, CONFIG, 1_000_000_000)
+    assert not Catalog(config, snapshot).from_snapshot
+    assert snapshot.read_bytes().startswith(SNAPSHOT_MAGIC)
+    assert Catalog(config, snapshot).from_snapshot
+
+    write_config(config, CONFIG.replace("title: Sum", "title: Add"), 2_000_000_000)
+    catalog = Catalog(config, snapshot)
+    assert not catalog.from_snapshot
+    assert catalog.question("sum")["title"] == "Add"
+    assert read_snapshot(snapshot)["source_hash"] == catalog.version()
+
+
+def test_unusable_snapshot_is_ignored(tmp_path: Path) -> None:
+    """Empty, foreign and truncated snapshots read as missing."""
+    snapshot = tmp_path / "config.snapshot"
+    assert read_snapshot(snapshot) is None
+    for data in (b"", b"not a snapshot", SNAPSHOT_MAGIC + b"\xff"):
+        snapshot.write_bytes(data)
+        assert read_snapshot(snapshot) is None
+
+
+def test_shared_catalog_is_loaded_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The module's ``catalog`` is created on first use and then reused."""
+    monkeypatch.setattr(catalog_module, "_catalog", None)
+    first = catalog_module.catalog
+    assert isinstance(first, Catalog)
+    assert catalog_module.catalog is first
@@ -0,0 +1,382 @@
+"""Pool of warm tester containers reused across submissions.
+
+Containers mount nothing from the host: each job's files are copied into
+the container for that job alone and removed once it has run, so a
+submission never sees another's files.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+import docker
+from docker_archive import build_archive, get_client
+
+POOL_SIZE = int(os.environ.get("CODE_GYM_POOL_SIZE", "2"))
+POOL_MAX_REUSE = int(os.environ.get("CODE_GYM_POOL_MAX_REUSE", "50"))
+POOL_HEALTH_CHECK_SECONDS = float(
+    os.environ.get("CODE_GYM_POOL_HEALTH_CHECK_SECONDS", "30"),
+)
+POOL_STARTUP_TIMEOUT_SECONDS = float(
+    os.environ.get("CODE_GYM_POOL_STARTUP_TIMEOUT_SECONDS", "30"),
+)
+POOL_JOB_TIMEOUT_SECONDS = float(
+    os.environ.get("CODE_GYM_POOL_JOB_TIMEOUT_SECONDS", "300"),
+)
+POOL_RETRY_SECONDS = float(os.environ.get("CODE_GYM_POOL_RETRY_SECONDS", "60"))
+
+T = TypeVar("T")
+
+
+class PoolError(RuntimeError):
+    """Raised when the pool cannot run a job on a warm container."""
+
+
+class PoolJobError(PoolError):
+    """Raised when a job failed after it was handed to a container.
+
+    The job may already have run, so it must not be run again elsewhere.
+    """
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when a container does not answer in time.
+
+    The container is replaced rather than reused, so a job it timed out on
+    may be run again elsewhere.
+    """
+
+
+class PooledContainer:
+    """A running tester container speaking the line protocol of ``--serve``."""
+
+    def __init__(self, image: str) -> None:
+        """Start the container and wait for the runner to report ready."""
+        self.name = f"code-gym-pool-{uuid.uuid4().hex[:12]}"
+        self.uses = 0
+        self.last_used = time.monotonic()
+        # Cleared once a job ran student code in the runner's own process
+        self.reusable = True
+        # Security note: the command is built from trusted paths and constants
+        self.process = subprocess.Popen(
+            self.command(image),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        # Lines are read on their own thread: a readline() may buffer several
+        # lines at once, after which waiting on the pipe would miss them
+        self._lines: queue.Queue[str] = queue.Queue()
+        threading.Thread(
+            target=self._read_lines,
+            name=f"{self.name}-stdout",
+            daemon=True,
+        ).start()
+        try:
+            reply = self._read_reply(POOL_STARTUP_TIMEOUT_SECONDS)
+        except (PoolError, ValueError):
+            self.stop()
+            raise
+        if not reply.get("ready"):
+            self.stop()
+            error_msg = f"Container {self.name} did not become ready"
+            raise PoolError(error_msg)
+
+    def command(self, image: str) -> list[str]:
+        """Return the command that runs the container's ``--serve`` loop."""
+        return [
+            "docker", "run", "-i", "--rm",
+            "--name", self.name,
+            image,
+            "--serve",
+        ]
+
+    def _read_lines(self) -> None:
+        """Queue each line the container writes; an empty line marks its exit."""
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put("")
+
+    def _read_reply(self, timeout: float) -> dict:
+        """Read one JSON reply from the container within ``timeout`` seconds."""
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            error_msg = f"Container {self.name} timed out after {timeout}s"
+            raise PoolTimeoutError(error_msg) from None
+        if not line:
+            # Leave the end marker for any later read
+            self._lines.put(line)
+            error_msg = f"Container {self.name} exited unexpectedly"
+            raise PoolError(error_msg)
+        return json.loads(line)
+
+    def _send(self, message: dict) -> None:
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            error_msg = f"Container {self.name} is not accepting jobs"
+            raise PoolError(error_msg) from exc
+
+    def is_healthy(self) -> bool:
+        """Check that the container is alive and answers a ping."""
+        if self.process.poll() is not None:
+            return False
+        try:
+            self._send({"ping": True})
+            return self._read_reply(POOL_STARTUP_TIMEOUT_SECONDS).get("pong", False)
+        except PoolError:
+            return False
+
+    def _request_job(
+        self,
+        message: dict,
+        on_event: Callable[[dict], None] | None = None,
+    ) -> dict:
+        """Send one job request and return the runner's reply.
+
+        Every request carries a fresh ``id`` that the runner echoes in each
+        line it sends for the job; a line without it did not come from the
+        runner, so the job fails rather than trust it. With ``on_event``
+        the runner is asked to stream case events, which are handed to it
+        as they arrive, before the final reply.
+        """
+        request_id = uuid.uuid4().hex
+        message = {**message, "id": request_id}
+        if on_event is not None:
+            message = {**message, "stream": True}
+        self._send(message)
+        self.uses += 1
+        self.last_used = time.monotonic()
+        deadline = time.monotonic() + POOL_JOB_TIMEOUT_SECONDS
+        try:
+            reply = self._read_reply(POOL_JOB_TIMEOUT_SECONDS)
+            while reply.get("id") == request_id and "event" in reply:
+                if on_event is not None:
+                    on_event(reply["event"])
+                reply = self._read_reply(max(deadline - time.monotonic(), 0))
+        except PoolTimeoutError:
+            raise
+        except (PoolError, ValueError) as exc:
+            raise PoolJobError(str(exc)) from exc
+        if reply.get("id") != request_id:
+            error_msg = f"Container {self.name} sent a reply to another request"
+            raise PoolJobError(error_msg)
+        if reply.get("recycle"):
+            self.reusable = False
+        if not reply.get("ok"):
+            error_msg = reply.get("error", "Unknown container error")
+            raise PoolJobError(error_msg)
+        return reply
+
+    def run_archive_job(
+        self,
+        job_name: str,
+        files: dict[str, str],
+        on_event: Callable[[dict], None] | None = None,
+    ) -> dict:
+        """Copy a submission in from memory, run it and return its report."""
+        archive = build_archive({
+            f"submissions/{job_name}/{name}": content
+            for name, content in files.items()
+        })
+        try:
+            get_client().containers.get(self.name).put_archive("/", archive)
+        except docker.errors.DockerException as exc:
+            error_msg = f"Could not copy {job_name} into {self.name}"
+            raise PoolError(error_msg) from exc
+        return self._request_job(
+            {"job": job_name, "inline": True},
+            on_event,
+        )["results"]
+
+    def stop(self) -> None:
+        """Stop the container; ``--rm`` removes it once it exits."""
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                kill_cmd = ["docker", "kill", self.name]
+                subprocess.run(kill_cmd, capture_output=True, check=False)
+                self.process.kill()
+
+
+class ContainerPool:
+    """Keep ``size`` tester containers warm and hand them out one job at a time.
+
+    A container is recycled after ``max_reuse`` jobs, after any failed job,
+    after any job that ran student code in the runner's own process (the
+    Python tester's pytest mode), and whenever a health check made before
+    handing it out fails. Recycled
+    containers are replaced in the background so the pool stays full.
+    """
+
+    def __init__(
+        self,
+        image: str,
+        size: int = POOL_SIZE,
+        max_reuse: int = POOL_MAX_REUSE,
+        health_check_seconds: float = POOL_HEALTH_CHECK_SECONDS,
+    ) -> None:
+        """Start ``size`` containers of ``image``."""
+        self.image = image
+        self.size = size
+        self.max_reuse = max_reuse
+        self.health_check_seconds = health_check_seconds
+        self._idle: queue.Queue[PooledContainer] = queue.Queue()
+        self._closed = False
+        try:
+            for _ in range(size):
+                self._idle.put(PooledContainer(image))
+        except (PoolError, OSError):
+            self.shutdown()
+            raise
+
+    def _replace(self, container: PooledContainer) -> None:
+        """Stop ``container`` and start a fresh one in the background."""
+
+        def replace() -> None:
+            container.stop()
+            if self._closed:
+                return
+            # On failure leave the slot empty; acquire() starts one on demand
+            with contextlib.suppress(PoolError, OSError):
+                self._idle.put(PooledContainer(self.image))
+
+        threading.Thread(target=replace, daemon=True).start()
+
+    def _acquire(self) -> PooledContainer:
+        """Take an idle, healthy container, starting one if none arrives in time."""
+        while True:
+            try:
+                container = self._idle.get(timeout=POOL_STARTUP_TIMEOUT_SECONDS)
+            except queue.Empty:
+                return PooledContainer(self.image)
+            idle_for = time.monotonic() - container.last_used
+            if idle_for < self.health_check_seconds or container.is_healthy():
+                return container
+            self._replace(container)
+
+    def _run(self, job: Callable[[PooledContainer], T]) -> T:
+        """Run ``job`` on a warm container and return the container to the pool."""
+        if self._closed:
+            error_msg = "Container pool is shut down"
+            raise PoolError(error_msg)
+        container = self._acquire()
+        try:
+            result = job(container)
+        except PoolError:
+            self._replace(container)
+            raise
+        if container.uses >= self.max_reuse or not container.reusable:
+            self._replace(container)
+        elif self._idle.qsize() >= self.size:
+            # An on-demand container pushed the pool over size; retire it
+            container.stop()
+        else:
+            self._idle.put(container)
+        return result
+
+    def run_job(
+        self,
+        submission_dir: Path,
+        on_event: Callable[[dict], None] | None = None,
+    ) -> bool:
+        """Run a submission staged on disk on a warm container.
+
+        Its ``code`` and ``tests`` are copied into the container, and the
+        report is written to its ``results`` directory. Returns whether
+        every case passed.
+        """
+        files = {
+            path.relative_to(submission_dir).as_posix(): path.read_text(
+                encoding="utf-8",
+            )
+            for directory in ("code", "tests")
+            for path in (submission_dir / directory).rglob("*")
+            if path.is_file()
+        }
+        results = self.run_archive_job(submission_dir.name, files, on_event)
+        results_file = submission_dir / "results" / "results.json"
+        with results_file.open("w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        return results["failed"] == 0
+
+    def run_archive_job(
+        self,
+        job_name: str,
+        files: dict[str, str],
+        on_event: Callable[[dict], None] | None = None,
+    ) -> dict:
+        """Run a submission held in memory on a warm container."""
+        return self._run(
+            lambda container: container.run_archive_job(job_name, files, on_event),
+        )
+
+    def shutdown(self) -> None:
+        """Stop every idle container."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+
+_pools: dict[str, ContainerPool] = {}
+# Per image: the lock held while its pool starts, and when a pool that
+# failed to start may be tried again
+_start_locks: dict[str, threading.Lock] = {}
+_retry_at: dict[str, float] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(image: str) -> ContainerPool | None:
+    """Return the shared pool for ``image``, or None when pooling is disabled.
+
+    The pool is started on first use, holding up only callers that want
+    the same image. If it fails to start, ``PoolError`` is raised at once
+    for ``POOL_RETRY_SECONDS`` before the next attempt.
+    """
+    if POOL_SIZE <= 0:
+        return None
+    with _pools_lock:
+        if image in _pools:
+            return _pools[image]
+        start_lock = _start_locks.setdefault(image, threading.Lock())
+    with start_lock:
+        with _pools_lock:
+            if image in _pools:
+                return _pools[image]
+        if time.monotonic() < _retry_at.get(image, 0):
+            error_msg = f"Container pool for {image} failed to start recently"
+            raise PoolError(error_msg)
+        try:
+            pool = ContainerPool(image)
+        except (PoolError, OSError):
+            _retry_at[image] = time.monotonic() + POOL_RETRY_SECONDS
+            raise
+        with _pools_lock:
+            _pools[image] = pool
+        return pool
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.shutdown()
@@ -0,0 +1,171 @@
+"""Tests for the line protocol between the pool and its containers."""
+
+import sys
+import threading
+import time
+from collections.abc import Iterator
+
+import container_pool
+import pytest
+from container_pool import (
+    PooledContainer,
+    PoolError,
+    PoolJobError,
+    PoolTimeoutError,
+)
+
+# Stands in for the tester's --serve loop. Each job's events and its reply
+# go out in a single write, as a fast job's lines do from the real runner.
+FAKE_SERVE = """
+import json, os, sys
+os.write(1, b'{"ready": true}\\n')
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get("ping"):
+        os.write(1, b'{"pong": true}\\n')
+        continue
+    job = request["job"]
+    if job == "exit":
+        break
+    if job == "hang":
+        continue
+    request_id = "someone-else" if job == "foreign" else request["id"]
+    lines = [{"id": request_id, "event": {"case": n}} for n in range(3)]
+    lines.append({"id": request_id, "ok": True, "results": {"failed": 0}})
+    os.write(1, "".join(json.dumps(reply) + "\\n" for reply in lines).encode())
+"""
+
+
+class FakeContainer(PooledContainer):
+    """A pooled container whose serve loop is a local process."""
+
+    def command(self, image: str) -> list[str]:
+        """Run the fake serve loop instead of the tester image."""
+        return [sys.executable, "-c", FAKE_SERVE, image]
+
+
+@pytest.fixture
+def container() -> Iterator[FakeContainer]:
+    """Yield a ready fake container and stop it after the test."""
+    container = FakeContainer("tester")
+    yield container
+    container.stop()
+
+
+def test_events_and_reply_in_one_write(container: FakeContainer) -> None:
+    """Lines that arrive together are all read without waiting for more."""
+    events = []
+    started = time.monotonic()
+    reply = container._request_job({"job": "a"}, events.append)  # noqa: SLF001
+    assert time.monotonic() - started < 5
+    assert events == [{"case": 0}, {"case": 1}, {"case": 2}]
+    assert reply["results"] == {"failed": 0}
+    assert container.uses == 1
+
+
+def test_back_to_back_jobs(container: FakeContainer) -> None:
+    """A container answers one job after another, and pings in between."""
+    for _ in range(3):
+        assert container._request_job({"job": "a"})["ok"]  # noqa: SLF001
+        assert container.is_healthy()
+
+
+def test_reply_to_another_request_fails(container: FakeContainer) -> None:
+    """Lines without the request's ID are not trusted as its reply."""
+    with pytest.raises(PoolJobError, match="another request"):
+        container._request_job({"job": "foreign"})  # noqa: SLF001
+
+
+def test_exit_mid_job_fails(container: FakeContainer) -> None:
+    """A container that exits while it has the job fails the job."""
+    with pytest.raises(PoolJobError, match="exited"):
+        container._request_job({"job": "exit"})  # noqa: SLF001
+    assert not container.is_healthy()
+
+
+def test_silent_container_times_out(
+    container: FakeContainer,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A job the container does not answer in time may be run elsewhere."""
+    monkeypatch.setattr(container_pool, "POOL_JOB_TIMEOUT_SECONDS", 0.2)
+    with pytest.raises(PoolTimeoutError):
+        container._request_job({"job": "hang"})  # noqa: SLF001
+
+
+def test_unready_container_is_not_started(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A container that never reports ready is stopped and reported."""
+    monkeypatch.setattr(container_pool, "POOL_STARTUP_TIMEOUT_SECONDS", 0.5)
+
+    class SilentContainer(PooledContainer):
+        def command(self, image: str) -> list[str]:
+            return [sys.executable, "-c", "import sys; sys.stdin.read()", image]
+
+    with pytest.raises(PoolError, match="timed out"):
+        SilentContainer("tester")
+
+
+@pytest.fixture
+def pools(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Replace the shared pools with fakes; return the images started."""
+    started = []
+
+    class FakePool:
+        def __init__(self, image: str) -> None:
+            started.append(image)
+            if image == "broken":
+                error_msg = "no docker"
+                raise PoolError(error_msg)
+
+    for name in ("_pools", "_start_locks", "_retry_at"):
+        monkeypatch.setattr(container_pool, name, {})
+    monkeypatch.setattr(container_pool, "ContainerPool", FakePool)
+    monkeypatch.setattr(container_pool, "POOL_SIZE", 1)
+    return started
+
+
+def test_pool_is_started_once(pools: list[str]) -> None:
+    """Each image's pool is started on first use and then shared."""
+    first = container_pool.get_pool("tester")
+    assert container_pool.get_pool("tester") is first
+    assert container_pool.get_pool("other") is not first
+    assert pools == ["tester", "other"]
+
+
+def test_failed_pool_backs_off(pools: list[str]) -> None:
+    """A pool that failed to start is not retried until the backoff ends."""
+    with pytest.raises(PoolError, match="no docker"):
+        container_pool.get_pool("broken")
+    with pytest.raises(PoolError, match="failed to start recently"):
+        container_pool.get_pool("broken")
+    assert pools == ["broken"]
+    # Once the backoff has passed, the next call tries again
+    container_pool._retry_at["broken"] = 0  # noqa: SLF001
+    with pytest.raises(PoolError, match="no docker"):
+        container_pool.get_pool("broken")
+    assert pools == ["broken", "broken"]
+
+
+def test_slow_start_holds_up_only_its_image(
+    pools: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Other images get their pools while one image's pool is starting."""
+    release = threading.Event()
+    fake_pool = container_pool.ContainerPool
+
+    def slow_pool(image: str) -> object:
+        if image == "slow":
+            release.wait(5)
+        return fake_pool(image)
+
+    monkeypatch.setattr(container_pool, "ContainerPool", slow_pool)
+    starting = threading.Thread(target=container_pool.get_pool, args=("slow",))
+    starting.start()
+    try:
+        assert container_pool.get_pool("fast") is not None
+        assert pools == ["fast"]
+    finally:
+        release.set()
+        starting.join()
+    assert pools == ["fast", "slow"]
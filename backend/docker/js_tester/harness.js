@@ -0,0 +1,498 @@
+/**
+ * Long-lived grader for JavaScript submissions.
+ *
+ * The solution is compiled once to catch syntax errors; every test case
+ * then runs it in its own Node process, started ahead of its case, with
+ * the case input piped to its stdin and its stdout captured. A case costs
+ * a process that is already booted instead of a Jest test file, and the
+ * report is written straight to /results/results.json. The solution never
+ * runs in the harness process, so it cannot reach the harness's stdout,
+ * where replies and events go.
+ *
+ * The cases come from /tests/manifest.jsonl: a header line with the run
+ * settings followed by one JSON line per case, as rendered by
+ * submission_processor.render_test_files. The command line and the
+ * --serve protocol are the same as those of the Python tester's
+ * test_runner.py, so the container pool and every executor drive both.
+ */
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+const readline = require('readline');
+const { spawn } = require('child_process');
+
+const MAX_OUTPUT_BYTES = 16 * 1024 * 1024;
+// Longest expected or actual output and stderr tail kept in the report
+const MAX_SHOWN_CHARS = 1024;
+const STDERR_TAIL_BYTES = 2048;
+const INTERNAL_FRAME = /\[eval\]|node:internal/;
+// What V8 and libc print when an allocation fails
+const OUT_OF_MEMORY = /heap out of memory|allocation failed|Cannot allocate memory|bad_alloc/;
+// KiB of data a case may use beyond its heap limit, for Node itself
+const NODE_OVERHEAD_KB = 64 * 1024;
+
+// Message shown for each verdict; runtime errors name the error instead
+const VERDICT_ERRORS = {
+    accepted: null,
+    wrong_answer: 'Wrong Answer',
+    time_limit_exceeded: 'Time Limit Exceeded',
+    memory_limit_exceeded: 'Memory Limit Exceeded',
+    output_limit_exceeded: 'Output Limit Exceeded',
+    runtime_error: 'Runtime Error',
+    skipped: 'Skipped after an earlier failure',
+};
+const SKIPPED = { verdict: 'skipped', passed: false, skipped: true, error: VERDICT_ERRORS.skipped };
+
+// Runs in each case process, with the solution's path as its argument. The
+// process boots ahead of its case: it warms up stdout and the module
+// loader, reports it is ready on fd 3 and blocks there until the harness
+// sends the go byte, then runs the solution as the main module, as
+// \`node solution.js\` would. Stdin is left alone, since opening it as a
+// stream would make fs.readFileSync(0) fail. When the process exits on its
+// own it reports the CPU time the case used, without the boot, and its
+// peak resident set size on fd 3
+const CASE_SCRIPT = `
+const fs = require('fs');
+const Module = require('module');
+
+process.stdout;
+new Module('[warm-up]')._compile('', process.argv[1]);
+fs.writeSync(3, 'R');
+fs.readSync(3, Buffer.alloc(1));
+
+const booted = process.cpuUsage();
+process.on('exit', () => {
+    const cpu = process.cpuUsage(booted);
+    fs.writeSync(3, JSON.stringify({
+        cpu_time_ms: (cpu.user + cpu.system) / 1000,
+        peak_memory_kb: process.resourceUsage().maxRSS,
+    }) + '\\n');
+});
+Module.runMain(process.argv[1]);
+`;
+
+// Caps the data segment, which also bounds Buffers and ArrayBuffers, at $1
+// KiB unless the inherited hard limit is lower, then runs the command
+const LIMIT_DATA = `
+limit=$1
+shift
+hard=$(ulimit -H -d)
+if [ "$hard" = unlimited ] || [ "$hard" -gt "$limit" ]; then
+    ulimit -d "$limit"
+fi
+exec "$@"
+`;
+
+function loadManifest(manifestPath) {
+    const lines = fs.readFileSync(manifestPath, 'utf-8').split('\n').filter(Boolean);
+    const header = JSON.parse(lines[0]);
+    return { ...header, cases: lines.slice(1).map((line) => JSON.parse(line)) };
+}
+
+function compileSolution(solutionPath) {
+    const source = fs.readFileSync(solutionPath, 'utf-8');
+    // Throws the SyntaxError every case would otherwise run into
+    new vm.Script(require('module').wrap(source), { filename: solutionPath });
+    return { filename: solutionPath };
+}
+
+/**
+ * Start a process for the solution that will wait for a case's input.
+ *
+ * Returns a handle whose ``run(testCase)`` hands the process its case and
+ * resolves with the outcome, and whose ``cancel()`` stops it early. With a
+ * ``memory_limit_mb`` the process gets that much V8 heap and a data
+ * segment of that much plus ``NODE_OVERHEAD_KB``.
+ */
+function startCase(solution, settings) {
+    const memoryMb = settings.memory_limit_mb;
+    const command = [
+        process.execPath,
+        ...(memoryMb ? [`--max-old-space-size=${memoryMb}`] : []),
+        '-e',
+        CASE_SCRIPT,
+        solution.filename,
+    ];
+    const options = { stdio: ['pipe', 'pipe', 'pipe', 'pipe'] };
+    const child = memoryMb
+        ? spawn('/bin/sh', ['-c', LIMIT_DATA, 'sh', String(memoryMb * 1024 + NODE_OVERHEAD_KB), ...command], options)
+        : spawn(command[0], command.slice(1), options);
+    const control = child.stdio[3];
+
+    const chunks = [];
+    let outputBytes = 0;
+    let stderr = Buffer.alloc(0);
+    let verdict = null;
+    let error = null;
+    let exitCode = null;
+    let exitSignal = null;
+    let report = '';
+    let started = null;
+    let timer = null;
+    let markReady;
+    const ready = new Promise((resolve) => {
+        markReady = resolve;
+    });
+    // Settled once the process has exited and its stdout and fd 3 are drained
+    let pending = 3;
+    let settle;
+    const settled = new Promise((resolve) => {
+        settle = () => {
+            pending -= 1;
+            if (pending === 0) {
+                clearTimeout(timer);
+                markReady();
+                resolve();
+            }
+        };
+    });
+
+    function fail(failedVerdict, message = VERDICT_ERRORS[failedVerdict]) {
+        if (!verdict) {
+            verdict = failedVerdict;
+            error = message;
+        }
+        child.kill('SIGKILL');
+    }
+
+    function appendStderr(chunk) {
+        stderr = Buffer.concat([stderr, chunk]);
+        if (stderr.length > STDERR_TAIL_BYTES) {
+            stderr = stderr.subarray(stderr.length - STDERR_TAIL_BYTES);
+        }
+    }
+
+    child.stdout.on('data', (chunk) => {
+        outputBytes += chunk.length;
+        if (outputBytes > MAX_OUTPUT_BYTES) {
+            fail('output_limit_exceeded');
+            return;
+        }
+        chunks.push(chunk);
+    });
+    child.stdout.on('end', settle);
+    child.stderr.on('data', appendStderr);
+    // The solution may write to fd 3 too; its only effect is on its own
+    // case's usage figures
+    control.once('data', markReady);
+    control.on('data', (chunk) => {
+        report = (report + chunk.toString('utf-8')).slice(-MAX_SHOWN_CHARS);
+    });
+    control.on('end', settle);
+    control.on('error', () => {});
+    child.stdin.on('error', () => {});
+    // The process could not be started, so it will not exit either
+    child.on('error', (e) => {
+        fail('runtime_error', e.code || VERDICT_ERRORS.runtime_error);
+        settle();
+    });
+    child.on('exit', (code, signal) => {
+        exitCode = code;
+        exitSignal = signal;
+        settle();
+    });
+
+    return {
+        cancelled: false,
+
+        async run(testCase) {
+            await ready;
+            started = process.hrtime.bigint();
+            timer = setTimeout(() => fail('time_limit_exceeded'), settings.time_limit_seconds * 1000);
+            control.write('G');
+            child.stdin.end(`${testCase.input}\n`);
+            await settled;
+            const wallTimeMs = Math.round(Number(process.hrtime.bigint() - started) / 1e5) / 10;
+            const usage = readUsage(report);
+            if (!verdict && exitCode !== 0) {
+                const lines = stderr.toString('utf-8').split('\n');
+                const thrown = lines.map((line) => /^(\w*Error)\b/.exec(line)).find(Boolean);
+                if (OUT_OF_MEMORY.test(stderr.toString('utf-8'))) {
+                    fail('memory_limit_exceeded');
+                } else if (thrown) {
+                    fail('runtime_error', thrown[1]);
+                } else if (exitCode === null) {
+                    fail('runtime_error', `Process was killed by ${exitSignal}`);
+                } else {
+                    fail('runtime_error', `Process exited with code ${exitCode}`);
+                }
+            }
+            return judge(testCase, chunks, {
+                verdict,
+                error,
+                exit_code: exitCode,
+                stderr_tail: stderr
+                    .toString('utf-8')
+                    .split('\n')
+                    .filter((line) => !INTERNAL_FRAME.test(line))
+                    .join('\n'),
+                wall_time_ms: wallTimeMs,
+                ...usage,
+            });
+        },
+
+        cancel() {
+            this.cancelled = true;
+            child.kill('SIGKILL');
+        },
+    };
+}
+
+/**
+ * Return the usage a case process reported on fd 3, or nothing.
+ *
+ * A process that was killed reports nothing; it is judged on its wall time.
+ */
+function readUsage(report) {
+    // The report follows the ready byte
+    const line = report.replace(/^R/, '').trim().split('\n').pop();
+    try {
+        const usage = JSON.parse(line);
+        return {
+            cpu_time_ms: Math.round(Number(usage.cpu_time_ms) * 10) / 10,
+            peak_memory_kb: Math.round(Number(usage.peak_memory_kb)),
+        };
+    } catch (e) {
+        return {};
+    }
+}
+
+function shorten(text) {
+    return text.length > MAX_SHOWN_CHARS ? `${text.slice(0, MAX_SHOWN_CHARS)}…` : text;
+}
+
+/**
+ * Return a case's outcome record from the process's output and run details.
+ *
+ * ``run`` holds the verdict and error message if the run already failed,
+ * the exit code, the stderr tail and the case's usage: its wall time and,
+ * when the process exits on its own, its CPU time and peak resident set
+ * size. Wrong answers add ``expected`` and ``actual``, both cut to
+ * ``MAX_SHOWN_CHARS``.
+ */
+function judge(testCase, chunks, run) {
+    if (run.verdict) {
+        return { ...run, passed: false };
+    }
+    const actual = Buffer.concat(chunks).toString('utf-8').trim().split('\n').pop();
+    const expected = String(testCase.expected_output).trim();
+    if (actual !== expected) {
+        return {
+            ...run,
+            verdict: 'wrong_answer',
+            passed: false,
+            error: VERDICT_ERRORS.wrong_answer,
+            expected: shorten(expected),
+            actual: shorten(actual),
+        };
+    }
+    return { ...run, verdict: 'accepted', passed: true };
+}
+
+/**
+ * Return the report entry for a case.
+ *
+ * Every entry is the same typed record: ``verdict`` is one of the keys of
+ * ``VERDICT_ERRORS`` and ``error`` its message. Expected and actual output
+ * and the stderr tail are only included for visible cases.
+ */
+function buildTestResult(testCase, outcome) {
+    const testResult = {
+        test_id: `Test ${testCase.id}`,
+        verdict: outcome.verdict,
+        passed: outcome.passed,
+        is_hidden: testCase.is_hidden,
+        error: outcome.error || null,
+    };
+    if (outcome.skipped) {
+        testResult.skipped = true;
+    }
+    if ('exit_code' in outcome) {
+        testResult.exit_code = outcome.exit_code;
+    }
+    // Expected and actual output of hidden cases stay private
+    if (!testCase.is_hidden) {
+        for (const key of ['expected', 'actual', 'stderr_tail']) {
+            if (outcome[key]) {
+                testResult[key] = outcome[key];
+            }
+        }
+    }
+    for (const key of ['wall_time_ms', 'cpu_time_ms', 'peak_memory_kb']) {
+        if (key in outcome) {
+            testResult[key] = outcome[key];
+        }
+    }
+    return testResult;
+}
+
+/**
+ * Run every case, up to ``workers`` at a time, in ``run_order`` if given.
+ *
+ * Each slot starts the process for its next case while the current one
+ * runs, so a case rarely waits for Node to boot. With ``fail_fast``
+ * the first failure cancels the running cases and the cases that did not
+ * finish are reported as skipped. ``onStart(index)`` and
+ * ``onFinish(index, outcome)`` are called as each case starts and is
+ * decided.
+ */
+async function runCases(solution, manifest, onStart = () => {}, onFinish = () => {}) {
+    const cases = manifest.cases;
+    const order = manifest.run_order || cases.map((_, index) => index);
+    const outcomes = new Array(cases.length).fill(null);
+    const running = new Set();
+    let next = 0;
+    let stopped = false;
+
+    async function drain() {
+        let spare = startCase(solution, manifest);
+        while (!stopped && next < order.length) {
+            const index = order[next];
+            next += 1;
+            const current = spare;
+            spare = next < order.length ? startCase(solution, manifest) : null;
+            running.add(current);
+            onStart(index);
+            const outcome = await current.run(cases[index]);
+            running.delete(current);
+            if (current.cancelled) {
+                continue;
+            }
+            outcomes[index] = outcome;
+            onFinish(index, outcome);
+            if (manifest.fail_fast && !outcome.passed) {
+                stopped = true;
+                running.forEach((handle) => handle.cancel());
+            }
+        }
+        if (spare !== null) {
+            spare.cancel();
+        }
+    }
+
+    const slots = Math.max(1, Math.min(manifest.workers || 1, cases.length));
+    await Promise.all(Array.from({ length: slots }, drain));
+    return outcomes.map((outcome) => outcome || SKIPPED);
+}
+
+/**
+ * Run all cases of the job under ``root`` and return the results report.
+ *
+ * ``onEvent`` receives a ``started`` event as each case starts and a
+ * ``case`` event, holding its report entry, as soon as it is decided.
+ */
+async function execute(root, onEvent = null) {
+    const manifest = loadManifest(path.join(root, 'tests', 'manifest.jsonl'));
+    const cases = manifest.cases;
+    const results = { passed: 0, failed: 0, skipped: 0, total: cases.length, test_results: [] };
+
+    const callbacks = onEvent === null ? [] : [
+        (index) => onEvent({ type: 'started', test_id: `Test ${cases[index].id}` }),
+        (index, outcome) => onEvent({ type: 'case', ...buildTestResult(cases[index], outcome) }),
+    ];
+
+    let outcomes;
+    try {
+        const solution = compileSolution(path.join(root, 'code', 'solution.js'));
+        outcomes = await runCases(solution, manifest, ...callbacks);
+    } catch (e) {
+        // The solution does not even compile; every case fails the same way
+        outcomes = cases.map(() => ({
+            verdict: 'runtime_error',
+            passed: false,
+            error: e.name || 'SyntaxError',
+            stderr_tail: shorten(String(e.stack || e)),
+        }));
+    }
+
+    cases.forEach((testCase, index) => {
+        const outcome = outcomes[index];
+        if (outcome.passed) {
+            results.passed += 1;
+        } else if (outcome.skipped) {
+            results.skipped += 1;
+        } else {
+            results.failed += 1;
+        }
+        results.test_results.push(buildTestResult(testCase, outcome));
+    });
+    return results;
+}
+
+/**
+ * Run the job under ``root``, write its report and return whether all passed.
+ */
+async function runTests(root, onEvent = null) {
+    const results = await execute(root, onEvent);
+    fs.writeFileSync(path.join(root, 'results', 'results.json'), JSON.stringify(results));
+    return results.failed === 0;
+}
+
+function reply(message) {
+    process.stdout.write(`${JSON.stringify(message)}\n`);
+}
+
+/**
+ * Serve submissions from a warm container until stdin is closed.
+ *
+ * Speaks the line protocol of test_runner.serve: each request is a JSON
+ * line naming a submission directory under /submissions, each reply a
+ * JSON line carrying the request's ``id``. ``inline`` requests get the
+ * report in the reply and have their directory removed; ``stream``
+ * requests get ``{"event": ...}`` lines for every case started and
+ * decided before the final reply.
+ */
+async function serve() {
+    reply({ ready: true });
+    const lines = readline.createInterface({ input: process.stdin });
+    for await (const line of lines) {
+        const request = JSON.parse(line);
+        if (request.ping) {
+            reply({ pong: true });
+            continue;
+        }
+
+        const root = path.join('/submissions', path.basename(request.job));
+        const id = request.id;
+        const onEvent = request.stream ? (event) => reply({ id, event }) : null;
+        try {
+            if (request.inline) {
+                const results = await execute(root, onEvent);
+                reply({ id, ok: true, passed: results.failed === 0, results });
+            } else {
+                reply({ id, ok: true, passed: await runTests(root, onEvent) });
+            }
+        } catch (e) {
+            reply({ id, ok: false, error: `${e.name}: ${e.message}` });
+        } finally {
+            if (request.inline) {
+                fs.rmSync(root, { recursive: true, force: true });
+            }
+        }
+    }
+}
+
+async function main() {
+    if (process.argv.includes('--serve')) {
+        await serve();
+        return;
+    }
+
+    // With --root, the job directories live under it instead of under /
+    const root = process.argv.includes('--root')
+        ? path.resolve(process.argv[process.argv.indexOf('--root') + 1])
+        : '/';
+    // With --events, stream case events as JSON lines on stdout
+    const onEvent = process.argv.includes('--events') ? reply : null;
+
+    // Run tests and exit with appropriate status code
+    process.exitCode = (await runTests(root, onEvent)) ? 0 : 1;
+}
+
+if (require.main === module) {
+    main();
+}
+
+module.exports = { loadManifest, compileSolution, runCases, execute };
@@ -0,0 +1,390 @@
+"""Fork-server execution of test cases.
+
+The parent interpreter compiles ``solution.py`` once and then forks one child
+per test case. Each child gets its own stdin/stdout pipes and runs the
+pre-compiled code object as ``__main__``, so no module state leaks between
+cases and no interpreter startup is paid per case. Children for several
+cases can run at once, one per worker slot.
+"""
+
+import builtins
+import contextlib
+import os
+import resource
+import select
+import signal
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import CodeType
+
+MAX_OUTPUT_BYTES = 16 * 1024 * 1024
+READ_CHUNK_BYTES = 65536
+SKIPPED = {
+    "passed": False,
+    "skipped": True,
+    "error": "Skipped after an earlier failure",
+}
+
+
+class RunSettings:
+    """How the cases of one submission run, as set in the manifest header."""
+
+    def __init__(
+        self,
+        time_limit_seconds: float,
+        *,  # Force keyword arguments after this point
+        workers: int = 1,
+        memory_limit_mb: float | None = None,
+        order: list[int] | None = None,
+        fail_fast: bool = False,
+    ) -> None:
+        """Hold the per-case limits and how the cases are scheduled."""
+        self.time_limit_seconds = time_limit_seconds
+        self.workers = max(workers, 1)
+        self.memory_limit_mb = memory_limit_mb
+        self.order = order
+        self.fail_fast = fail_fast
+
+    @classmethod
+    def from_manifest(cls, manifest: dict) -> "RunSettings":
+        """Read the settings from a manifest's header fields."""
+        return cls(
+            manifest["time_limit_seconds"],
+            workers=manifest.get("workers", 1),
+            memory_limit_mb=manifest.get("memory_limit_mb"),
+            order=manifest.get("run_order"),
+            fail_fast=manifest.get("fail_fast", False),
+        )
+
+    def run_order(self, cases: list[dict]) -> list[int]:
+        """Return the indices of ``cases`` in the order they should start."""
+        return self.order or list(range(len(cases)))
+
+
+def compile_solution(code_dir: str) -> CodeType:
+    """Compile the user solution to a code object."""
+    solution_path = Path(code_dir) / "solution.py"
+    source = solution_path.read_text(encoding="utf-8")
+    return compile(source, str(solution_path), "exec")
+
+
+def _limit_memory(memory_limit_mb: float) -> None:
+    """Cap the address space at its current size plus ``memory_limit_mb``.
+
+    The forked child already maps the whole interpreter, so the limit
+    applies to what the solution allocates on top of that; allocations
+    beyond it fail with ``MemoryError``.
+    """
+    statm = Path("/proc/self/statm").read_text(encoding="ascii")
+    mapped_bytes = int(statm.split()[0]) * resource.getpagesize()
+    limit = mapped_bytes + int(memory_limit_mb * 1024 * 1024)
+    # The hard limit cannot be raised, e.g. when the runner itself is confined
+    hard_limit = resource.getrlimit(resource.RLIMIT_AS)[1]
+    if hard_limit != resource.RLIM_INFINITY:
+        limit = min(limit, hard_limit)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _reset_peak_rss() -> int:
+    """Reset the peak resident memory to the current one and return it in KiB.
+
+    Right after the fork the child's resident set is the interpreter it
+    shares with the parent; the case's own usage is measured on top of it.
+    """
+    # Writing 5 resets the high-water mark the kernel reports as ru_maxrss
+    with contextlib.suppress(OSError):
+        Path("/proc/self/clear_refs").write_text("5", encoding="ascii")
+    try:
+        status = Path("/proc/self/status").read_text(encoding="ascii")
+    except OSError:
+        return 0
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+    return 0
+
+
+def _run_child(
+    code: CodeType,
+    stdin_fd: int,
+    stdout_fd: int,
+    status_fd: int,
+    memory_limit_mb: float | None,
+) -> None:
+    """Execute the solution inside the forked child and exit.
+
+    The status pipe gets the child's resident memory before the solution
+    runs, on a line of its own, and then the name of any error it raised.
+    """
+    os.write(status_fd, f"{_reset_peak_rss()}\n".encode())
+    os.dup2(stdin_fd, 0)
+    os.dup2(stdout_fd, 1)
+    # Drop every other inherited descriptor, e.g. the pool's reply channel
+    os.closerange(3, status_fd)
+    os.closerange(status_fd + 1, os.sysconf("SC_OPEN_MAX"))
+    # Replaced for the rest of the child's life, which ends in os._exit
+    sys.stdin = open(0, encoding="utf-8", closefd=False)  # noqa: SIM115
+    sys.stdout = open(1, "w", encoding="utf-8", closefd=False)  # noqa: SIM115
+    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+    if memory_limit_mb:
+        _limit_memory(memory_limit_mb)
+
+    error_type = ""
+    namespace = {
+        "__name__": "__main__",
+        "__file__": code.co_filename,
+        "__builtins__": builtins,
+    }
+    try:
+        exec(code, namespace)  # noqa: S102 - running the solution is the point
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            error_type = "SystemExit"
+    except BaseException as e:  # noqa: BLE001 - reported as the case's error
+        error_type = type(e).__name__
+
+    with contextlib.suppress(OSError):
+        sys.stdout.flush()
+    os.write(status_fd, error_type.encode())
+    os._exit(1 if error_type else 0)
+
+
+def _killed(status: int) -> bool:
+    """Whether the wait ``status`` is that of a process killed by SIGKILL."""
+    return os.WIFSIGNALED(status) and os.WTERMSIG(status) == signal.SIGKILL
+
+
+class CaseProcess:
+    """A forked child running one case, plus the pipes the parent drives."""
+
+    def __init__(
+        self,
+        code: CodeType,
+        case: dict,
+        time_limit_seconds: float,
+        memory_limit_mb: float | None = None,
+    ) -> None:
+        """Fork the child and start its time limit clock."""
+        stdin_r, self.stdin_w = os.pipe()
+        self.stdout_r, stdout_w = os.pipe()
+        self.status_r, status_w = os.pipe()
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.pid = os.fork()
+        if self.pid == 0:
+            os.close(self.stdin_w)
+            os.close(self.stdout_r)
+            os.close(self.status_r)
+            _run_child(code, stdin_r, stdout_w, status_w, memory_limit_mb)
+
+        os.close(stdin_r)
+        os.close(stdout_w)
+        os.close(status_w)
+        os.set_blocking(self.stdin_w, False)
+
+        self.case = case
+        self.pending_input = case["input"].encode()
+        self.output = bytearray()
+        self.status_bytes = bytearray()
+        self.open_readers = [self.stdout_r, self.status_r]
+        self.error = ""
+        self.started = time.monotonic()
+        self.deadline = self.started + time_limit_seconds
+
+    @property
+    def done(self) -> bool:
+        """Whether the child closed both pipes or hit a limit."""
+        return not self.open_readers or bool(self.error)
+
+    def write_input(self) -> None:
+        """Feed the next chunk of stdin, closing it once everything is sent."""
+        try:
+            written = os.write(self.stdin_w, self.pending_input[:READ_CHUNK_BYTES])
+            self.pending_input = self.pending_input[written:]
+        except BrokenPipeError:
+            self.pending_input = b""
+        if not self.pending_input:
+            os.close(self.stdin_w)
+            self.stdin_w = -1
+
+    def read_output(self, fd: int) -> None:
+        """Drain one readable pipe of the child."""
+        chunk = os.read(fd, READ_CHUNK_BYTES)
+        if not chunk:
+            self.open_readers.remove(fd)
+        elif fd == self.status_r:
+            self.status_bytes += chunk
+        else:
+            self.output += chunk
+            if len(self.output) > MAX_OUTPUT_BYTES:
+                self.error = "Output Limit Exceeded"
+
+    def check_deadline(self, now: float) -> None:
+        """Flag the case as timed out once its own deadline has passed."""
+        if not self.done and now >= self.deadline:
+            self.error = "Time Limit Exceeded"
+
+    def _reap(self, *, kill: bool) -> tuple[int, resource.struct_rusage]:
+        """Wait for the child, killing it first if asked, and close its pipes.
+
+        Returns the wait status and the child's resource usage.
+        """
+        if kill:
+            os.kill(self.pid, signal.SIGKILL)
+        _, status, usage = os.wait4(self.pid, 0)
+        for fd in (self.stdin_w, self.stdout_r, self.status_r):
+            if fd >= 0:
+                os.close(fd)
+        return status, usage
+
+    def cancel(self) -> None:
+        """Kill a child whose verdict is no longer needed."""
+        self._reap(kill=True)
+
+    def finish(self) -> dict:
+        """Reap the child and return its verdict.
+
+        The returned dict carries ``passed`` and, on failure, ``error`` plus
+        ``expected``/``actual`` for wrong answers, matching what
+        ``parse_failure`` makes of the pytest harness's failures. It also holds
+        the case's wall time, CPU time and peak resident memory. The peak
+        leaves out the interpreter the child inherited: it is the child's
+        high-water mark minus the resident memory it had after the fork.
+        """
+        wall_seconds = time.monotonic() - self.started
+        status, usage = self._reap(kill=bool(self.error))
+        baseline, _, error_type = self.status_bytes.decode(
+            errors="replace",
+        ).partition("\n")
+        usage_info = {
+            "wall_time_ms": round(wall_seconds * 1000, 1),
+            "cpu_time_ms": round((usage.ru_utime + usage.ru_stime) * 1000, 1),
+            # ru_maxrss is in kilobytes on Linux
+            "peak_memory_kb": max(usage.ru_maxrss - int(baseline or 0), 0),
+        }
+
+        error = self.error
+        if not error and error_type == "MemoryError":
+            error = "Memory Limit Exceeded"
+        elif not error and error_type:
+            error = error_type
+        elif not error and _killed(status):
+            # Killed by something other than us, i.e. the kernel OOM killer
+            error = "Memory Limit Exceeded"
+        elif not error and not os.WIFEXITED(status):
+            error = "Runtime Error"
+        if error:
+            return {"passed": False, "error": error, **usage_info}
+
+        actual = self.output.decode(errors="replace").strip()
+        expected = self.case["expected_output"].strip()
+        if actual != expected:
+            return {
+                "passed": False,
+                "error": "Wrong Answer",
+                "expected": expected,
+                "actual": actual,
+                **usage_info,
+            }
+        return {"passed": True, **usage_info}
+
+
+def _serve_pipes(running: dict[int, CaseProcess]) -> None:
+    """Wait until a child's pipe is ready or a deadline passes, then serve it."""
+    readers = {
+        fd: child for child in running.values() for fd in child.open_readers
+    }
+    writers = {
+        child.stdin_w: child for child in running.values() if child.stdin_w >= 0
+    }
+    timeout = min(child.deadline for child in running.values()) - time.monotonic()
+    readable, writable, _ = select.select(
+        list(readers), list(writers), [], max(timeout, 0),
+    )
+    for fd in writable:
+        writers[fd].write_input()
+    for fd in readable:
+        readers[fd].read_output(fd)
+
+
+def _finish_done(
+    running: dict[int, CaseProcess],
+    outcomes: list[dict],
+    on_finish: Callable[[int, dict], None] | None,
+) -> bool:
+    """Record the verdicts of decided children; return whether one failed."""
+    failed = False
+    now = time.monotonic()
+    for index, child in list(running.items()):
+        child.check_deadline(now)
+        if child.done:
+            outcomes[index] = child.finish()
+            del running[index]
+            failed = failed or not outcomes[index]["passed"]
+            if on_finish is not None:
+                on_finish(index, outcomes[index])
+    return failed
+
+
+def run_cases(
+    code_dir: str,
+    cases: list[dict],
+    settings: RunSettings,
+    *,  # Force keyword arguments after this point
+    on_start: Callable[[int], None] | None = None,
+    on_finish: Callable[[int, dict], None] | None = None,
+) -> list[dict]:
+    """Run every case against the solution in ``code_dir``.
+
+    Up to ``settings.workers`` children run at once, starting cases in
+    ``settings.order`` (case indices, default: as listed). Each child's
+    time limit starts when it is forked, and verdicts are returned in case
+    order.
+
+    With ``settings.fail_fast``, the first failure stops the run: children
+    still running are killed and every case without a verdict is reported
+    as skipped.
+
+    Each child may allocate up to ``settings.memory_limit_mb`` beyond the
+    interpreter it inherits.
+
+    ``on_start`` is called with the case index when a child is forked, and
+    ``on_finish`` with the index and verdict as soon as that case is
+    decided, so progress can be reported live.
+    """
+    if code_dir not in sys.path:
+        sys.path.insert(0, code_dir)
+    try:
+        code = compile_solution(code_dir)
+    except SyntaxError as e:
+        return [{"passed": False, "error": type(e).__name__} for _ in cases]
+
+    outcomes: list[dict] = [{} for _ in cases]
+    queued = settings.run_order(cases)
+    queued.reverse()
+    running: dict[int, CaseProcess] = {}
+
+    while queued or running:
+        while queued and len(running) < settings.workers:
+            index = queued.pop()
+            running[index] = CaseProcess(
+                code,
+                cases[index],
+                settings.time_limit_seconds,
+                settings.memory_limit_mb,
+            )
+            if on_start is not None:
+                on_start(index)
+
+        _serve_pipes(running)
+        failed = _finish_done(running, outcomes, on_finish)
+        if settings.fail_fast and failed:
+            queued.clear()
+            for child in running.values():
+                child.cancel()
+            running.clear()
+
+    return [outcome or dict(SKIPPED) for outcome in outcomes]
@@ -0,0 +1,146 @@
+"""Tests for running test cases in forked children."""
+
+import time
+from pathlib import Path
+
+from fork_server import SKIPPED, RunSettings, run_cases
+
+
+def run(tmp_path: Path, source: str, cases: list[dict], **settings: object) -> list:
+    """Run ``cases`` against ``source`` with a one second time limit."""
+    (tmp_path / "solution.py").write_text(source, encoding="utf-8")
+    return run_cases(str(tmp_path), cases, RunSettings(1, **settings))
+
+
+def case(stdin: str, expected: str) -> dict:
+    """Return a case with the given input and expected output."""
+    return {"input": stdin, "expected_output": expected}
+
+
+def test_verdicts_per_case(tmp_path: Path) -> None:
+    """Each case gets its own verdict, with the output of wrong answers."""
+    source = "a, b = map(int, input().split())\nprint(a // b)\n"
+    outcomes = run(
+        tmp_path,
+        source,
+        [case("6 3", "2"), case("6 2", "4"), case("1 0", "0")],
+    )
+    assert [outcome["passed"] for outcome in outcomes] == [True, False, False]
+    assert outcomes[1]["error"] == "Wrong Answer"
+    assert (outcomes[1]["expected"], outcomes[1]["actual"]) == ("4", "3")
+    assert outcomes[2]["error"] == "ZeroDivisionError"
+    for outcome in outcomes:
+        assert outcome["wall_time_ms"] >= 0
+        assert outcome["cpu_time_ms"] >= 0
+
+
+def test_module_state_does_not_leak(tmp_path: Path) -> None:
+    """Every case starts from the state the solution had before any ran."""
+    source = (
+        "import builtins\n"
+        "builtins.runs = getattr(builtins, 'runs', 0) + 1\n"
+        "print(builtins.runs)\n"
+    )
+    outcomes = run(tmp_path, source, [case("", "1")] * 3)
+    assert all(outcome["passed"] for outcome in outcomes)
+
+
+def test_exit_codes(tmp_path: Path) -> None:
+    """Exiting with status 0 passes; any other status is an error."""
+    source = "import sys\nprint('ok')\nsys.exit(int(input()))\n"
+    outcomes = run(tmp_path, source, [case("0", "ok"), case("3", "ok")])
+    assert outcomes[0]["passed"]
+    assert outcomes[1]["error"] == "SystemExit"
+
+
+def test_time_limit(tmp_path: Path) -> None:
+    """A case that runs past its limit is killed and reported."""
+    source = "if input() == 'spin':\n    while True:\n        pass\nprint('done')\n"
+    outcomes = run(tmp_path, source, [case("spin", "done"), case("stop", "done")])
+    assert not outcomes[0]["passed"]
+    assert outcomes[0]["error"] == "Time Limit Exceeded"
+    assert outcomes[1]["passed"]
+
+
+def test_syntax_error_fails_every_case(tmp_path: Path) -> None:
+    """A solution that does not compile fails all cases without forking."""
+    outcomes = run(tmp_path, "print(", [case("", "")] * 2)
+    assert outcomes == [{"passed": False, "error": "SyntaxError"}] * 2
+
+
+def test_large_input_and_output(tmp_path: Path) -> None:
+    """Input and output larger than a pipe buffer are passed through whole."""
+    text = "x" * 1_000_000
+    outcomes = run(tmp_path, "print(input())\n", [case(text, text)])
+    assert outcomes[0]["passed"]
+
+
+def test_cases_run_in_parallel(tmp_path: Path) -> None:
+    """Cases share the worker slots, and verdicts come back in case order."""
+    source = "import time\nn = input()\ntime.sleep(0.4)\nprint(n)\n"
+    cases = [case(str(n), str(n)) for n in range(4)]
+    started = time.monotonic()
+    outcomes = run(tmp_path, source, cases, workers=4)
+    assert time.monotonic() - started < 1.2
+    assert all(outcome["passed"] for outcome in outcomes)
+    # Each case's time limit runs from its own start, not the run's
+    outcomes = run(tmp_path, source, cases * 2, workers=2)
+    assert all(outcome["passed"] for outcome in outcomes)
+
+
+def test_run_order_and_callbacks(tmp_path: Path) -> None:
+    """Cases start in the given order and are reported as they finish."""
+    started, finished = [], []
+    (tmp_path / "solution.py").write_text("print(input())\n", encoding="utf-8")
+    outcomes = run_cases(
+        str(tmp_path),
+        [case("a", "a"), case("b", "b"), case("c", "c")],
+        RunSettings(1, order=[2, 0, 1]),
+        on_start=started.append,
+        on_finish=lambda index, outcome: finished.append((index, outcome["passed"])),
+    )
+    assert started == [2, 0, 1]
+    assert finished == [(2, True), (0, True), (1, True)]
+    assert all(outcome["passed"] for outcome in outcomes)
+
+
+def test_fail_fast_skips_the_rest(tmp_path: Path) -> None:
+    """With fail_fast the first failure stops the run."""
+    source = "n = int(input())\nprint(n if n != 1 else -1)\n"
+    cases = [case(str(n), str(n)) for n in range(4)]
+    outcomes = run(tmp_path, source, cases, fail_fast=True)
+    assert outcomes[0]["passed"]
+    assert outcomes[1]["error"] == "Wrong Answer"
+    assert outcomes[2:] == [SKIPPED, SKIPPED]
+    outcomes = run(tmp_path, source, cases, fail_fast=True, order=[3, 2, 1, 0])
+    assert [outcome["passed"] for outcome in outcomes[1:]] == [False, True, True]
+    assert outcomes[0] == SKIPPED
+
+
+def test_peak_memory_is_the_case_own(tmp_path: Path) -> None:
+    """Peak memory counts what the case allocated, not the inherited parent."""
+    inherited = bytearray(64 * 1024 * 1024)
+    inherited[::4096] = b"x" * len(inherited[::4096])
+    source = (
+        "size = int(input()) * 1024 * 1024\n"
+        "data = bytearray(size)\n"
+        "data[::4096] = b'x' * len(data[::4096])\n"
+        "print('ok')\n"
+    )
+    small, large = run(tmp_path, source, [case("0", "ok"), case("40", "ok")])
+    assert small["peak_memory_kb"] < 16 * 1024
+    assert 36 * 1024 < large["peak_memory_kb"] < 60 * 1024
+    del inherited
+
+
+def test_memory_limit(tmp_path: Path) -> None:
+    """Allocating past the limit fails the case with its own verdict."""
+    source = "data = bytearray(int(input()) * 1024 * 1024)\nprint('ok')\n"
+    outcomes = run(
+        tmp_path,
+        source,
+        [case("200", "ok"), case("10", "ok")],
+        memory_limit_mb=64,
+    )
+    assert outcomes[0]["error"] == "Memory Limit Exceeded"
+    assert outcomes[1]["passed"]
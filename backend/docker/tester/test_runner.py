@@ -1,93 +1,404 @@
 """TestRunner."""
 
-import glob
 import json
 import os
 import shutil
 import sys
+from collections.abc import Callable
+from pathlib import Path
 
+import fork_server
 import pytest
 
+HARNESS_PATH = Path(__file__).resolve().parent / "case_harness.py"
+SUBMISSIONS_DIR = Path("/submissions")
+USAGE_KEYS = ("wall_time_ms", "cpu_time_ms", "peak_memory_kb")
 
-def run_tests() -> bool:
-    """Run all test cases against the user solution and generate a results report."""
+
+class ResultCollector:
+    """Pytest plugin that feeds manifest cases to the harness.
+
+    Outcomes are kept in memory instead of being written to a report file.
+    """
+
+    def __init__(
+        self,
+        cases: list[dict],
+        time_limit_seconds: int,
+        memory_limit_mb: float | None = None,
+        on_start: Callable[[str], None] | None = None,
+        on_finish: Callable[[str], None] | None = None,
+    ) -> None:
+        """Start with the cases to parametrize and no recorded outcomes.
+
+        ``on_start`` and ``on_finish`` are called with the case id as each
+        case starts and once its last phase is reported.
+        """
+        self.cases = [
+            {
+                **case,
+                "time_limit_seconds": time_limit_seconds,
+                "memory_limit_mb": memory_limit_mb,
+            }
+            for case in cases
+        ]
+        self.on_start = on_start
+        self.on_finish = on_finish
+        self.failures: dict[str, str] = {}
+        self.usage: dict[str, dict] = {}
+        self.seen: set[str] = set()
+
+    @staticmethod
+    def case_id(nodeid: str) -> str:
+        """Extract the manifest case id from a parametrized node id."""
+        return nodeid.rsplit("[", 1)[-1].rstrip("]")
+
+    def pytest_generate_tests(self, metafunc: pytest.Metafunc) -> None:
+        """Parametrize the harness test with one call per manifest case."""
+        if "case" in metafunc.fixturenames:
+            metafunc.parametrize(
+                "case",
+                self.cases,
+                ids=[case["id"] for case in self.cases],
+            )
+
+    def pytest_runtest_setup(self) -> None:
+        """Forget any cached solution module so every case runs it afresh."""
+        sys.modules.pop("solution", None)
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        """Report that a case is starting."""
+        if self.on_start is not None:
+            self.on_start(self.case_id(nodeid))
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Record the first failure reported for each case."""
+        case_id = self.case_id(report.nodeid)
+        self.seen.add(case_id)
+        if report.when == "call":
+            # Measured by the harness through record_property
+            self.usage[case_id] = dict(report.user_properties)
+        if report.failed and case_id not in self.failures:
+            self.failures[case_id] = report.longreprtext
+        if report.when == "teardown" and self.on_finish is not None:
+            self.on_finish(case_id)
+
+    def outcome(self, case_id: str) -> dict:
+        """Return a case's verdict in the shape the fork server uses."""
+        if case_id not in self.seen:
+            return {"passed": False, "error": "Test case could not be collected"}
+        usage_info = self.usage.get(case_id, {})
+        if case_id not in self.failures:
+            return {"passed": True, **usage_info}
+        return {**parse_failure(self.failures[case_id]), **usage_info}
+
+
+def parse_failure(error_message: str) -> dict:
+    """Turn the harness's ``pytest.fail`` message into a verdict.
+
+    The harness fails with ``Time Limit Exceeded``, the exception type name,
+    or a JSON record of a wrong answer. Anything else, such as an error
+    raised outside the harness, is kept as the full pytest report.
+    """
+    for line in reversed(error_message.splitlines()):
+        if line.startswith("E ") and "Failed: " in line:
+            message = line.split("Failed: ", 1)[1].strip()
+            break
+    else:
+        return {"passed": False, "error": error_message}
+    try:
+        error_data = json.loads(message)
+    except json.JSONDecodeError:
+        return {"passed": False, "error": message}
+    if error_data.get("error_type") == "AssertionError":
+        return {
+            "passed": False,
+            "error": "Wrong Answer",
+            "expected": error_data["expected"],
+            "actual": error_data["actual"],
+        }
+    return {"passed": False, "error": message}
+
+
+def load_manifest(tests_dir: str) -> dict:
+    """Load the JSON lines manifest: a header line, then one line per case."""
+    with (Path(tests_dir) / "manifest.jsonl").open(encoding="utf-8") as f:
+        manifest = json.loads(f.readline())
+        manifest["cases"] = [json.loads(line) for line in f if line.strip()]
+    return manifest
+
+
+def run_pytest_session(
+    code_dir: str,
+    cases: list[dict],
+    settings: fork_server.RunSettings,
+    *,  # Force keyword arguments after this point
+    on_start: Callable[[int], None] | None = None,
+    on_finish: Callable[[int, dict], None] | None = None,
+) -> list[dict]:
+    """Run every case through the fixed harness in one pytest session.
+
+    Collection and plugin setup are paid once per submission rather than
+    once per case. Cases run in ``settings.order`` (case indices, default:
+    as listed); with ``settings.fail_fast`` pytest exits at the first
+    failure and the cases it did not reach are reported as skipped.
+    ``settings.workers`` is ignored. ``on_start`` and ``on_finish`` take the
+    same arguments as in ``fork_server.run_cases``.
+
+    Cases run in this process, so their peak memory cannot be told apart
+    and is not reported; the harness still caps what each case may
+    allocate at ``settings.memory_limit_mb``.
+    """
+    # Add code directory to path so we can import the solution
+    if code_dir not in sys.path:
+        sys.path.insert(0, code_dir)
+
+    index_of = {case["id"]: index for index, case in enumerate(cases)}
+    run_cases = [cases[index] for index in settings.run_order(cases)]
+    collector = ResultCollector(
+        run_cases,
+        settings.time_limit_seconds,
+        settings.memory_limit_mb,
+    )
+    if on_start is not None:
+        collector.on_start = lambda case_id: on_start(index_of[case_id])
+    if on_finish is not None:
+        def finished(case_id: str) -> None:
+            on_finish(index_of[case_id], collector.outcome(case_id))
+
+        collector.on_finish = finished
+    if cases:
+        pytest_args = ["-qs", "-p", "no:cacheprovider", str(HARNESS_PATH)]
+        if settings.fail_fast:
+            pytest_args.append("--exitfirst")
+        pytest.main(pytest_args, plugins=[collector])
+
+    outcomes = []
+    for case in cases:
+        skipped = case["id"] not in collector.seen and collector.failures
+        if skipped and settings.fail_fast:
+            outcomes.append(dict(fork_server.SKIPPED))
+        else:
+            outcomes.append(collector.outcome(case["id"]))
+    return outcomes
+
+
+def build_test_result(case: dict, outcome: dict) -> dict:
+    """Turn a case's verdict into its entry in the results report."""
+    is_hidden = case["is_hidden"]
+    passed = outcome["passed"]
+    test_result = {
+        "test_name": f"test_{case['id']}",
+        "passed": passed,
+        "is_hidden": is_hidden,
+        "error": outcome.get("error", ""),
+    }
+
+    # For hidden test cases, don't reveal the exact error
+    if outcome.get("skipped"):
+        test_result["skipped"] = True
+    elif is_hidden and not passed:
+        test_result["error"] = "Hidden test case failed"
+    elif "expected" in outcome:
+        test_result["expected"] = outcome["expected"]
+        test_result["actual"] = outcome["actual"]
+
+    for key in USAGE_KEYS:
+        if key in outcome:
+            test_result[key] = outcome[key]
+    return test_result
+
+
+def execute(
+    code_dir: str,
+    tests_dir: str,
+    on_event: Callable[[dict], None] | None = None,
+) -> dict:
+    """Run all test cases against the solution and build the results report.
+
+    The manifest selects the execution mode: ``pytest`` runs the cases
+    through the fixed harness one after another, ``fork`` runs the cases in
+    children of a fork server, up to ``workers`` of them at a time. A
+    ``fail_fast`` header stops the run at the first failure, trying cases in
+    ``run_order``.
+
+    Every report entry carries the case's wall and CPU time, plus its peak
+    memory in ``fork`` mode. Both modes enforce ``memory_limit_mb``.
+
+    ``on_event`` receives a ``started`` event as each case starts and a
+    ``case`` event, holding its report entry, as soon as it is decided.
+    """
     results = {
         "passed": 0,
         "failed": 0,
+        "skipped": 0,
         "total": 0,
         "test_results": [],
     }
 
-    # Get all test files
-    test_files = glob.glob("/tests/test_*.py")
-    results["total"] = len(test_files)
-
-    # Create a temporary directory for pytest
-    os.makedirs("/app/pytest_temp", exist_ok=True)
+    manifest = load_manifest(tests_dir)
+    cases = manifest["cases"]
+    results["total"] = len(cases)
 
-    for test_file in test_files:
-        test_name = os.path.basename(test_file)
-        test_id = test_name.replace("test_", "").replace(".py", "")
-        is_hidden = "hidden" in test_id
-
-        # Run pytest for this test file
-        pytest_args = [
-            "-xvs",
-            test_file,
-            "--json-report",
-            "--json-report-file=/app/pytest_temp/report.json",
-        ]
+    callbacks = {}
+    if on_event is not None:
+        def on_start(index: int) -> None:
+            on_event({"type": "started", "test_name": f"test_{cases[index]['id']}"})
 
-        pytest_result = pytest.main(pytest_args)
+        def on_finish(index: int, outcome: dict) -> None:
+            on_event({"type": "case", **build_test_result(cases[index], outcome)})
 
-        # Determine if test passed
-        passed = pytest_result == 0
+        callbacks = {"on_start": on_start, "on_finish": on_finish}
 
-        # Get error message if test failed
-        error_message = ""
-        if not passed:
-            try:
-                with open("/app/pytest_temp/report.json") as f:
-                    report = json.load(f)
-
-                for test_result in report.get("tests", []):
-                    if test_result.get("outcome") == "failed":
-                        error_message = test_result.get("call", {}).get("longrepr", "")
-                        break
-            except Exception as e:
-                error_message = f"Error reading test results: {e!s}"
+    settings = fork_server.RunSettings.from_manifest(manifest)
+    if manifest.get("mode") == "fork":
+        outcomes = fork_server.run_cases(code_dir, cases, settings, **callbacks)
+    else:
+        outcomes = run_pytest_session(code_dir, cases, settings, **callbacks)
 
+    for case, outcome in zip(cases, outcomes, strict=True):
         # Update results
-        if passed:
+        if outcome["passed"]:
             results["passed"] += 1
+        elif outcome.get("skipped"):
+            results["skipped"] += 1
         else:
             results["failed"] += 1
 
-        # For hidden test cases, don't reveal the exact error
-        if is_hidden and not passed:
-            error_message = "Hidden test case failed"
+        results["test_results"].append(build_test_result(case, outcome))
+
+    return results
 
-        results["test_results"].append({
-            "test_name": test_name,
-            "passed": passed,
-            "is_hidden": is_hidden,
-            "error": error_message if not passed else "",
-        })
+
+def run_tests(
+    code_dir: str = "/code",
+    tests_dir: str = "/tests",
+    results_dir: str = "/results",
+    on_event: Callable[[dict], None] | None = None,
+) -> bool:
+    """Run all test cases against the user solution and generate a results report."""
+    results = execute(code_dir, tests_dir, on_event)
 
     # Write results to the mounted volume
-    with open("/results/results.json", "w") as f:
+    with (Path(results_dir) / "results.json").open("w", encoding="utf-8") as f:
         json.dump(results, f, indent=2)
 
-    # Clean up
-    shutil.rmtree("/app/pytest_temp", ignore_errors=True)
-
     # Exit with status code based on test results
     return results["failed"] == 0
 
+
+def open_channel() -> Callable[[dict], None]:
+    """Reserve the original stdout for JSON lines and return a writer for it.
+
+    Anything else written to stdout afterwards, such as pytest's progress
+    output, goes to stderr instead so it cannot corrupt the protocol.
+    """
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def write(message: dict) -> None:
+        channel.write(json.dumps(message) + "\n")
+
+    return write
+
+
+def serve() -> None:
+    """Serve submissions from a warm container until stdin is closed.
+
+    The container pool keeps this process alive so the interpreter and pytest
+    are only loaded once. Each request is a JSON line naming a submission
+    directory under ``/submissions``; each reply is a JSON line on the
+    original stdout, carrying the request's ``id``. Anything the tests print
+    is redirected to stderr so it cannot corrupt the protocol.
+
+    Requests with ``inline`` set come from submissions copied into the
+    container as an archive: the report is returned in the reply instead of
+    being written to disk, and the submission directory is removed.
+
+    Requests with ``stream`` set get ``{"event": ...}`` lines for every case
+    started and decided before the final reply.
+
+    Replies set ``recycle`` when the cases ran in this process (pytest
+    mode), where they could have left state behind for the next job.
+    """
+    reply = open_channel()
+    reply({"ready": True})
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get("ping"):
+            reply({"pong": True})
+            continue
+
+        base_dir = SUBMISSIONS_DIR / Path(request["job"]).name
+        request_id = request.get("id")
+        saved_path = list(sys.path)
+        on_event = None
+        if request.get("stream"):
+            def on_event(event: dict, request_id: str | None = request_id) -> None:
+                reply({"id": request_id, "event": event})
+        try:
+            tests_dir = str(base_dir / "tests")
+            recycle = load_manifest(tests_dir).get("mode") != "fork"
+            if request.get("inline"):
+                results = execute(
+                    code_dir=str(base_dir / "code"),
+                    tests_dir=tests_dir,
+                    on_event=on_event,
+                )
+                reply({
+                    "id": request_id,
+                    "ok": True,
+                    "passed": results["failed"] == 0,
+                    "results": results,
+                    "recycle": recycle,
+                })
+            else:
+                success = run_tests(
+                    code_dir=str(base_dir / "code"),
+                    tests_dir=tests_dir,
+                    results_dir=str(base_dir / "results"),
+                    on_event=on_event,
+                )
+                reply({
+                    "id": request_id,
+                    "ok": True,
+                    "passed": success,
+                    "recycle": recycle,
+                })
+        except Exception as e:  # noqa: BLE001 - the failure is the job's reply
+            reply({
+                "id": request_id,
+                "ok": False,
+                "error": f"{type(e).__name__}: {e!s}",
+            })
+        finally:
+            if request.get("inline"):
+                shutil.rmtree(base_dir, ignore_errors=True)
+            # Forget the solution and test modules so the next job starts clean
+            sys.path[:] = saved_path
+            for name, module in list(sys.modules.items()):
+                module_file = getattr(module, "__file__", None)
+                if module_file and Path(module_file).is_relative_to(base_dir):
+                    del sys.modules[name]
+
+
 if __name__ == "__main__":
-    # Add code directory to path so we can import the solution
-    sys.path.append("/code")
+    if "--serve" in sys.argv:
+        serve()
+        sys.exit(0)
+
+    # With --events, stream case events as JSON lines on stdout
+    write_event = open_channel() if "--events" in sys.argv else None
+
+    # With --root, the job directories live under it instead of under /
+    root = Path(sys.argv[sys.argv.index("--root") + 1] if "--root" in sys.argv else "/")
 
     # Run tests and exit with appropriate status code
-    success = run_tests()
+    success = run_tests(
+        code_dir=str(root / "code"),
+        tests_dir=str(root / "tests"),
+        results_dir=str(root / "results"),
+        on_event=write_event,
+    )
     sys.exit(0 if success else 1)
@@ -0,0 +1,93 @@
+"""In-memory transfer of submissions to tester containers via the Docker SDK."""
+
+import functools
+import io
+import os
+import tarfile
+import time
+from pathlib import PurePosixPath
+
+import docker
+import requests
+from docker.models.containers import Container
+
+ARCHIVE_RUN_TIMEOUT_SECONDS = float(
+    os.environ.get("CODE_GYM_ARCHIVE_RUN_TIMEOUT_SECONDS", "300"),
+)
+
+
+@functools.cache
+def get_client() -> docker.DockerClient:
+    """Return the shared Docker client, connecting on first use."""
+    return docker.from_env()
+
+
+def build_archive(files: dict[str, str], directories: tuple[str, ...] = ()) -> bytes:
+    """Pack ``files`` (relative path to text) into an uncompressed tar.
+
+    Parent directories of every file, plus any extra ``directories``, are
+    added as world-writable entries so the tester can write results next to
+    the code it received.
+    """
+    all_dirs = set(directories)
+    for name in files:
+        all_dirs.update(str(parent) for parent in PurePosixPath(name).parents)
+    all_dirs.discard(".")
+
+    now = time.time()
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name in sorted(all_dirs):
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o777
+            info.mtime = now
+            tar.addfile(info)
+        for name, content in files.items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = now
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def fetch_file(container: Container, path: str) -> bytes | None:
+    """Read a single file out of a container, or None if it does not exist."""
+    try:
+        chunks, _ = container.get_archive(path)
+    except docker.errors.NotFound:
+        return None
+    with tarfile.open(fileobj=io.BytesIO(b"".join(chunks))) as tar:
+        for member in tar:
+            if member.isfile():
+                return tar.extractfile(member).read()
+    return None
+
+
+def run_archive(
+    image: str,
+    files: dict[str, str],
+    result_path: str,
+    directories: tuple[str, ...] = (),
+) -> bytes | None:
+    """Run a one-off container fed from memory and return one result file.
+
+    ``files`` are copied to ``/`` before the container starts. The result
+    file is read back once the container exits, or None if it never wrote
+    one (including when it is killed for exceeding the run timeout).
+    """
+    client = get_client()
+    container = client.containers.create(image)
+    try:
+        container.put_archive("/", build_archive(files, directories))
+        container.start()
+        try:
+            container.wait(timeout=ARCHIVE_RUN_TIMEOUT_SECONDS)
+        except requests.exceptions.RequestException:
+            container.kill()
+            return None
+        return fetch_file(container, result_path)
+    finally:
+        container.remove(force=True)
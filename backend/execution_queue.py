@@ -0,0 +1,208 @@
+"""SQLite-backed queue of execution jobs shared by API nodes and workers."""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+EXECUTION_QUEUE_PATH = os.environ.get(
+    "CODE_GYM_EXECUTION_QUEUE_PATH",
+    str(Path.cwd() / "execution_queue.db"),
+)
+# A claimed job whose worker has not finished it by then is handed out again
+EXECUTION_LEASE_SECONDS = float(
+    os.environ.get("CODE_GYM_EXECUTION_LEASE_SECONDS", "600"),
+)
+EXECUTION_RETENTION_SECONDS = float(
+    os.environ.get("CODE_GYM_EXECUTION_RETENTION_SECONDS", "3600"),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    image TEXT NOT NULL,
+    job_name TEXT NOT NULL,
+    files TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    report TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    claimed_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class ExecutionQueue:
+    """Durable job queue in one SQLite file.
+
+    API nodes enqueue jobs and poll for their reports; workers claim jobs,
+    append events while running them and store the report. A claim is a
+    lease: if a worker dies, its job is handed to another worker once
+    ``lease_seconds`` have passed. Any file system all nodes can lock
+    SQLite files on works; a real broker can replace it behind the same
+    methods.
+    """
+
+    def __init__(
+        self,
+        path: str = EXECUTION_QUEUE_PATH,
+        lease_seconds: float = EXECUTION_LEASE_SECONDS,
+        retention_seconds: float = EXECUTION_RETENTION_SECONDS,
+    ) -> None:
+        """Open the queue file, creating its tables if needed."""
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the queue safe to share across threads
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def enqueue(self, image: str, job_name: str, files: dict[str, str]) -> str:
+        """Add a job and return its ID."""
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, image, job_name, files, status, created_at)"
+                " VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, image, job_name, json.dumps(files), now),
+            )
+            self._purge(connection, now)
+        return job_id
+
+    def claim(self, worker: str) -> dict[str, Any] | None:
+        """Take the oldest queued (or abandoned) job for ``worker``, if any."""
+        now = time.time()
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT id, image, job_name, files FROM jobs"
+                " WHERE status = 'queued' OR (status = 'running' AND claimed_at < ?)"
+                " ORDER BY created_at LIMIT 1",
+                (now - self.lease_seconds,),
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, claimed_at = ?"
+                    " WHERE id = ?",
+                    (worker, now, row["id"]),
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "image": row["image"],
+            "job_name": row["job_name"],
+            "files": json.loads(row["files"]),
+        }
+
+    def add_event(self, job_id: str, event: dict[str, Any]) -> None:
+        """Append a progress event to a running job."""
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "INSERT INTO events (job_id, seq, event) VALUES (?,"
+                " (SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE job_id = ?), ?)",
+                (job_id, job_id, json.dumps(event)),
+            )
+
+    def events_since(self, job_id: str, seq: int) -> list[tuple[int, dict[str, Any]]]:
+        """Return the job's events after sequence number ``seq``."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT seq, event FROM events WHERE job_id = ? AND seq > ?"
+                " ORDER BY seq",
+                (job_id, seq),
+            ).fetchall()
+        return [(row["seq"], json.loads(row["event"])) for row in rows]
+
+    def complete(self, job_id: str, report: dict[str, Any] | None) -> None:
+        """Store the report of a finished job; None means no report was produced."""
+        self._finish(job_id, "done", report=json.dumps(report))
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job as failed with ``error``."""
+        self._finish(job_id, "failed", error=error)
+
+    def cancel(self, job_id: str, error: str) -> bool:
+        """Withdraw a job nobody waits for any more; False if it already finished.
+
+        A queued job is never handed out, and the report of a running one
+        is discarded when its worker finishes.
+        """
+        return self._finish(job_id, "cancelled", error=error)
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        report: str | None = None,
+        error: str | None = None,
+    ) -> bool:
+        """Move an unfinished job to ``status``; False if it was finished."""
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, report = ?, error = ?, finished_at = ?,"
+                " files = '{}' WHERE id = ? AND status IN ('queued', 'running')",
+                (status, report, error, time.time(), job_id),
+            )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """Return a job's status, report and error."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT status, worker, report, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "status": row["status"],
+            "worker": row["worker"],
+            "report": json.loads(row["report"]) if row["report"] else None,
+            "error": row["error"],
+        }
+
+    def stats(self) -> dict[str, int]:
+        """Return job counts by status."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT status, COUNT(*) AS count FROM jobs GROUP BY status",
+            ).fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def _purge(self, connection: sqlite3.Connection, now: float) -> None:
+        """Delete finished jobs and their events after the retention period."""
+        cutoff = now - self.retention_seconds
+        connection.execute(
+            "DELETE FROM events WHERE job_id IN"
+            " (SELECT id FROM jobs WHERE finished_at < ?)",
+            (cutoff,),
+        )
+        connection.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
@@ -0,0 +1,76 @@
+"""Tests for the shared execution queue and the remote executor."""
+
+from pathlib import Path
+
+import pytest
+from execution_queue import ExecutionQueue
+from executors import RemoteExecutor
+
+
+@pytest.fixture
+def queue(tmp_path: Path) -> ExecutionQueue:
+    """Return an empty queue in a temporary file."""
+    return ExecutionQueue(str(tmp_path / "queue.db"), lease_seconds=60)
+
+
+def test_claim_complete_and_events(queue: ExecutionQueue) -> None:
+    """A worker claims the oldest job, records events and stores the report."""
+    first = queue.enqueue("code-gym-tester", "a", {"code/solution.py": "print(1)"})
+    queue.enqueue("code-gym-tester", "b", {})
+    job = queue.claim("worker-1")
+    assert job["id"] == first
+    assert job["files"] == {"code/solution.py": "print(1)"}
+
+    queue.add_event(first, {"case": 1})
+    queue.add_event(first, {"case": 2})
+    assert [event for _, event in queue.events_since(first, 1)] == [{"case": 2}]
+
+    queue.complete(first, {"total": 2})
+    assert queue.get(first)["status"] == "done"
+    assert queue.get(first)["report"] == {"total": 2}
+    assert queue.stats() == {"done": 1, "queued": 1}
+
+
+def test_expired_lease_is_claimed_again(tmp_path: Path) -> None:
+    """A job whose worker went quiet is handed to another worker."""
+    queue = ExecutionQueue(str(tmp_path / "queue.db"), lease_seconds=-1)
+    job_id = queue.enqueue("code-gym-tester", "a", {})
+    assert queue.claim("worker-1")["id"] == job_id
+    assert queue.claim("worker-2")["id"] == job_id
+    assert queue.get(job_id)["worker"] == "worker-2"
+
+
+def test_cancelled_job_is_not_claimed(queue: ExecutionQueue) -> None:
+    """Cancelling a queued job keeps workers away from it."""
+    job_id = queue.enqueue("code-gym-tester", "a", {})
+    assert queue.cancel(job_id, "gone")
+    assert queue.claim("worker-1") is None
+    assert queue.get(job_id)["status"] == "cancelled"
+    assert queue.get(job_id)["error"] == "gone"
+
+
+def test_report_of_cancelled_job_is_discarded(queue: ExecutionQueue) -> None:
+    """A worker that finishes a cancelled job does not revive it."""
+    job_id = queue.enqueue("code-gym-tester", "a", {})
+    queue.claim("worker-1")
+    queue.cancel(job_id, "gone")
+    queue.complete(job_id, {"total": 1})
+    assert queue.get(job_id)["status"] == "cancelled"
+    assert queue.get(job_id)["report"] is None
+
+
+def test_finished_job_cannot_be_cancelled(queue: ExecutionQueue) -> None:
+    """Cancelling reports False once the job has a report."""
+    job_id = queue.enqueue("code-gym-tester", "a", {})
+    queue.claim("worker-1")
+    queue.complete(job_id, {"total": 1})
+    assert not queue.cancel(job_id, "gone")
+    assert queue.get(job_id)["status"] == "done"
+
+
+def test_remote_executor_cancels_on_timeout(queue: ExecutionQueue) -> None:
+    """A job without a report by the deadline is cancelled, not left queued."""
+    executor = RemoteExecutor(queue, wait_seconds=0.05, poll_seconds=0.01)
+    assert executor.execute("code-gym-tester", "a", {}) is None
+    assert queue.stats() == {"cancelled": 1}
+    assert queue.claim("worker-1") is None
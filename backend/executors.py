@@ -0,0 +1,293 @@
+"""Execution backends that run a tester image against a submission's files."""
+
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from container_pool import PoolError, PoolJobError, get_pool
+from docker_archive import run_archive
+from execution_queue import ExecutionQueue
+from languages import language_for_image
+from workspace import WORKSPACE_ROOT
+
+# "local" runs tester containers on this host, "remote" hands jobs to workers,
+# "sandbox" runs the tester on this host without a container
+EXECUTOR_BACKEND = os.environ.get("CODE_GYM_EXECUTOR", "local")
+# Backends a request may pick instead of the deployment's, comma-separated
+REQUEST_EXECUTORS = {
+    name.strip()
+    for name in os.environ.get("CODE_GYM_REQUEST_EXECUTORS", "").split(",")
+    if name.strip()
+}
+REMOTE_WAIT_SECONDS = float(os.environ.get("CODE_GYM_REMOTE_WAIT_SECONDS", "600"))
+REMOTE_POLL_SECONDS = float(os.environ.get("CODE_GYM_REMOTE_POLL_SECONDS", "0.05"))
+SANDBOX_CPU_SECONDS = int(os.environ.get("CODE_GYM_SANDBOX_CPU_SECONDS", "60"))
+SANDBOX_MEMORY_MB = int(os.environ.get("CODE_GYM_SANDBOX_MEMORY_MB", "2048"))
+SANDBOX_FILE_SIZE_MB = int(os.environ.get("CODE_GYM_SANDBOX_FILE_SIZE_MB", "16"))
+SANDBOX_MAX_PROCESSES = int(os.environ.get("CODE_GYM_SANDBOX_MAX_PROCESSES", "256"))
+SANDBOX_SCRIPT = Path(__file__).parent / "sandbox.py"
+# Kept from sandboxed runs: the backend with its config and databases, the
+# other submissions and the other sandboxes' job directories
+SANDBOX_HIDDEN = (Path(__file__).parent, WORKSPACE_ROOT, Path(tempfile.gettempdir()))
+# Characters of the sandbox's stderr quoted when it fails
+SANDBOX_STDERR_TAIL = 2000
+
+
+class Executor(ABC):
+    """Runs one job and returns the tester's report.
+
+    A job is a tester image plus the files to place in it, keyed by path
+    relative to ``/`` (``code/solution.py``, ``tests/manifest.jsonl``).
+    """
+
+    @abstractmethod
+    def execute(
+        self,
+        image: str,
+        job_name: str,
+        files: dict[str, str],
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any] | None:
+        """Run the job and return its report, or None if none was produced.
+
+        ``on_event`` receives the tester's per-case events while it runs.
+        """
+
+
+class LocalDockerExecutor(Executor):
+    """Runs jobs on this host's Docker daemon.
+
+    Jobs go to a warm container from the pool when pooling is enabled, or
+    to a one-off container when it is off, cannot take the job before it
+    starts, or times out on it; only the pool streams events while the
+    tests run.
+    """
+
+    def execute(
+        self,
+        image: str,
+        job_name: str,
+        files: dict[str, str],
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any] | None:
+        """Run the job in a local container and return its report."""
+        try:
+            pool = get_pool(image)
+            if pool is not None:
+                return pool.run_archive_job(job_name, files, on_event)
+        except PoolJobError as e:
+            # The job may have run already; do not run the submission twice
+            error_msg = f"Warm container failed the job: {e}"
+            raise RuntimeError(error_msg) from e
+        except (PoolError, OSError):
+            # Fall back to a one-off container below, also after a timeout:
+            # the pool replaces a container that stopped answering
+            pass
+
+        results = run_archive(
+            image,
+            files,
+            "/results/results.json",
+            directories=("results",),
+        )
+        return json.loads(results) if results is not None else None
+
+
+class RemoteExecutor(Executor):
+    """Hands jobs to worker nodes through the shared execution queue.
+
+    The API node only enqueues the job, relays the events the worker
+    records, and picks up the report; no container runs on this host.
+    """
+
+    def __init__(
+        self,
+        queue: ExecutionQueue,
+        wait_seconds: float = REMOTE_WAIT_SECONDS,
+        poll_seconds: float = REMOTE_POLL_SECONDS,
+    ) -> None:
+        """Use ``queue`` and wait up to ``wait_seconds`` for each report."""
+        self.queue = queue
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+
+    def _relay_events(
+        self,
+        job_id: str,
+        seq: int,
+        on_event: Callable[[dict[str, Any]], None],
+    ) -> int:
+        """Pass on the job's events after ``seq``; return the last one's number."""
+        events = self.queue.events_since(job_id, seq)
+        for _, event in events:
+            on_event(event)
+        return events[-1][0] if events else seq
+
+    def execute(
+        self,
+        image: str,
+        job_name: str,
+        files: dict[str, str],
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any] | None:
+        """Enqueue the job and wait for a worker to report back.
+
+        A job with no report after ``wait_seconds`` is cancelled, so no
+        worker picks it up for a caller that is gone.
+        """
+        job_id = self.queue.enqueue(image, job_name, files)
+        deadline = time.monotonic() + self.wait_seconds
+        seq = 0
+        while time.monotonic() < deadline:
+            if on_event is not None:
+                seq = self._relay_events(job_id, seq, on_event)
+            job = self.queue.get(job_id)
+            if job is not None and job["status"] in ("done", "failed"):
+                if on_event is not None:
+                    self._relay_events(job_id, seq, on_event)
+                return job["report"]
+            time.sleep(self.poll_seconds)
+        error_msg = f"No worker reported back within {self.wait_seconds:g} seconds"
+        if self.queue.cancel(job_id, error_msg):
+            return None
+        # The job finished while it was being cancelled
+        job = self.queue.get(job_id)
+        return job["report"] if job is not None else None
+
+
+class SandboxExecutor(Executor):
+    """Runs jobs on this host in a confined child process, for trusted code.
+
+    The tester of the image's language runs straight from ``docker/``
+    against a private temporary directory, under the rlimits and
+    namespaces of ``sandbox.py``, which hide this backend, the workspaces
+    and other sandboxes' directories. There is no container to start, so a
+    run costs little more than the cases themselves, but the confinement is
+    far weaker than Docker's.
+    """
+
+    def execute(
+        self,
+        image: str,
+        job_name: str,
+        files: dict[str, str],
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any] | None:
+        """Run the job in a sandboxed child process and return its report.
+
+        Security note: The command is built from this interpreter, the
+        sandbox script next to this module, a fresh temporary directory,
+        integer settings, fixed directories and the language's constant
+        tester command; no part of it comes from the submission.
+        """
+        language = language_for_image(image)
+        # V8 reserves far more address space than it uses, so JS runs are
+        # capped by their data segment, which also holds Buffers, instead
+        if language.limit_address_space:
+            memory_mb, data_mb = SANDBOX_MEMORY_MB, 0
+        else:
+            memory_mb, data_mb = 0, SANDBOX_MEMORY_MB
+        with tempfile.TemporaryDirectory(
+            prefix=f"code-gym-sandbox-{job_name}-",
+        ) as job_dir:
+            root = Path(job_dir)
+            for name, content in files.items():
+                path = root / name
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(content, encoding="utf-8")
+            for directory in ("results", "tmp"):
+                (root / directory).mkdir(exist_ok=True)
+
+            cmd = [
+                sys.executable, str(SANDBOX_SCRIPT), job_dir, "--events",
+                "--cpu-seconds", str(SANDBOX_CPU_SECONDS),
+                "--memory-mb", str(memory_mb),
+                "--data-mb", str(data_mb),
+                "--file-size-mb", str(SANDBOX_FILE_SIZE_MB),
+                "--max-processes", str(SANDBOX_MAX_PROCESSES),
+            ]
+            for path in SANDBOX_HIDDEN:
+                cmd.extend(["--hide", str(path)])
+            cmd.extend(["--", *language.host_command])
+            # A clean environment, so no host secrets reach the solution
+            env = {
+                "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+                "HOME": str(root / "tmp"),
+                "TMPDIR": str(root / "tmp"),
+                "PYTHONDONTWRITEBYTECODE": "1",
+            }
+            with tempfile.TemporaryFile() as stderr, subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                text=True,
+                env=env,
+                # Its own process group, so the whole run can be killed
+                start_new_session=True,
+            ) as process:
+                # RLIMIT_CPU does not cover time spent blocked, e.g. sleeping
+                watchdog = threading.Timer(
+                    SANDBOX_CPU_SECONDS,
+                    _kill_group,
+                    (process.pid,),
+                )
+                watchdog.start()
+                try:
+                    # The runner writes one JSON event per line on stdout
+                    for line in process.stdout:
+                        try:
+                            event = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if on_event is not None:
+                            on_event(event)
+                finally:
+                    watchdog.cancel()
+                    # Nothing the solution started outlives the run
+                    _kill_group(process.pid)
+                returncode = process.wait()
+                stderr.seek(0, os.SEEK_END)
+                stderr.seek(max(stderr.tell() - SANDBOX_STDERR_TAIL, 0))
+                stderr_tail = stderr.read().decode("utf-8", "replace").strip()
+
+            results_path = root / "results" / "results.json"
+            if not results_path.exists():
+                if returncode != 0 and stderr_tail:
+                    error_msg = f"Sandbox failed: {stderr_tail}"
+                    raise RuntimeError(error_msg)
+                return None
+            return json.loads(results_path.read_text(encoding="utf-8"))
+
+
+def _kill_group(pgid: int) -> None:
+    """Kill every process in the process group ``pgid``, if any is left."""
+    with contextlib.suppress(ProcessLookupError):
+        os.killpg(pgid, signal.SIGKILL)
+
+
+_executors: dict[str, Executor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(backend: str | None = None) -> Executor:
+    """Return the executor for ``backend``, by default ``CODE_GYM_EXECUTOR``'s."""
+    backend = backend or EXECUTOR_BACKEND
+    with _executors_lock:
+        if backend not in _executors:
+            if backend == "remote":
+                _executors[backend] = RemoteExecutor(ExecutionQueue())
+            elif backend == "sandbox":
+                _executors[backend] = SandboxExecutor()
+            else:
+                _executors[backend] = LocalDockerExecutor()
+        return _executors[backend]
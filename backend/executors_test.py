@@ -0,0 +1,138 @@
+"""Tests for the execution backends and the remote worker loop."""
+
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import executors
+import pytest
+from container_pool import PoolJobError, PoolTimeoutError
+from execution_queue import ExecutionQueue
+from executors import (
+    Executor,
+    LocalDockerExecutor,
+    RemoteExecutor,
+    SandboxExecutor,
+    get_executor,
+)
+from worker import run_next_job
+
+
+class ScriptedExecutor(Executor):
+    """Reports a few case events and then a fixed report."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        """Fail every job with ``error`` if given."""
+        self.error = error
+
+    def execute(
+        self,
+        image: str,
+        job_name: str,
+        files: dict[str, str],
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any] | None:
+        """Report one event per file, then the job's name and image."""
+        for name in sorted(files):
+            on_event({"type": "case", "file": name})
+        if self.error is not None:
+            raise self.error
+        return {"job": job_name, "image": image}
+
+
+class FailingPool:
+    """A pool whose every job fails with ``error``."""
+
+    def __init__(self, error: Exception) -> None:
+        """Fail jobs with ``error``."""
+        self.error = error
+
+    def run_archive_job(self, *_args: object) -> dict[str, Any]:
+        """Fail the job."""
+        raise self.error
+
+
+@pytest.fixture
+def queue(tmp_path: Path) -> ExecutionQueue:
+    """Return an empty queue in a temporary file."""
+    return ExecutionQueue(str(tmp_path / "queue.db"), lease_seconds=60)
+
+
+def serve_one_job(queue: ExecutionQueue, executor: Executor) -> threading.Thread:
+    """Run the next job that arrives on ``queue`` on a worker thread."""
+
+    def work() -> None:
+        while not run_next_job(queue, executor, "worker-1"):
+            time.sleep(0.01)
+
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+    return worker
+
+
+def test_remote_job_relays_events_and_report(queue: ExecutionQueue) -> None:
+    """A worker's events reach the caller in order, before its report."""
+    worker = serve_one_job(queue, ScriptedExecutor())
+    received = []
+    executor = RemoteExecutor(queue, wait_seconds=5, poll_seconds=0.01)
+    files = {f"tests/{index}.json": "" for index in range(5)}
+    report = executor.execute("code-gym-tester", "a", files, received.append)
+    worker.join(5)
+    assert report == {"job": "a", "image": "code-gym-tester"}
+    assert [event["file"] for event in received] == sorted(files)
+
+
+def test_remote_job_failure_has_no_report(queue: ExecutionQueue) -> None:
+    """A job that fails on the worker is recorded with its error."""
+    worker = serve_one_job(queue, ScriptedExecutor(OSError("no docker")))
+    executor = RemoteExecutor(queue, wait_seconds=5, poll_seconds=0.01)
+    assert executor.execute("code-gym-tester", "a", {}) is None
+    worker.join(5)
+    assert queue.stats() == {"failed": 1}
+
+
+@pytest.fixture
+def one_off_runs(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record one-off container runs instead of starting them."""
+    images = []
+
+    def run_archive(image: str, *_args: object, **_kwargs: object) -> str:
+        images.append(image)
+        return '{"total": 0}'
+
+    monkeypatch.setattr(executors, "run_archive", run_archive)
+    return images
+
+
+def test_local_pool_timeout_runs_one_off(
+    one_off_runs: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A warm container that times out is replaced by a one-off container."""
+    pool = FailingPool(PoolTimeoutError("timed out"))
+    monkeypatch.setattr(executors, "get_pool", lambda _image: pool)
+    report = LocalDockerExecutor().execute("code-gym-tester", "a", {})
+    assert report == {"total": 0}
+    assert one_off_runs == ["code-gym-tester"]
+
+
+def test_local_failed_pool_job_is_not_run_again(
+    one_off_runs: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A job that failed on a warm container fails without a second run."""
+    pool = FailingPool(PoolJobError("bad reply"))
+    monkeypatch.setattr(executors, "get_pool", lambda _image: pool)
+    with pytest.raises(RuntimeError, match="bad reply"):
+        LocalDockerExecutor().execute("code-gym-tester", "a", {})
+    assert one_off_runs == []
+
+
+def test_executors_are_shared_per_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Each backend name maps to one shared executor of its kind."""
+    monkeypatch.setattr(executors, "_executors", {})
+    assert isinstance(get_executor("sandbox"), SandboxExecutor)
+    assert isinstance(get_executor("local"), LocalDockerExecutor)
+    assert get_executor("sandbox") is get_executor("sandbox")
@@ -0,0 +1,168 @@
+"""Bounded queue of submission jobs drained by a pool of worker threads."""
+
+import itertools
+import os
+import queue
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+JOB_WORKERS = int(os.environ.get("CODE_GYM_JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.environ.get("CODE_GYM_JOB_QUEUE_SIZE", "100"))
+JOB_RETENTION_SECONDS = float(
+    os.environ.get("CODE_GYM_JOB_RETENTION_SECONDS", "3600"),
+)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """One submission waiting for, running on, or finished by a worker."""
+
+    def __init__(
+        self,
+        run: Callable[[], dict[str, Any]],
+        details: dict[str, object],
+        job_id: str | None = None,
+    ) -> None:
+        """Create a queued job that will call ``run`` for its results."""
+        self.job_id = job_id or str(uuid.uuid4())
+        self.run = run
+        self.details = details
+        self.status = "queued"
+        self.queued_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.results: dict[str, Any] | None = None
+        self.error: str | None = None
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the job's public state."""
+        state = {
+            "submission_id": self.job_id,
+            "status": self.status,
+            **self.details,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.results is not None:
+            state["results"] = self.results
+        if self.error is not None:
+            state["error"] = self.error
+        return state
+
+
+class JobQueue:
+    """Runs submitted jobs on a fixed number of worker threads.
+
+    Submitting never blocks: when ``max_queued`` jobs are already waiting,
+    ``submit`` raises ``QueueFullError`` instead. Finished jobs are kept for
+    ``retention_seconds`` so their results can be fetched.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_queued: int = JOB_QUEUE_SIZE,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+    ) -> None:
+        """Create an idle queue; worker threads start with the first job."""
+        self.workers = max(workers, 1)
+        self.retention_seconds = retention_seconds
+        self._pending: queue.Queue[Job] = queue.Queue(maxsize=max(max_queued, 1))
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._counter = itertools.count(1)
+
+    def submit(
+        self,
+        run: Callable[[], dict[str, Any]],
+        job_id: str | None = None,
+        **details: object,
+    ) -> Job:
+        """Queue ``run`` and return its job; ``details`` are echoed in its state.
+
+        ``job_id`` lets the caller pick the ID, e.g. to share it with an
+        event stream created beforehand; a random one is used otherwise.
+        """
+        job = Job(run, details, job_id)
+        self._prune()
+        with self._lock:
+            try:
+                self._pending.put_nowait(job)
+            except queue.Full:
+                error_msg = "Submission queue is full"
+                raise QueueFullError(error_msg) from None
+            self._jobs[job.job_id] = job
+        self._start_workers()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Return the job with ``job_id``, or None if unknown or expired."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth and job counts by status."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts: dict[str, int] = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._pending.qsize(),
+            "max_queued": self._pending.maxsize,
+            "jobs": counts,
+        }
+
+    def _work_forever(self) -> None:
+        while True:
+            job = self._pending.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                results = job.run()
+            except Exception as e:  # noqa: BLE001 - the failure is the job's state
+                job.error = f"{type(e).__name__}: {e!s}"
+                status = "failed"
+            else:
+                job.results = results
+                status = "done"
+            job.finished_at = time.time()
+            job.run = None
+            # Set last so a poller never sees a finished job without its results
+            job.status = status
+            self._pending.task_done()
+
+    def _start_workers(self) -> None:
+        """Start the worker threads once."""
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work_forever,
+                    name=f"submission-worker-{next(self._counter)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period."""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+job_queue = JobQueue()
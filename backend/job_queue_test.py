@@ -0,0 +1,63 @@
+"""Tests for the bounded submission job queue."""
+
+import threading
+import time
+
+import pytest
+from job_queue import Job, JobQueue, QueueFullError
+
+
+def wait_for(job: Job, status: str) -> None:
+    """Wait up to five seconds for ``job`` to reach ``status``."""
+    deadline = time.monotonic() + 5
+    while job.status != status:
+        assert time.monotonic() < deadline, f"{job.status} != {status}"
+        time.sleep(0.01)
+
+
+def test_jobs_report_results_and_errors() -> None:
+    """Finished jobs carry their results, failed ones the error."""
+    jobs = JobQueue(workers=2)
+    done = jobs.submit(lambda: {"passed": 1}, problem_id="sum")
+    failed = jobs.submit(lambda: 1 / 0)
+    wait_for(done, "done")
+    wait_for(failed, "failed")
+    state = done.snapshot()
+    assert state["results"] == {"passed": 1}
+    assert state["problem_id"] == "sum"
+    assert state["started_at"] <= state["finished_at"]
+    assert failed.snapshot()["error"] == "ZeroDivisionError: division by zero"
+    assert jobs.get(done.job_id) is done
+    assert jobs.get("unknown") is None
+
+
+def test_caller_picks_the_job_id() -> None:
+    """A given job ID is used instead of a random one."""
+    jobs = JobQueue(workers=1)
+    job = jobs.submit(dict, job_id="stream-1")
+    assert job.job_id == "stream-1"
+    assert jobs.get("stream-1") is job
+
+
+def test_full_queue_rejects_jobs() -> None:
+    """Jobs beyond the queue size are rejected while the workers are busy."""
+    release = threading.Event()
+    jobs = JobQueue(workers=1, max_queued=1)
+    running = jobs.submit(lambda: release.wait(5) and {})
+    wait_for(running, "running")
+    queued = jobs.submit(dict)
+    with pytest.raises(QueueFullError):
+        jobs.submit(dict)
+    assert jobs.stats()["queued"] == 1
+    assert jobs.stats()["jobs"] == {"running": 1, "queued": 1}
+    release.set()
+    wait_for(queued, "done")
+
+
+def test_finished_jobs_expire() -> None:
+    """Finished jobs are forgotten after the retention period."""
+    jobs = JobQueue(workers=1, retention_seconds=0)
+    old = jobs.submit(dict)
+    wait_for(old, "done")
+    jobs.submit(dict)
+    assert jobs.get(old.job_id) is None
@@ -3,10 +3,10 @@
 import sys
 from pathlib import Path
 
-# Import the process_code_submission function for JavaScript
+# Import the submission flow, which runs JavaScript as well
 # Adjust the import path if necessary to match your project structure
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from js_submission_processor import process_code_submission
+from submission_processor import process_submission_flow
 
 
 def test_with_real_docker_js(
@@ -15,11 +15,12 @@ def test_with_real_docker_js(
     *,
     hidden: bool,
 ) -> dict | None:
-    """Test process_code_submission function with real Docker container for JS."""
+    """Test the submission flow with real Docker container for JS."""
     try:
-        return process_code_submission(
+        return process_submission_flow(
             user_code=user_code,
             problem_id=problem_id,
+            language="javascript",
             hidden=hidden,
         )
     except RuntimeError as exc:
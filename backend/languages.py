@@ -0,0 +1,95 @@
+"""Languages the submission engine can run, one plugin per language."""
+
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from preflight import check_javascript_syntax, check_python_syntax
+
+DOCKER_DIR = Path(__file__).parent / "docker"
+
+
+class Language(ABC):
+    """Everything the engine needs to know to run submissions in one language.
+
+    Each language is a subclass that sets the class attributes below. Every
+    tester image takes the command line of ``test_runner.py``
+    (``--serve``, ``--events``, ``--root``) and reads ``tests/manifest.jsonl``,
+    so pooling, executors and limits work the same for each language.
+    ``host_command`` starts the same tester outside Docker for the sandbox
+    executor. Report entries name their case in ``test_key``, as
+    ``id_format`` applied to the case ID. Testers whose runtime reserves far
+    more address space than it uses, like V8, set ``limit_address_space``
+    to False: a sandbox ``RLIMIT_AS`` would kill them before any case, so
+    the sandbox caps their data segment instead. Testers report results in
+    the API's shape themselves, so the engine never reinterprets them.
+    """
+
+    name: str
+    image: str
+    solution_file: str
+    host_command: tuple[str, ...]
+    test_key: str
+    id_format: str
+    # Whether each run is logged to MLflow
+    log_metrics = False
+    limit_address_space = True
+
+    @abstractmethod
+    def check_syntax(self, user_code: str) -> dict[str, Any] | None:
+        """Describe the syntax error in ``user_code``, if any."""
+
+    def test_id(self, case_id: str) -> str:
+        """Return how report entries name the case with ``case_id``."""
+        return self.id_format.format(case_id)
+
+    def case_id(self, test_result: dict[str, Any]) -> str:
+        """Return the case ID of a report entry."""
+        return test_result[self.test_key].removeprefix(self.id_format.format(""))
+
+
+class PythonLanguage(Language):
+    """Python, graded by the pytest harness or the fork server."""
+
+    name = "python"
+    image = "code-gym-tester"
+    solution_file = "solution.py"
+    host_command = (sys.executable, str(DOCKER_DIR / "tester" / "test_runner.py"))
+    test_key = "test_name"
+    id_format = "test_{}"
+
+    def check_syntax(self, user_code: str) -> dict[str, Any] | None:
+        """Compile the code and describe the syntax error, if any."""
+        return check_python_syntax(user_code)
+
+
+class JavaScriptLanguage(Language):
+    """JavaScript, graded by the Node.js harness."""
+
+    name = "javascript"
+    image = "code-gym-tester-js"
+    solution_file = "solution.js"
+    host_command = ("node", str(DOCKER_DIR / "js_tester" / "harness.js"))
+    test_key = "test_id"
+    id_format = "Test {}"
+    log_metrics = True
+    limit_address_space = False
+
+    def check_syntax(self, user_code: str) -> dict[str, Any] | None:
+        """Check the code with the tester's Node.js, if the host has it."""
+        return check_javascript_syntax(user_code)
+
+
+LANGUAGES: dict[str, Language] = {
+    language.name: language for language in (PythonLanguage(), JavaScriptLanguage())
+}
+
+
+def language_for_image(image: str) -> Language:
+    """Return the language whose tester runs in ``image``."""
+    for language in LANGUAGES.values():
+        if language.image == image:
+            return language
+    error_msg = f"No language uses the tester image {image}"
+    raise ValueError(error_msg)
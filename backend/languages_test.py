@@ -0,0 +1,38 @@
+"""Tests for the language plugins of the submission engine."""
+
+import pytest
+from languages import LANGUAGES, Language, language_for_image
+
+
+def test_language_needs_a_syntax_check() -> None:
+    """A language without ``check_syntax`` cannot be used."""
+
+    class Incomplete(Language):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_case_ids_round_trip() -> None:
+    """Each language reads back the case ID it names report entries with."""
+    for language in LANGUAGES.values():
+        test_id = language.test_id("c1")
+        assert language.case_id({language.test_key: test_id}) == "c1"
+    assert LANGUAGES["python"].test_id("c1") == "test_c1"
+    assert LANGUAGES["javascript"].test_id("c1") == "Test c1"
+
+
+def test_python_syntax_error_is_described() -> None:
+    """The Python plugin reports where the code fails to parse."""
+    python = LANGUAGES["python"]
+    assert python.check_syntax("print(1)\n") is None
+    assert python.check_syntax("def f(:\n    pass\n") is not None
+
+
+def test_language_for_image() -> None:
+    """Each tester image maps back to its language."""
+    for language in LANGUAGES.values():
+        assert language_for_image(language.image) is language
+    with pytest.raises(ValueError, match="unknown-image"):
+        language_for_image("unknown-image")
@@ -0,0 +1,96 @@
+"""Tests for the LLM answer cache."""
+
+from pathlib import Path
+
+import pytest
+from services import llm_cache
+from services.llm_cache import LLMCache, make_key
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> LLMCache:
+    """Return an empty cache backed by a temporary file."""
+    return LLMCache(max_entries=2, ttl_seconds=60, path=str(tmp_path / "llm.db"))
+
+
+def test_key_ignores_whitespace_noise() -> None:
+    """Prompts that differ only in line endings and blank lines share a key."""
+    key = make_key("hint", "model", "a\n\n\nb  \n")
+    assert key == make_key("hint", "model", "a\r\n\r\nb")
+    assert key != make_key("review", "model", "a\n\nb")
+    assert key != make_key("hint", "other", "a\n\nb")
+    assert key != make_key("hint", "model", "a\nb")
+
+
+def test_memory_tier_is_lru(cache: LLMCache) -> None:
+    """A lookup keeps an answer in memory when the tier is full."""
+    cache.put("hint", "model", "a", "A")
+    cache.put("hint", "model", "b", "B")
+    assert cache.get("hint", "model", "a") == "A"
+    cache.put("hint", "model", "c", "C")
+    assert cache.stats()["entries"] == 2
+    # "b" was evicted from memory but is still on disk
+    assert cache.get("hint", "model", "b") == "B"
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path: Path) -> None:
+    """A new cache on the same file answers from disk."""
+    path = str(tmp_path / "llm.db")
+    LLMCache(max_entries=2, ttl_seconds=60, path=path).put("hint", "m", "a", "A")
+    cache = LLMCache(max_entries=2, ttl_seconds=60, path=path)
+    assert cache.get("hint", "m", "a") == "A"
+    assert cache.stats()["disk"]["entries"] == 1
+
+
+def test_expired_answers_miss(tmp_path: Path) -> None:
+    """Answers past their TTL miss in both tiers and leave the file."""
+    cache = LLMCache(max_entries=2, ttl_seconds=-1, path=str(tmp_path / "llm.db"))
+    cache.put("hint", "model", "a", "A")
+    assert cache.get("hint", "model", "a") is None
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["disk"]["entries"] == 0
+
+
+def test_bypass_misses_and_replaces(cache: LLMCache) -> None:
+    """A bypassed lookup misses, and the next answer replaces the old one."""
+    cache.put("hint", "model", "a", "old")
+    assert cache.get("hint", "model", "a", bypass=True) is None
+    cache.put("hint", "model", "a", "new")
+    assert cache.get("hint", "model", "a") == "new"
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_trim_keeps_recent_answers_in_budget(
+    cache: LLMCache,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Writes trim the file at most once per interval, oldest answers first."""
+    monkeypatch.setattr(llm_cache, "TRIM_INTERVAL_SECONDS", 3600)
+    cache.max_bytes = 2
+    cache.put("hint", "model", "a", "A")
+    cache.put("hint", "model", "b", "B")
+    cache.put("hint", "model", "c", "C")
+    # Only the first write trimmed; the next trim is an interval away
+    assert cache.stats()["disk"]["entries"] == 3
+    cache.trim()
+    assert cache.stats()["disk"]["entries"] == 2
+    cache.max_bytes = 1
+    cache.trim()
+    assert cache.stats()["disk"]["entries"] == 1
+    cache._entries.clear()  # noqa: SLF001
+    assert cache.get("hint", "model", "c") == "C"
+
+
+def test_memory_only_and_disabled(tmp_path: Path) -> None:
+    """An empty path keeps answers in memory; size 0 keeps nothing."""
+    memory = LLMCache(max_entries=2, ttl_seconds=60, path="")
+    memory.put("hint", "model", "a", "A")
+    assert memory.get("hint", "model", "a") == "A"
+    assert memory.stats()["disk"] is None
+
+    disabled = LLMCache(max_entries=0, path=str(tmp_path / "llm.db"))
+    disabled.put("hint", "model", "a", "A")
+    assert disabled.get("hint", "model", "a") is None
+    assert not (tmp_path / "llm.db").exists()
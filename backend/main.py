@@ -1,20 +1,54 @@
 """FastAPI backend for code submission processing and LLM services."""
 
+import asyncio
+import contextlib
 import json
-from pathlib import Path
-from typing import Any
-
-import yaml
-from fastapi import FastAPI, HTTPException
+import uuid
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Annotated, Any
+
+from admission import AdmissionRejectedError, gates
+from catalog import catalog
+from catalog_responses import (
+    CachedBody,
+    catalog_responses,
+    editor_view,
+    parse_fields,
+    project,
+    public_course,
+    public_question,
+    public_topic,
+    render_list,
+)
+from executors import (
+    EXECUTOR_BACKEND,
+    REQUEST_EXECUTORS,
+    RemoteExecutor,
+    get_executor,
+)
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from js_submission_processor import process_js_submission_flow
-from services.llm_error import generate_error_explanation
-from services.llm_hint import generate_progressive_hints
-from services.llm_review import generate_code_review
-from services.llm_scaffold import scaffold_question
-from services.llm_testcases import generate_test_cases
-from services.pydantic_models import LLMRequest, RunCodeRequest
-from submission_processor import process_code_submission_flow
+from fastapi.responses import StreamingResponse
+from job_queue import QueueFullError, job_queue
+from languages import LANGUAGES
+from preflight import preflight_submission
+from result_cache import is_cacheable, make_key, result_cache
+from services.llm_cache import llm_cache
+from services.llm_error import generate_error_explanation, stream_error_explanation
+from services.llm_hint import generate_progressive_hints, stream_progressive_hints
+from services.llm_review import generate_code_review, stream_code_review
+from services.llm_scaffold import scaffold_question, stream_question_scaffold
+from services.llm_testcases import generate_test_cases, stream_test_cases
+from services.pydantic_models import (
+    CatalogHeaders,
+    CatalogPage,
+    LLMRequest,
+    RunCodeRequest,
+    SubmissionRequest,
+)
+from submission_events import EventStream, create_stream, get_stream
+from submission_processor import log_cached_submission, process_submission_flow
+from workspace import load_results, save_results
 
 app = FastAPI()
 
@@ -26,120 +60,163 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by clients paging through catalog lists
+    expose_headers=["ETag", "X-Total-Count"],
 )
 
-courses_data: dict[str, Any] = {}
-questions_data: dict[str, Any] = {}
-
-
-def load_config(path: str = "config.yaml") -> None:
-    """Load course and question data from config file.
-
-    Args:
-        path: Path to the config file
-
-    """
-    global courses_data, questions_data
-
-    with Path(path).open(encoding="utf-8") as file:
-        config = yaml.safe_load(file)
-
-    for course in config.get("courses", []):
-        course_id = course["id"]
-        courses_data[course_id] = course
-
-        for topic in course.get("topics", []):
-            for question in topic.get("questions", []):
-                qid = question["id"]
-                questions_data[qid] = question
-
-
-load_config()
-
-
-def get_latest_submission_error() -> dict[str, Any] | None:
-    """Get error from the most recent submission.
-
-    Returns:
-        Dictionary containing error details or None if no error found
-
-    """
-    submissions_dir = Path("submissions")
-    submission_folders = [
-        f for f in submissions_dir.iterdir()
-        if f.is_dir() and f.name.startswith("submission")
-    ]
-
-    if not submission_folders:
-        return None
-
-    latest_submission = max(submission_folders, key=lambda f: f.stat().st_mtime)
-    results_file = latest_submission / "results" / "results.json"
-
-    if not results_file.exists():
-        return None
-
-    with results_file.open(encoding="utf-8") as f:
-        return json.load(f)
-
 
 @app.get("/debug")
-def debug() -> dict[str, Any]:
+def debug(
+    headers: Annotated[CatalogHeaders, Header()],
+) -> Response:
     """Debug endpoint to return all questions data."""
-    return questions_data
+    body = catalog_responses.get(
+        ("debug",),
+        lambda: CachedBody(catalog.questions()),
+    )
+    return body.response(**headers.model_dump())
 
 
 @app.get("/courses")
-def get_courses() -> list[dict[str, Any]]:
-    """Get list of all courses."""
-    return list(courses_data.values())
+def get_courses(
+    page: Annotated[CatalogPage, Query()],
+    headers: Annotated[CatalogHeaders, Header()],
+) -> Response:
+    """Get list of all courses.
+
+    Args:
+        page: Comma-separated fields to keep of each course, and the
+            courses to skip and to return at most
+        headers: ETags the client already holds and encodings it accepts
+
+    """
+    projection = parse_fields(page.fields)
+    body = catalog_responses.get(
+        ("courses", projection, page.offset, page.limit),
+        lambda: render_list(
+            [public_course(course) for course in catalog.courses()],
+            fields=projection,
+            offset=page.offset,
+            limit=page.limit,
+        ),
+    )
+    return body.response(**headers.model_dump())
 
 
 @app.get("/courses/{course_id}")
-def get_course(course_id: str) -> dict[str, Any]:
+def get_course(
+    course_id: str,
+    headers: Annotated[CatalogHeaders, Header()],
+    fields: str | None = None,
+) -> Response:
     """Get details for a specific course.
 
     Args:
         course_id: ID of the course to retrieve
+        headers: ETags the client already holds and encodings it accepts
+        fields: Comma-separated fields to keep of the course
 
     """
-    course = courses_data.get(course_id)
+    course = catalog.course(course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    return course
+    projection = parse_fields(fields)
+    body = catalog_responses.get(
+        ("course", course_id, projection),
+        lambda: CachedBody(project(public_course(course), projection)),
+    )
+    return body.response(**headers.model_dump())
 
 
 @app.get("/courses/{course_id}/topics")
-def get_topics(course_id: str) -> list[dict[str, Any]]:
+def get_topics(
+    course_id: str,
+    page: Annotated[CatalogPage, Query()],
+    headers: Annotated[CatalogHeaders, Header()],
+) -> Response:
     """Get all topics for a course.
 
     Args:
         course_id: ID of the course
+        page: Comma-separated fields to keep of each topic, and the
+            topics to skip and to return at most
+        headers: ETags the client already holds and encodings it accepts
 
     """
-    course = courses_data.get(course_id)
+    course = catalog.course(course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    return course.get("topics", [])
+    projection = parse_fields(page.fields)
+    body = catalog_responses.get(
+        ("topics", course_id, projection, page.offset, page.limit),
+        lambda: render_list(
+            [public_topic(topic) for topic in course.get("topics", [])],
+            fields=projection,
+            offset=page.offset,
+            limit=page.limit,
+        ),
+    )
+    return body.response(**headers.model_dump())
 
 
 @app.get("/courses/{course_id}/topics/{topic_id}")
-def get_topic(course_id: str, topic_id: str) -> dict[str, Any]:
+def get_topic(
+    course_id: str,
+    topic_id: str,
+    headers: Annotated[CatalogHeaders, Header()],
+    fields: str | None = None,
+) -> Response:
     """Get details for a specific topic.
 
     Args:
         course_id: ID of the course
         topic_id: ID of the topic
+        headers: ETags the client already holds and encodings it accepts
+        fields: Comma-separated fields to keep of the topic
 
     """
-    course = courses_data.get(course_id)
-    topic = next(
-        (t for t in course.get("topics", []) if t["topic_id"] == topic_id),
-        None,
+    topic = catalog.topic(course_id, topic_id)
+    if not topic:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    projection = parse_fields(fields)
+    body = catalog_responses.get(
+        ("topic", course_id, topic_id, projection),
+        lambda: CachedBody(project(public_topic(topic), projection)),
     )
+    return body.response(**headers.model_dump())
+
+
+@app.get("/courses/{course_id}/topics/{topic_id}/questions")
+def get_questions(
+    course_id: str,
+    topic_id: str,
+    page: Annotated[CatalogPage, Query()],
+    headers: Annotated[CatalogHeaders, Header()],
+) -> Response:
+    """Get all questions of a topic.
+
+    Args:
+        course_id: ID of the course
+        topic_id: ID of the topic
+        page: Comma-separated fields to keep of each question, and the
+            questions to skip and to return at most
+        headers: ETags the client already holds and encodings it accepts
+
+    """
+    topic = catalog.topic(course_id, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
-    return topic
+    projection = parse_fields(page.fields)
+    body = catalog_responses.get(
+        ("questions", course_id, topic_id, projection, page.offset, page.limit),
+        lambda: render_list(
+            public_topic(topic)["questions"],
+            fields=projection,
+            offset=page.offset,
+            limit=page.limit,
+        ),
+    )
+    return body.response(**headers.model_dump())
 
 
 @app.get("/courses/{course_id}/topics/{topic_id}/questions/{question_id}")
@@ -147,23 +224,74 @@ def get_question(
     course_id: str,
     topic_id: str,
     question_id: str,
-) -> dict[str, Any]:
+    headers: Annotated[CatalogHeaders, Header()],
+    fields: str | None = None,
+) -> Response:
     """Get details for a specific question.
 
     Args:
         course_id: ID of the course
         topic_id: ID of the topic
         question_id: ID of the question
+        headers: ETags the client already holds and encodings it accepts
+        fields: Comma-separated fields to keep of the question
 
     """
-    question = questions_data.get(question_id)
+    question = catalog.question(question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
-    return question
+    projection = parse_fields(fields)
+    body = catalog_responses.get(
+        ("question", question_id, projection),
+        lambda: CachedBody(project(public_question(question), projection)),
+    )
+    return body.response(**headers.model_dump())
+
+
+@app.get("/courses/{course_id}/topics/{topic_id}/questions/{question_id}/editor")
+def get_editor_bootstrap(
+    course_id: str,
+    topic_id: str,
+    question_id: str,
+    headers: Annotated[CatalogHeaders, Header()],
+) -> Response:
+    """Get everything the editor page shows for a question, in one response.
+
+    Args:
+        course_id: ID of the course
+        topic_id: ID of the topic
+        question_id: ID of the question
+        headers: ETags the client already holds and encodings it accepts
+
+    """
+    def render() -> CachedBody:
+        # Only runs on a cache miss; a missing question is never cached
+        course = catalog.course(course_id)
+        topic = catalog.topic(course_id, topic_id)
+        questions = topic.get("questions", []) if topic else []
+        position = next(
+            (i for i, q in enumerate(questions) if q["id"] == question_id),
+            None,
+        )
+        if course is None or position is None:
+            raise HTTPException(status_code=404, detail="Question not found")
+        return CachedBody(editor_view(course, topic, position))
+
+    body = catalog_responses.get(
+        ("editor", course_id, topic_id, question_id),
+        render,
+    )
+    return body.response(**headers.model_dump())
+
+
+@app.get("/debug/llm-cache")
+def llm_cache_stats() -> dict[str, Any]:
+    """Return hit and miss counters of the LLM response cache."""
+    return llm_cache.stats()
 
 
 @app.post("/llm/hint")
-def get_hint(request: LLMRequest) -> dict[str, list[str]]:
+def get_hint(request: LLMRequest) -> dict[str, str]:
     """Get progressive hints for a coding problem.
 
     Args:
@@ -174,47 +302,69 @@ def get_hint(request: LLMRequest) -> dict[str, list[str]]:
         question_title=request.title,
         question_description=request.description,
         user_code=request.code,
+        use_cache=not request.bypass_cache,
     )
     return {"hints": hints}
 
 
-@app.post("/llm/explain-error")
-def get_error_explanation(request: LLMRequest) -> dict[str, str]:
-    """Get explanations for errors in user code.
+# Answer of the explain-error feature when there is no failed run to explain
+NO_ERROR_TO_EXPLAIN = "Please run the code at least once to see the error."
+
+
+def failed_tests_to_explain(request: LLMRequest) -> list[dict[str, Any]] | None:
+    """Return the failed visible cases of the run the request names.
 
     Args:
-        request: Contains question details and user code
+        request: Contains question details, user code and the submission ID
+            a run endpoint returned
+
+    Returns:
+        Failed cases with their input, or None if there is no run to explain
 
     """
-    error = get_latest_submission_error()
-    if not error:
-        return {
-            "explanations": "Please run the code at least once to see the error.",
-        }
-
-    if error["problem_title"] != request.title:
-        return {
-            "explanations": "Please run the code at least once to see the error.",
-        }
-
-    test_cases = questions_data[error["problem_id"]]["test_cases"]["visible_cases"]
+    if request.submission_id is None:
+        return None
+    error = load_results(request.submission_id)
+    if not error or error.get("problem_title") != request.title:
+        return None
+
+    question = catalog.question(error["problem_id"])
+    if question is None:
+        return None
+
+    test_cases = question["test_cases"]["visible_cases"]
     failed_tests = []
     for test_case, result in zip(test_cases, error["test_results"], strict=False):
-        if not result["passed"]:
+        if not result["passed"] and not result.get("skipped"):
             result["input"] = test_case["input"]
             failed_tests.append(result)
+    return failed_tests
+
+
+@app.post("/llm/explain-error")
+def get_error_explanation(request: LLMRequest) -> dict[str, str]:
+    """Get explanations for errors in user code.
+
+    Args:
+        request: Contains question details and user code
+
+    """
+    failed_tests = failed_tests_to_explain(request)
+    if failed_tests is None:
+        return {"explanations": NO_ERROR_TO_EXPLAIN}
 
     explanations = generate_error_explanation(
         error_list=failed_tests,
         question_title=request.title,
         question_description=request.description,
         user_code=request.code,
+        use_cache=not request.bypass_cache,
     )
     return {"explanations": explanations}
 
 
 @app.post("/llm/test-cases")
-def get_test_cases(request: LLMRequest) -> dict[str, list[str]]:
+def get_test_cases(request: LLMRequest) -> dict[str, str]:
     """Generate test cases for a coding problem.
 
     Args:
@@ -225,6 +375,7 @@ def get_test_cases(request: LLMRequest) -> dict[str, list[str]]:
         question_title=request.title,
         question_description=request.description,
         user_code=request.code,
+        use_cache=not request.bypass_cache,
     )
     return {"test_cases": test_cases}
 
@@ -241,6 +392,7 @@ def get_code_review(request: LLMRequest) -> dict[str, str]:
         question_title=request.title,
         question_description=request.description,
         user_code=request.code,
+        use_cache=not request.bypass_cache,
     )
     return {"review": review}
 
@@ -257,10 +409,264 @@ def get_question_scaffolding(request: LLMRequest) -> dict[str, str]:
         question_title=request.title,
         question_description=request.description,
         user_code=request.code,
+        use_cache=not request.bypass_cache,
     )
     return {"scaffold_data": scaffold}
 
 
+def relay_llm_answer(pieces: Iterable[str]) -> Iterator[str]:
+    """Yield an LLM answer as Server-Sent Events while it is generated.
+
+    Each ``token`` event carries the next piece of text; ``done`` carries
+    the full answer and ``error`` ends a stream that failed.
+    """
+    text = []
+    try:
+        for piece in pieces:
+            text.append(piece)
+            event = {"type": "token", "text": piece}
+            yield f"event: token\ndata: {json.dumps(event)}\n\n"
+    except Exception as e:  # noqa: BLE001
+        # The status line is already sent, so the failure becomes an event
+        event = {"type": "error", "error": f"{type(e).__name__}: {e!s}"}
+        yield f"event: error\ndata: {json.dumps(event)}\n\n"
+        return
+    event = {"type": "done", "text": "".join(text)}
+    yield f"event: done\ndata: {json.dumps(event)}\n\n"
+
+
+def stream_llm_answer(pieces: Iterable[str]) -> StreamingResponse:
+    """Answer with an LLM answer streamed as Server-Sent Events."""
+    return StreamingResponse(
+        relay_llm_answer(pieces),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.post("/llm/hint/stream")
+def stream_hint(request: LLMRequest) -> StreamingResponse:
+    """Stream progressive hints as they are generated.
+
+    Args:
+        request: Contains question details and user code
+
+    """
+    return stream_llm_answer(stream_progressive_hints(
+        question_title=request.title,
+        question_description=request.description,
+        user_code=request.code,
+        use_cache=not request.bypass_cache,
+    ))
+
+
+@app.post("/llm/explain-error/stream")
+def stream_error_explanation_answer(request: LLMRequest) -> StreamingResponse:
+    """Stream explanations for errors in user code as they are generated.
+
+    Args:
+        request: Contains question details and user code
+
+    """
+    failed_tests = failed_tests_to_explain(request)
+    if failed_tests is None:
+        return stream_llm_answer([NO_ERROR_TO_EXPLAIN])
+    return stream_llm_answer(stream_error_explanation(
+        error_list=failed_tests,
+        question_title=request.title,
+        question_description=request.description,
+        user_code=request.code,
+        use_cache=not request.bypass_cache,
+    ))
+
+
+@app.post("/llm/test-cases/stream")
+def stream_test_case_answer(request: LLMRequest) -> StreamingResponse:
+    """Stream generated test cases as they are generated.
+
+    Args:
+        request: Contains question details and user code
+
+    """
+    return stream_llm_answer(stream_test_cases(
+        question_title=request.title,
+        question_description=request.description,
+        user_code=request.code,
+        use_cache=not request.bypass_cache,
+    ))
+
+
+@app.post("/llm/code-review/stream")
+def stream_code_review_answer(request: LLMRequest) -> StreamingResponse:
+    """Stream a code review as it is generated.
+
+    Args:
+        request: Contains question details and user code
+
+    """
+    return stream_llm_answer(stream_code_review(
+        question_title=request.title,
+        question_description=request.description,
+        user_code=request.code,
+        use_cache=not request.bypass_cache,
+    ))
+
+
+@app.post("/llm/question-scaffold/stream")
+def stream_question_scaffolding(request: LLMRequest) -> StreamingResponse:
+    """Stream scaffolding for a coding problem as it is generated.
+
+    Args:
+        request: Contains question details and user code
+
+    """
+    return stream_llm_answer(stream_question_scaffold(
+        question_title=request.title,
+        question_description=request.description,
+        user_code=request.code,
+        use_cache=not request.bypass_cache,
+    ))
+
+
+def preflight_check(
+    request: RunCodeRequest,
+    language: str,
+    *,  # Force keyword arguments after this point
+    hidden: bool,
+    submission_id: str,
+) -> dict[str, Any] | None:
+    """Return a syntax error report, without running the flow, for unparsable code.
+
+    Args:
+        request: Contains user code and question ID
+        language: "python" or "javascript"
+        hidden: Whether hidden test cases are included in the report
+        submission_id: ID of the workspace the report is saved to
+
+    """
+    question = catalog.question(request.question_id)
+    if question is None:
+        return None
+    return preflight_submission(
+        request.code,
+        question,
+        LANGUAGES[language],
+        hidden=hidden,
+        submission_id=submission_id,
+    )
+
+
+def check_executor(request: RunCodeRequest) -> None:
+    """Reject a per-request executor the deployment does not allow.
+
+    Args:
+        request: Contains the executor the run asks for, if any
+
+    """
+    if request.executor is not None and request.executor not in REQUEST_EXECUTORS:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Executor '{request.executor}' cannot be chosen per request",
+        )
+
+
+def run_submission(
+    request: RunCodeRequest,
+    language: str,
+    *,  # Force keyword arguments after this point
+    hidden: bool,
+    job_id: str | None = None,
+) -> dict[str, Any]:
+    """Run a submission, answering syntax errors and repeats without Docker.
+
+    Runs that need Docker wait for a slot of the language's admission gate
+    and are answered with 429 and ``Retry-After`` when too many are waiting.
+    A queued job instead waits for its slot as long as it takes, since the
+    job queue already bounds the backlog. A request may only pick an
+    executor listed in ``CODE_GYM_REQUEST_EXECUTORS``.
+
+    Every report that is saved carries the ``submission_id`` of its
+    workspace, which the error explanation endpoints take to find it.
+
+    Args:
+        request: Contains user code, question ID, fail-fast flag and executor
+        language: "python" or "javascript"
+        hidden: Whether to include hidden test cases
+        job_id: ID of the queued job being run, which names its workspace
+            and the stream that receives its per-case events
+
+    """
+    check_executor(request)
+    submission_id = job_id or str(uuid.uuid4())
+    rejected = preflight_check(
+        request,
+        language,
+        hidden=hidden,
+        submission_id=submission_id,
+    )
+    if rejected is not None:
+        return rejected
+
+    question = catalog.question(request.question_id)
+    cache_key = None
+    if question is not None:
+        cache_key = make_key(
+            language,
+            question,
+            request,
+            hidden=hidden,
+            executor=request.executor or EXECUTOR_BACKEND,
+        )
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            cached["submission_id"] = submission_id
+            save_results(cached, submission_id)
+            log_cached_submission(
+                language,
+                cached,
+                request.code,
+                request.question_id,
+            )
+            return cached
+
+    try:
+        with gates[language].admit(bounded=job_id is None):
+            results = process_submission_flow(
+                user_code=request.code,
+                problem_id=request.question_id,
+                language=language,
+                hidden=hidden,
+                fail_fast=request.fail_fast,
+                event_stream=job_id,
+                executor=request.executor,
+                submission_id=submission_id,
+            )
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
+    if cache_key is not None and is_cacheable(results):
+        # Each hit gets the ID of the workspace it is saved to instead
+        result_cache.put(cache_key, {
+            key: value for key, value in results.items() if key != "submission_id"
+        })
+    return results
+
+
+@app.get("/debug/catalog")
+def catalog_stats() -> dict[str, Any]:
+    """Return the state of the course catalog and its response cache."""
+    return {**catalog.stats(), "responses": catalog_responses.stats()}
+
+
+@app.get("/debug/result-cache")
+def result_cache_stats() -> dict[str, Any]:
+    """Return hit and miss counters of the execution result cache."""
+    return result_cache.stats()
+
+
 @app.post("/run-code")
 def run_python_code(request: RunCodeRequest) -> dict[str, Any]:
     """Run Python code with visible test cases.
@@ -269,11 +675,7 @@ def run_python_code(request: RunCodeRequest) -> dict[str, Any]:
         request: Contains user code and question ID
 
     """
-    return process_code_submission_flow(
-        user_code=request.code,
-        problem_id=request.question_id,
-        hidden=False,
-    )
+    return run_submission(request, "python", hidden=False)
 
 
 @app.post("/run-code-all")
@@ -284,11 +686,7 @@ def run_python_code_all_tests(request: RunCodeRequest) -> dict[str, Any]:
         request: Contains user code and question ID
 
     """
-    return process_code_submission_flow(
-        user_code=request.code,
-        problem_id=request.question_id,
-        hidden=True,
-    )
+    return run_submission(request, "python", hidden=True)
 
 
 @app.post("/run-code-js")
@@ -299,11 +697,7 @@ def run_javascript_code(request: RunCodeRequest) -> dict[str, Any]:
         request: Contains user code and question ID
 
     """
-    return process_js_submission_flow(
-        user_code=request.code,
-        problem_id=request.question_id,
-        hidden=False,
-    )
+    return run_submission(request, "javascript", hidden=False)
 
 
 @app.post("/run-code-all-js")
@@ -314,15 +708,162 @@ def run_javascript_code_all_tests(request: RunCodeRequest) -> dict[str, Any]:
         request: Contains user code and question ID
 
     """
-    return process_js_submission_flow(
-        user_code=request.code,
-        problem_id=request.question_id,
-        hidden=True,
+    return run_submission(request, "javascript", hidden=True)
+
+
+def run_queued_submission(
+    request: SubmissionRequest,
+    stream: EventStream,
+) -> dict[str, Any]:
+    """Run a queued submission, publishing its progress to ``stream``.
+
+    Reports answered without running the tests (syntax errors, cache hits)
+    have no live case events, so theirs are published from the report.
+
+    Args:
+        request: Contains user code, question ID, language and test selection
+        stream: Event stream of the submission
+
+    """
+    stream.publish({"type": "status", "status": "running"})
+    try:
+        results = run_submission(
+            request,
+            request.language,
+            hidden=request.hidden,
+            job_id=stream.stream_id,
+        )
+    except Exception as e:
+        stream.publish({"type": "error", "error": f"{type(e).__name__}: {e!s}"})
+        stream.close()
+        raise
+
+    if not stream.has("case"):
+        for test_result in results.get("test_results", []):
+            stream.publish({"type": "case", **test_result})
+    stream.publish({"type": "done", "results": results})
+    stream.close()
+    return results
+
+
+@app.post("/submissions", status_code=202)
+async def create_submission(request: SubmissionRequest) -> dict[str, Any]:
+    """Queue a code run and return its ID without waiting for the result.
+
+    The run is picked up by a worker thread, so no request thread is held
+    while Docker executes the tests. Poll ``GET /submissions/{id}`` or
+    follow ``GET /submissions/{id}/events``.
+
+    Args:
+        request: Contains user code, question ID, language and test selection
+
+    """
+    check_executor(request)
+    stream = create_stream()
+    try:
+        job = job_queue.submit(
+            lambda: run_queued_submission(request, stream),
+            job_id=stream.stream_id,
+            language=request.language,
+            question_id=request.question_id,
+            hidden=request.hidden,
+        )
+    except QueueFullError as e:
+        stream.close()
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(gates[request.language].retry_after())},
+        ) from e
+    return job.snapshot()
+
+
+@app.get("/submissions/{submission_id}")
+async def get_submission(submission_id: str) -> dict[str, Any]:
+    """Get the status of a queued code run, with its results once done.
+
+    Args:
+        submission_id: ID returned by ``POST /submissions``
+
+    """
+    job = job_queue.get(submission_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return job.snapshot()
+
+
+async def relay_events(stream: EventStream, cursor: int) -> AsyncIterator[str]:
+    """Yield the stream's events after ``cursor`` as Server-Sent Events.
+
+    Each event's ``id`` is its position, so a reconnecting client resumes
+    after the last one it saw. A comment is sent while waiting to keep
+    proxies from closing an idle connection.
+    """
+    while True:
+        events = stream.since(cursor)
+        for event in events:
+            cursor += 1
+            yield f"id: {cursor}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        if stream.closed and not stream.since(cursor):
+            return
+        if not events:
+            yield ": keep-alive\n\n"
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(15):
+                await stream.wait(cursor)
+
+
+@app.get("/submissions/{submission_id}/events")
+async def stream_submission_events(
+    submission_id: str,
+    last_event_id: Annotated[int, Header()] = 0,
+) -> StreamingResponse:
+    """Stream a queued code run's progress as Server-Sent Events.
+
+    Events are ``status`` (the run started), ``started`` (a case started),
+    ``case`` (a case's report entry, with its resource usage),
+    ``done`` (the full results) and ``error``. Past events are replayed, so
+    the stream can be opened at any time.
+
+    Args:
+        submission_id: ID returned by ``POST /submissions``
+        last_event_id: ``Last-Event-ID`` of a reconnecting client
+
+    """
+    stream = get_stream(submission_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return StreamingResponse(
+        relay_events(stream, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
     )
 
 
+@app.get("/debug/admission")
+def admission_stats() -> dict[str, Any]:
+    """Return running and waiting runs and average wait time per language."""
+    return {language: gate.stats() for language, gate in gates.items()}
+
+
+@app.get("/debug/submissions")
+async def submission_queue_stats() -> dict[str, Any]:
+    """Return the depth of the submission queue and job counts by status."""
+    return job_queue.stats()
+
+
+@app.get("/debug/executor")
+def executor_stats() -> dict[str, Any]:
+    """Return the execution backend and, when remote, its job counts."""
+    executor = get_executor()
+    stats: dict[str, Any] = {"backend": EXECUTOR_BACKEND}
+    if isinstance(executor, RemoteExecutor):
+        stats["jobs"] = executor.queue.stats()
+    return stats
+
+
 if __name__ == "__main__":
     import uvicorn
 
     # Run the FastAPI app on a custom port
-    uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -0,0 +1,193 @@
+"""Syntax checks run in the API process before a submission reaches Docker."""
+
+import functools
+import os
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from workspace import save_results
+
+if TYPE_CHECKING:
+    from languages import Language
+
+NODE_CHECK_TIMEOUT_SECONDS = 5
+# Node.js used for syntax checks; it must match the JS tester image's version
+NODE_PATH = os.environ.get("CODE_GYM_NODE_PATH", "")
+JS_TESTER_DOCKERFILE = Path(__file__).parent / "docker" / "js_tester" / "Dockerfile"
+
+
+def check_python_syntax(user_code: str) -> dict[str, Any] | None:
+    """Compile Python code and describe the syntax error, if any."""
+    try:
+        compile(user_code, "solution.py", "exec")
+    except SyntaxError as e:
+        return {
+            "error_type": type(e).__name__,
+            "message": e.msg,
+            "line": e.lineno,
+            "offset": e.offset,
+        }
+    except ValueError as e:
+        # Source containing null bytes
+        return {
+            "error_type": "SyntaxError",
+            "message": str(e),
+            "line": None,
+            "offset": None,
+        }
+    return None
+
+
+def node_major_version(node: str) -> int | None:
+    """Return the major version of the ``node`` binary, or None."""
+    try:
+        # Security note: node comes from the deployment's settings, not a request
+        result = subprocess.run(
+            [node, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=NODE_CHECK_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = re.match(r"v(\d+)\.", result.stdout)
+    return int(match.group(1)) if match else None
+
+
+@functools.cache
+def syntax_check_node() -> str | None:
+    """Return the Node.js binary to check syntax with, or None to skip checks.
+
+    Syntax accepted by one Node.js release can be rejected by another, so
+    only a binary of the same major version as the JS tester image's
+    (its ``FROM node:<major>`` line) is used: ``CODE_GYM_NODE_PATH``, else
+    ``node`` on the ``PATH``.
+    """
+    node = NODE_PATH or shutil.which("node")
+    if not node:
+        return None
+    tester = re.search(
+        r"^FROM node:(\d+)",
+        JS_TESTER_DOCKERFILE.read_text(encoding="utf-8"),
+        re.MULTILINE,
+    )
+    if tester is None or node_major_version(node) != int(tester.group(1)):
+        return None
+    return node
+
+
+def check_javascript_syntax(user_code: str) -> dict[str, Any] | None:
+    """Parse JavaScript with ``node --check`` and describe the syntax error, if any.
+
+    Returns None when the API host has no Node.js of the tester's version;
+    the tester container reports the error in that case.
+    """
+    node = syntax_check_node()
+    if node is None:
+        return None
+    try:
+        # Security note: the code is only parsed, never executed
+        result = subprocess.run(
+            [node, "--check", "-"],
+            input=user_code,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            timeout=NODE_CHECK_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        return None
+    if result.returncode == 0:
+        return None
+
+    location = re.search(r"^\[stdin\]:(\d+)", result.stderr, re.MULTILINE)
+    message = re.search(r"^(\w*Error): (.*)$", result.stderr, re.MULTILINE)
+    if message is None:
+        return None
+    return {
+        "error_type": message.group(1),
+        "message": message.group(2),
+        "line": int(location.group(1)) if location else None,
+        "offset": None,
+    }
+
+
+def syntax_error_results(
+    syntax_error: dict[str, Any],
+    test_case_ids: list[tuple[str, bool]],
+    problem_id: str,
+    problem_title: str,
+    test_key: str = "test_name",
+) -> dict[str, Any]:
+    """Build a failed report in the shape ``process_results`` returns.
+
+    ``test_case_ids`` pairs each case id with whether it is hidden, and
+    ``test_key`` names the per-test id field of the calling language.
+    """
+    error = f"{syntax_error['error_type']}: {syntax_error['message']}"
+    if syntax_error["line"] is not None:
+        error += f" (line {syntax_error['line']})"
+
+    return {
+        "passed": 0,
+        "failed": len(test_case_ids),
+        "total": len(test_case_ids),
+        "test_results": [
+            {
+                test_key: test_id,
+                "passed": False,
+                "is_hidden": is_hidden,
+                "error": "Hidden test case failed" if is_hidden else error,
+            }
+            for test_id, is_hidden in test_case_ids
+        ],
+        "syntax_error": syntax_error,
+        "problem_id": problem_id,
+        "problem_title": problem_title,
+    }
+
+
+def preflight_submission(
+    user_code: str,
+    problem: dict[str, Any],
+    language: "Language",
+    *,  # Force keyword arguments after this point
+    hidden: bool,
+    submission_id: str,
+) -> dict[str, Any] | None:
+    """Return a failed report if the code does not parse, else None.
+
+    The report is also saved to the workspace of ``submission_id``, like a
+    normal run, so the error explanation endpoint can pick it up.
+    """
+    syntax_error = language.check_syntax(user_code)
+    if syntax_error is None:
+        return None
+
+    test_cases = problem.get("test_cases", {})
+    test_case_ids = [
+        (language.test_id(f"visible_{i}"), False)
+        for i in range(len(test_cases.get("visible_cases", [])))
+    ]
+    if hidden:
+        test_case_ids += [
+            (language.test_id(f"hidden_{i}"), True)
+            for i in range(len(test_cases.get("hidden_cases", [])))
+        ]
+
+    results = syntax_error_results(
+        syntax_error,
+        test_case_ids,
+        problem.get("id", ""),
+        problem.get("title", ""),
+        test_key=language.test_key,
+    )
+    results["submission_id"] = submission_id
+
+    save_results(results, submission_id)
+    return results
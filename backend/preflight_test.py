@@ -0,0 +1,116 @@
+"""Tests for the syntax checks run before a submission reaches Docker."""
+
+import re
+import shutil
+from pathlib import Path
+
+import preflight
+import pytest
+import workspace
+from languages import LANGUAGES
+from preflight import (
+    check_javascript_syntax,
+    check_python_syntax,
+    preflight_submission,
+)
+from workspace import load_results
+
+SUBMISSION_ID = "0e4c8a52-7f0b-4d7e-9a43-6c1d2b3e4f50"
+PROBLEM = {
+    "id": "sum",
+    "title": "Sum",
+    "test_cases": {
+        "visible_cases": [{"input": "1 2", "expected_output": "3"}] * 2,
+        "hidden_cases": [{"input": "2 2", "expected_output": "4"}],
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Save reports under a temporary workspace root."""
+    monkeypatch.setattr(workspace, "WORKSPACE_ROOT", tmp_path)
+    return tmp_path
+
+
+def test_python_syntax_error_is_described() -> None:
+    """The error type, message and position of the first error are kept."""
+    assert check_python_syntax("print('ok')\n") is None
+    error = check_python_syntax("x = 1\nif x\n    pass\n")
+    assert error["error_type"] == "SyntaxError"
+    assert error["line"] == 2
+    assert check_python_syntax("x = 1\0")["error_type"] == "SyntaxError"
+
+
+def test_unparsable_code_gets_a_saved_report() -> None:
+    """Every case fails with the error, hidden ones without its details."""
+    results = preflight_submission(
+        "def f(:\n",
+        PROBLEM,
+        LANGUAGES["python"],
+        hidden=True,
+        submission_id=SUBMISSION_ID,
+    )
+    assert (results["passed"], results["failed"], results["total"]) == (0, 3, 3)
+    names = [result["test_name"] for result in results["test_results"]]
+    assert names == ["test_visible_0", "test_visible_1", "test_hidden_0"]
+    visible, _, hidden = results["test_results"]
+    assert visible["error"].startswith("SyntaxError: ")
+    assert visible["error"].endswith("(line 1)")
+    assert hidden["error"] == "Hidden test case failed"
+    assert results["submission_id"] == SUBMISSION_ID
+    assert load_results(SUBMISSION_ID) == results
+
+
+def test_visible_run_reports_visible_cases_only() -> None:
+    """Without hidden cases only the visible ones are reported."""
+    results = preflight_submission(
+        "def f(:\n",
+        PROBLEM,
+        LANGUAGES["python"],
+        hidden=False,
+        submission_id=SUBMISSION_ID,
+    )
+    assert results["total"] == 2
+
+
+def test_parsable_code_goes_on(root: Path) -> None:
+    """Code that parses gets no report and no workspace."""
+    results = preflight_submission(
+        "print(sum(map(int, input().split())))\n",
+        PROBLEM,
+        LANGUAGES["python"],
+        hidden=True,
+        submission_id=SUBMISSION_ID,
+    )
+    assert results is None
+    assert not any(root.iterdir())
+
+
+def test_javascript_needs_the_tester_node_version(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Only a Node.js of the tester's major version checks syntax."""
+    dockerfile = preflight.JS_TESTER_DOCKERFILE.read_text(encoding="utf-8")
+    tester = int(re.search(r"^FROM node:(\d+)", dockerfile, re.MULTILINE).group(1))
+    monkeypatch.setattr(preflight, "NODE_PATH", "/opt/node/bin/node")
+    # The uncached lookup, so each version below is checked afresh
+    find_node = preflight.syntax_check_node.__wrapped__
+    monkeypatch.setattr(preflight, "node_major_version", lambda _node: tester)
+    assert find_node() == "/opt/node/bin/node"
+    monkeypatch.setattr(preflight, "node_major_version", lambda _node: tester + 1)
+    assert find_node() is None
+    monkeypatch.setattr(preflight, "syntax_check_node", lambda: None)
+    assert check_javascript_syntax("function (") is None
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs Node.js")
+def test_javascript_syntax_error_is_described(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Node's parse error is reported with its type and line."""
+    monkeypatch.setattr(preflight, "syntax_check_node", lambda: shutil.which("node"))
+    assert check_javascript_syntax("console.log(1);\n") is None
+    error = check_javascript_syntax("const a = 1;\nfunction (\n")
+    assert error["error_type"] == "SyntaxError"
+    assert error["line"] == 2
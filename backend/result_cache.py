@@ -0,0 +1,237 @@
+"""Content-addressed cache of execution results for identical resubmissions.
+
+Results are kept in a bounded in-memory LRU and, when a directory is
+configured, in one JSON file per entry that survives restarts. Each file's
+modification time is its expiry, so sweeping the directory only needs
+``stat``: expired files go first, then the oldest until the tier fits its
+byte budget.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from services.pydantic_models import RunCodeRequest
+
+RESULT_CACHE_SIZE = int(os.environ.get("CODE_GYM_RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL_SECONDS = float(
+    os.environ.get("CODE_GYM_RESULT_CACHE_TTL_SECONDS", "3600"),
+)
+RESULT_CACHE_DIR = os.environ.get("CODE_GYM_RESULT_CACHE_DIR", "")
+RESULT_CACHE_DIR_MAX_MB = float(
+    os.environ.get("CODE_GYM_RESULT_CACHE_DIR_MAX_MB", "256"),
+)
+# Seconds between sweeps of the disk tier
+DISK_SWEEP_INTERVAL_SECONDS = 60
+
+# Verdicts that depend on how loaded the host was, not only on the code
+UNSTABLE_ERRORS = frozenset({"Time Limit Exceeded", "Memory Limit Exceeded"})
+# Hidden Python cases do not say why they failed
+HIDDEN_FAILURE = "Hidden test case failed"
+
+
+def test_set_version(problem: dict[str, Any]) -> str:
+    """Hash everything about a problem that can change its verdicts."""
+    graded = {
+        "test_cases": problem.get("test_cases", {}),
+        "time_limit_seconds": problem.get("time_limit_seconds"),
+        "memory_limit_mb": problem.get("memory_limit_mb"),
+    }
+    encoded = json.dumps(graded, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def make_key(
+    language: str,
+    problem: dict[str, Any],
+    request: RunCodeRequest,
+    *,  # Force keyword arguments after this point
+    hidden: bool,
+    executor: str,
+) -> str:
+    """Build the cache key for one submission.
+
+    The key covers the language, executor backend, problem ID, hidden and
+    fail-fast flags, test-set version and a hash of the submitted code.
+    ``executor`` is the backend the run resolves to, which the request
+    may leave unset.
+    """
+    code_hash = hashlib.sha256(request.code.encode("utf-8")).hexdigest()
+    parts = (
+        language,
+        executor,
+        problem.get("id", ""),
+        "hidden" if hidden else "visible",
+        "fail-fast" if request.fail_fast else "full",
+        test_set_version(problem),
+        code_hash,
+    )
+    return ":".join(parts)
+
+
+class ResultCache:
+    """Bounded LRU of results with a TTL and optional on-disk persistence."""
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_SIZE,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+        persist_dir: Path | None = None,
+        max_disk_mb: float = RESULT_CACHE_DIR_MAX_MB,
+    ) -> None:
+        """Create an empty cache; ``persist_dir`` enables the disk tier."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_dir = persist_dir
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        if persist_dir is not None:
+            persist_dir.mkdir(parents=True, exist_ok=True)
+            self.sweep()
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.persist_dir / f"{digest}.json"
+
+    def _load(self, key: str) -> tuple[float, dict[str, Any]] | None:
+        """Read an entry from the disk tier, if enabled and present."""
+        if self.persist_dir is None:
+            return None
+        try:
+            with self._path(key).open(encoding="utf-8") as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if stored.get("key") != key:
+            return None
+        return stored["expires_at"], stored["results"]
+
+    def _store(self, key: str, expires_at: float, results: dict[str, Any]) -> None:
+        """Write an entry to the disk tier, if enabled."""
+        if self.persist_dir is None:
+            return
+        path = self._path(key)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with temp_path.open("w", encoding="utf-8") as f:
+            json.dump({"key": key, "expires_at": expires_at, "results": results}, f)
+        os.utime(temp_path, (expires_at, expires_at))
+        temp_path.replace(path)
+
+    def sweep(self) -> None:
+        """Drop expired files, then the oldest until the disk tier fits its budget."""
+        if self.persist_dir is None:
+            return
+        now = time.time()
+        live = []
+        for path in self.persist_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime < now:
+                path.unlink(missing_ok=True)
+            else:
+                live.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry[1] for entry in live)
+        # Entries share one TTL, so the earliest expiry is the oldest write
+        for _, file_size, path in sorted(live):
+            if size <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a copy of the cached results for ``key``, or None."""
+        if self.max_entries <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self._entries.pop(key, None)
+
+        # Disk reads happen outside the lock
+        entry = self._load(key)
+        if entry is not None and entry[0] < now:
+            self._path(key).unlink(missing_ok=True)
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._insert(key, entry)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: str, results: dict[str, Any]) -> None:
+        """Cache ``results`` under ``key``."""
+        if self.max_entries <= 0:
+            return
+        now = time.time()
+        entry = (now + self.ttl_seconds, copy.deepcopy(results))
+        with self._lock:
+            self._insert(key, entry)
+            sweep = self.persist_dir is not None and now >= self._next_sweep
+            if sweep:
+                self._next_sweep = now + DISK_SWEEP_INTERVAL_SECONDS
+        self._store(key, *entry)
+        if sweep:
+            self.sweep()
+
+    def _insert(self, key: str, entry: tuple[float, dict[str, Any]]) -> None:
+        """Add to the memory tier, evicting least recently used entries."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit and miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self.persist_dir is not None,
+            }
+
+
+def is_cacheable(results: dict[str, Any]) -> bool:
+    """Only cache complete runs whose verdicts the code alone decides.
+
+    Infrastructure and config errors are not cached, and neither are time
+    and memory limit verdicts, which a busy host can cause. A failed hidden
+    Python case does not say which verdict it got, so it is not cached
+    either.
+    """
+    if "error" in results or results.get("total", 0) <= 0:
+        return False
+    return not any(
+        not test_result.get("passed") and test_result.get("error") in (
+            *UNSTABLE_ERRORS,
+            HIDDEN_FAILURE,
+        )
+        for test_result in results.get("test_results", [])
+    )
+
+
+result_cache = ResultCache(
+    persist_dir=Path(RESULT_CACHE_DIR) if RESULT_CACHE_DIR else None,
+)
@@ -0,0 +1,170 @@
+"""Tests for the execution result cache."""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+import result_cache
+from result_cache import ResultCache, is_cacheable, make_key
+from services.pydantic_models import RunCodeRequest
+
+PROBLEM = {"id": "sum", "test_cases": {"visible_cases": [{"input": "1 2"}]}}
+
+
+def report(*test_results: dict) -> dict:
+    """Build a results report of ``test_results``."""
+    passed = sum(1 for test_result in test_results if test_result["passed"])
+    return {
+        "passed": passed,
+        "failed": len(test_results) - passed,
+        "total": len(test_results),
+        "test_results": list(test_results),
+    }
+
+
+def request(code: str = "code", *, fail_fast: bool = False) -> RunCodeRequest:
+    """Build a run request for ``PROBLEM``."""
+    return RunCodeRequest(code=code, question_id="sum", fail_fast=fail_fast)
+
+
+def test_key_covers_executor_and_flags() -> None:
+    """Runs that can be judged differently never share a key."""
+    key = make_key("python", PROBLEM, request(), hidden=False, executor="local")
+    assert key == make_key("python", PROBLEM, request(), hidden=False, executor="local")
+    assert key != make_key(
+        "python",
+        PROBLEM,
+        request(),
+        hidden=False,
+        executor="sandbox",
+    )
+    assert key != make_key("python", PROBLEM, request(), hidden=True, executor="local")
+    assert key != make_key(
+        "python",
+        PROBLEM,
+        request(fail_fast=True),
+        hidden=False,
+        executor="local",
+    )
+    assert key != make_key(
+        "python",
+        PROBLEM,
+        request("other"),
+        hidden=False,
+        executor="local",
+    )
+    changed = {**PROBLEM, "time_limit_seconds": 2}
+    assert key != make_key("python", changed, request(), hidden=False, executor="local")
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    """A lookup keeps an entry alive when the memory tier is full."""
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", {"total": 1})
+    cache.put("b", {"total": 2})
+    assert cache.get("a") == {"total": 1}
+    cache.put("c", {"total": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"total": 1}
+    assert cache.get("c") == {"total": 3}
+    assert cache.stats()["entries"] == 2
+
+
+def test_hits_are_copies() -> None:
+    """Changing a hit does not change the cached results."""
+    cache = ResultCache(max_entries=4, ttl_seconds=60)
+    cache.put("a", {"total": 1})
+    cache.get("a")["total"] = 99
+    assert cache.get("a") == {"total": 1}
+
+
+def test_expired_entries_miss(tmp_path: Path) -> None:
+    """Entries past their TTL miss and their file is removed."""
+    cache = ResultCache(max_entries=4, ttl_seconds=-1, persist_dir=tmp_path)
+    cache.put("a", {"total": 1})
+    assert cache.get("a") is None
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_disk_tier_survives_restart(tmp_path: Path) -> None:
+    """A new cache on the same directory answers from disk."""
+    ResultCache(max_entries=4, ttl_seconds=60, persist_dir=tmp_path).put(
+        "a",
+        {"total": 1},
+    )
+    cache = ResultCache(max_entries=4, ttl_seconds=60, persist_dir=tmp_path)
+    assert cache.get("a") == {"total": 1}
+    assert cache.stats()["hits"] == 1
+
+
+def test_sweep_removes_expired_then_oldest(tmp_path: Path) -> None:
+    """The disk tier drops expired files and stays within its byte budget."""
+    cache = ResultCache(
+        max_entries=16,
+        ttl_seconds=60,
+        persist_dir=tmp_path,
+        max_disk_mb=1,
+    )
+    cache.put("old", {"output": "x" * 1000})
+    cache.put("new", {"output": "y" * 1000})
+    old, new = cache._path("old"), cache._path("new")  # noqa: SLF001
+    size = new.stat().st_size
+    now = time.time()
+    os.utime(old, (now + 10, now + 10))
+    os.utime(new, (now + 20, now + 20))
+    cache.put("expired", {"output": "z"})
+    expired = cache._path("expired")  # noqa: SLF001
+    os.utime(expired, (now - 1, now - 1))
+
+    cache.max_disk_bytes = size
+    cache.sweep()
+    assert not expired.exists()
+    assert not old.exists()
+    assert new.exists()
+
+
+def test_put_sweeps_periodically(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Writes sweep the disk tier at most once per interval."""
+    monkeypatch.setattr(result_cache, "DISK_SWEEP_INTERVAL_SECONDS", 3600)
+    cache = ResultCache(
+        max_entries=16,
+        ttl_seconds=60,
+        persist_dir=tmp_path,
+        max_disk_mb=0,
+    )
+    cache.put("a", {"total": 1})
+    assert not list(tmp_path.glob("*.json"))
+    # The next sweep is an interval away
+    cache.put("b", {"total": 2})
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    cache._next_sweep = 0  # noqa: SLF001
+    cache.put("c", {"total": 3})
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_disabled_cache() -> None:
+    """A cache of size 0 never stores anything."""
+    cache = ResultCache(max_entries=0)
+    cache.put("a", {"total": 1})
+    assert cache.get("a") is None
+
+
+def test_only_stable_verdicts_are_cacheable() -> None:
+    """Errors, empty runs and load-dependent verdicts are not cached."""
+    accepted = {"passed": True, "error": ""}
+    wrong = {"passed": False, "error": "Wrong Answer"}
+    assert is_cacheable(report(accepted, wrong))
+    assert not is_cacheable({"error": "Docker is down", "total": 0})
+    assert not is_cacheable(report())
+    assert not is_cacheable(
+        report(accepted, {"passed": False, "error": "Time Limit Exceeded"}),
+    )
+    assert not is_cacheable(
+        report({"passed": False, "error": "Memory Limit Exceeded"}),
+    )
+    hidden = {"passed": False, "is_hidden": True, "error": "Hidden test case failed"}
+    assert not is_cacheable(report(hidden))
@@ -0,0 +1,224 @@
+"""Run a tester directly on the host inside resource limits and namespaces.
+
+Meant for trusted code such as instructor previews and catalog self-tests:
+it skips container startup, but the confinement is much weaker than
+Docker's. The process confines itself and then runs the tester command of
+a language, pointed at a private job directory::
+
+    python sandbox.py JOB_DIR [--events] [--hide DIR ...] -- TESTER_COMMAND...
+
+``JOB_DIR`` holds ``code/``, ``tests/`` and ``results/``; the report is
+written to ``results/results.json``. Each ``--hide`` directory is covered
+by an empty read-only tmpfs, except for the job directory and the testers
+in ``docker/``, which stay visible, the testers read-only.
+"""
+
+import argparse
+import ctypes
+import os
+import resource
+import sys
+from pathlib import Path
+
+# Without CLONE_NEWUSER the other namespaces need CAP_SYS_ADMIN
+NAMESPACES = (
+    os.CLONE_NEWNS
+    | os.CLONE_NEWPID
+    | os.CLONE_NEWNET
+    | os.CLONE_NEWIPC
+    | os.CLONE_NEWUTS
+)
+TESTERS_DIR = Path(__file__).resolve().parent / "docker"
+# Who the tester runs as inside a user namespace when the API runs as root
+NOBODY = 65534
+
+# Flags of mount(2)
+MS_RDONLY = 1
+MS_NOSUID = 2
+MS_NODEV = 4
+MS_NOEXEC = 8
+MS_REMOUNT = 32
+MS_BIND = 4096
+MS_REC = 16384
+MS_PRIVATE = 1 << 18
+
+_libc = ctypes.CDLL(None, use_errno=True)
+
+
+def _mount(
+    source: str | None,
+    target: Path,
+    fstype: str | None,
+    flags: int,
+    data: str | None = None,
+) -> None:
+    """Call mount(2), raising ``OSError`` when it fails."""
+    if _libc.mount(
+        source.encode() if source else None,
+        str(target).encode(),
+        fstype.encode() if fstype else None,
+        flags,
+        data.encode() if data else None,
+    ):
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno), str(target))
+
+
+def _set_limit(limit: int, value: int) -> None:
+    """Lower both the soft and the hard ``limit`` so they cannot be raised."""
+    resource.setrlimit(limit, (value, value))
+
+
+def _enter_namespaces() -> None:
+    """Unshare the namespaces, inside a new user namespace if possible.
+
+    Inside a user namespace the tester runs as an unprivileged user, so it
+    loses the namespace's capabilities when it is executed and cannot undo
+    the mounts.
+    """
+    uid, gid = os.getuid(), os.getgid()
+    try:
+        os.unshare(os.CLONE_NEWUSER | NAMESPACES)
+    except OSError:
+        # Unprivileged user namespaces are disabled; works as root
+        os.unshare(NAMESPACES)
+        return
+    Path("/proc/self/setgroups").write_text("deny", encoding="ascii")
+    Path("/proc/self/uid_map").write_text(f"{uid or NOBODY} {uid} 1", encoding="ascii")
+    Path("/proc/self/gid_map").write_text(f"{gid or NOBODY} {gid} 1", encoding="ascii")
+
+
+def _wait_for_child() -> None:
+    """Fork; the parent exits with the child's status once it is done.
+
+    The child is the first process of the new PID namespace, so everything
+    the tester starts dies with it.
+    """
+    pid = os.fork()
+    if pid == 0:
+        return
+    _, status = os.waitpid(pid, 0)
+    code = os.waitstatus_to_exitcode(status)
+    os._exit(code if code >= 0 else 128 - code)
+
+
+def _hide(hidden: list[Path], visible: list[Path], read_only: list[Path]) -> None:
+    """Cover ``hidden`` with empty tmpfs mounts, keeping ``visible`` paths.
+
+    ``/proc`` is mounted again so it only shows the sandbox's processes;
+    the host's ``/proc`` would lead back to hidden files through the API
+    process's ``cwd`` and ``root`` links.
+    """
+    # Bind mounts of the visible paths are made from descriptors opened
+    # before anything covers them
+    kept = {path: os.open(path, os.O_PATH) for path in visible}
+    try:
+        _mount(None, Path("/"), None, MS_REC | MS_PRIVATE)
+        _mount("proc", Path("/proc"), "proc", MS_NOSUID | MS_NODEV | MS_NOEXEC)
+        covered = []
+        # Parents first; a directory inside a covered one is gone already
+        for path in sorted(hidden):
+            if path.is_dir():
+                _mount("tmpfs", path, "tmpfs", MS_NOSUID | MS_NODEV, "mode=755")
+                covered.append(path)
+        for path, fd in kept.items():
+            if path in read_only or any(path.is_relative_to(c) for c in covered):
+                path.mkdir(parents=True, exist_ok=True)
+                _mount(f"/proc/self/fd/{fd}", path, None, MS_BIND | MS_REC)
+        for path in read_only:
+            _mount(None, path, None, MS_REMOUNT | MS_BIND | MS_RDONLY | MS_NOSUID)
+        for path in covered:
+            _mount(None, path, None, MS_REMOUNT | MS_RDONLY | MS_NOSUID | MS_NODEV)
+    finally:
+        for fd in kept.values():
+            os.close(fd)
+
+
+def limit_resources(
+    *,  # Force keyword arguments after this point
+    cpu_seconds: int,
+    memory_mb: int,
+    data_mb: int,
+    file_size_mb: int,
+) -> None:
+    """Apply the resource limits that do not depend on the namespaces.
+
+    ``memory_mb`` caps the address space and ``data_mb`` the data segment,
+    which also holds heap allocations; 0 leaves either unlimited.
+    """
+    _set_limit(resource.RLIMIT_CPU, cpu_seconds)
+    if memory_mb:
+        _set_limit(resource.RLIMIT_AS, memory_mb * 1024 * 1024)
+    if data_mb:
+        _set_limit(resource.RLIMIT_DATA, data_mb * 1024 * 1024)
+    _set_limit(resource.RLIMIT_FSIZE, file_size_mb * 1024 * 1024)
+    _set_limit(resource.RLIMIT_CORE, 0)
+
+
+def confine(
+    *,  # Force keyword arguments after this point
+    job_dir: Path,
+    max_processes: int,
+    hidden: list[Path],
+) -> None:
+    """Detach from the host.
+
+    The process gets new mount, PID, network, IPC and UTS namespaces,
+    inside a new user namespace when the kernel allows unprivileged ones,
+    and forks: only the child returns. ``hidden`` directories are covered
+    by empty mounts, except for ``job_dir`` and the testers.
+
+    ``max_processes`` counts the sandbox's processes and threads when a
+    user namespace was created; without one it counts every process of
+    the user running the API, and nothing when that user is root.
+
+    Raises ``OSError`` when the namespaces or mounts cannot be created.
+    """
+    _enter_namespaces()
+    _wait_for_child()
+    _hide(hidden, [job_dir, TESTERS_DIR], [TESTERS_DIR])
+    # Set inside the user namespace, where only the sandbox's processes count
+    _set_limit(resource.RLIMIT_NPROC, max_processes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("job_dir", type=Path, help="directory holding the job")
+    parser.add_argument("--events", action="store_true", help="stream case events")
+    parser.add_argument("--cpu-seconds", type=int, default=60)
+    parser.add_argument("--memory-mb", type=int, default=2048)
+    parser.add_argument("--data-mb", type=int, default=0)
+    parser.add_argument("--file-size-mb", type=int, default=16)
+    parser.add_argument("--max-processes", type=int, default=256)
+    parser.add_argument(
+        "--hide",
+        type=Path,
+        action="append",
+        default=[],
+        help="directory to cover with an empty mount",
+    )
+    parser.add_argument("command", nargs="+", help="tester command to run")
+    args = parser.parse_args()
+
+    job_dir = args.job_dir.resolve()
+    limit_resources(
+        cpu_seconds=args.cpu_seconds,
+        memory_mb=args.memory_mb,
+        data_mb=args.data_mb,
+        file_size_mb=args.file_size_mb,
+    )
+    try:
+        confine(
+            job_dir=job_dir,
+            max_processes=args.max_processes,
+            hidden=[path.resolve() for path in args.hide],
+        )
+    except OSError as e:
+        sys.exit(f"sandbox: cannot confine the run: {e}")
+    os.chdir(job_dir)
+    # Security note: the tester command is passed by SandboxExecutor, which
+    # takes it from the language's constant settings
+    command = [*args.command, "--root", str(job_dir)]
+    if args.events:
+        command.append("--events")
+    os.execvp(command[0], command)
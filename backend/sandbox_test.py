@@ -0,0 +1,94 @@
+"""Tests for running the Python tester in the host sandbox."""
+
+from pathlib import Path
+from typing import Any
+
+from executors import SandboxExecutor
+from submission_processor import prepare_test_cases, render_test_files
+
+BACKEND_DIR = Path(__file__).resolve().parent
+PROBLEM = {
+    "test_cases": {
+        "visible_cases": [
+            {"input": "1 2", "expected_output": "3"},
+            {"input": "5 5", "expected_output": "10"},
+        ],
+    },
+}
+
+
+def run(solution: str, problem: dict[str, Any] = PROBLEM) -> tuple[dict, list]:
+    """Run ``solution`` on the problem's cases; return the report and events."""
+    cases = prepare_test_cases.fn(problem, hidden=False)
+    files = {
+        f"tests/{name}": content
+        for name, content in render_test_files.fn(cases, 5).items()
+    }
+    files["code/solution.py"] = solution
+    events = []
+    report = SandboxExecutor().execute("code-gym-tester", "job", files, events.append)
+    return report, events
+
+
+def test_cases_are_graded_with_live_events() -> None:
+    """The report grades every case, and case events arrive as they run."""
+    report, events = run("a, b = map(int, input().split())\nprint(a + b)\n")
+    assert (report["passed"], report["failed"]) == (2, 0)
+    assert [event["type"] for event in events].count("case") == 2
+
+    report, _ = run("a, b = map(int, input().split())\nprint(a * b)\n")
+    assert [result["passed"] for result in report["test_results"]] == [
+        False,
+        False,
+    ]
+
+
+def output_of(solution: str) -> str:
+    """Run ``solution`` once and return what it printed."""
+    problem = {"test_cases": {"visible_cases": [{"expected_output": "-"}]}}
+    report, _ = run(solution, problem)
+    return report["test_results"][0]["actual"]
+
+
+def test_backend_is_hidden_from_the_solution() -> None:
+    """The solution sees neither the backend's files nor other processes."""
+    solution = (
+        "import os\n"
+        f"backend = os.listdir({str(BACKEND_DIR)!r})\n"
+        "processes = [name for name in os.listdir('/proc') if name.isdigit()]\n"
+        "print(backend, len(processes) < 10)\n"
+    )
+    # Only the mount point of the testers is left
+    assert output_of(solution) == "['docker'] True"
+
+
+def test_testers_are_read_only() -> None:
+    """The testers stay visible to the run but cannot be changed by it."""
+    tester = BACKEND_DIR / "docker" / "tester" / "fork_server.py"
+    solution = (
+        "try:\n"
+        f"    open({str(tester)!r}, 'a')\n"
+        "except OSError as e:\n"
+        "    print(type(e).__name__)\n"
+    )
+    assert output_of(solution) == "OSError"
+
+
+def test_processes_do_not_outlive_the_run() -> None:
+    """Processes the solution starts are killed with the run."""
+    solution = (
+        "import subprocess\n"
+        "subprocess.Popen(\n"
+        "    ['sleep', '4321'],\n"
+        "    stdout=subprocess.DEVNULL,\n"
+        "    start_new_session=True,\n"
+        ")\n"
+        "print('ok')\n"
+    )
+    assert output_of(solution) == "ok"
+    leftover = [
+        path
+        for path in Path("/proc").glob("[0-9]*/cmdline")
+        if path.exists() and path.read_bytes() == b"sleep\x004321\x00"
+    ]
+    assert leftover == []
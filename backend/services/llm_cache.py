@@ -0,0 +1,246 @@
+"""Cache of LLM responses for repeated prompts.
+
+The assistant features build their prompt from the question and the
+student's code, so a byte-identical request yields an identical prompt.
+Answers are kept in a small in-memory LRU in front of an SQLite file that
+survives restarts; entries expire after a TTL, and the file is trimmed to
+a byte budget, least recently used first. The lock only guards the memory
+tier; SQLite reads and writes happen outside it, so one request's disk I/O
+does not hold up the others.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+# Answers kept in memory; 0 disables the cache altogether
+LLM_CACHE_SIZE = int(os.environ.get("CODE_GYM_LLM_CACHE_SIZE", "256"))
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("CODE_GYM_LLM_CACHE_TTL_SECONDS", "86400"))
+# Empty keeps answers in memory only
+LLM_CACHE_PATH = os.environ.get(
+    "CODE_GYM_LLM_CACHE_PATH",
+    str(Path(__file__).parent / "llm_cache.db"),
+)
+LLM_CACHE_MAX_MB = float(os.environ.get("CODE_GYM_LLM_CACHE_MAX_MB", "64"))
+# Seconds between trims of the SQLite tier
+TRIM_INTERVAL_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    feature TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Drop line-ending, trailing-whitespace and blank-line differences."""
+    lines = [line.rstrip() for line in prompt.replace("\r\n", "\n").split("\n")]
+    kept = [line for i, line in enumerate(lines) if line or (i > 0 and lines[i - 1])]
+    return "\n".join(kept).strip()
+
+
+def make_key(feature: str, model: str, prompt: str) -> str:
+    """Build the cache key of one LLM request."""
+    encoded = json.dumps([feature, model, normalize_prompt(prompt)]).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class LLMCache:
+    """Two-tier cache of LLM answers with a TTL and a size budget."""
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_SIZE,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        path: str = LLM_CACHE_PATH,
+        max_mb: float = LLM_CACHE_MAX_MB,
+    ) -> None:
+        """Create the cache; an empty ``path`` disables the SQLite tier."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path if max_entries > 0 else ""
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_trim = 0.0
+        if self.path:
+            with closing(self._connect()) as connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the cache safe to share across threads
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _load(self, key: str, now: float) -> tuple[float, str] | None:
+        """Read a live entry from the SQLite tier and mark it used."""
+        if not self.path:
+            return None
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT expires_at, response FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] < now:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            connection.execute(
+                "UPDATE responses SET used_at = ? WHERE key = ?",
+                (now, key),
+            )
+        return row[0], row[1]
+
+    def _store(
+        self,
+        key: str,
+        feature: str,
+        model: str,
+        entry: tuple[float, str],
+        now: float,
+    ) -> None:
+        """Write an entry to the SQLite tier."""
+        if not self.path:
+            return
+        expires_at, response = entry
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, feature, model, response, size, expires_at, used_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    feature,
+                    model,
+                    response,
+                    len(response.encode("utf-8")),
+                    expires_at,
+                    now,
+                ),
+            )
+
+    def trim(self) -> None:
+        """Drop expired answers, then the least recently used over budget."""
+        if not self.path:
+            return
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "DELETE FROM responses WHERE expires_at < ?",
+                (time.time(),),
+            )
+            # Keep the most recently used answers that fit in the budget
+            connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM ("
+                "  SELECT key, SUM(size) OVER (ORDER BY used_at DESC) AS kept"
+                "  FROM responses"
+                " ) WHERE kept > ?"
+                ")",
+                (self.max_bytes,),
+            )
+
+    def _insert(self, key: str, entry: tuple[float, str]) -> None:
+        """Add to the memory tier, evicting least recently used entries."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(
+        self,
+        feature: str,
+        model: str,
+        prompt: str,
+        *,  # Force keyword arguments after this point
+        bypass: bool = False,
+    ) -> str | None:
+        """Return the cached answer to ``prompt``, or None.
+
+        ``bypass`` always misses, so the caller asks the model again and
+        replaces the cached answer.
+        """
+        if self.max_entries <= 0:
+            return None
+        if bypass:
+            with self._lock:
+                self.bypassed += 1
+            return None
+        key = make_key(feature, model, prompt)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= now:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+        entry = self._load(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._insert(key, entry)
+            self.disk_hits += 1
+        return entry[1]
+
+    def put(self, feature: str, model: str, prompt: str, response: str) -> None:
+        """Cache the model's ``response`` to ``prompt``."""
+        if self.max_entries <= 0 or not response:
+            return
+        key = make_key(feature, model, prompt)
+        now = time.time()
+        entry = (now + self.ttl_seconds, response)
+        with self._lock:
+            self._insert(key, entry)
+            trim = bool(self.path) and now >= self._next_trim
+            if trim:
+                self._next_trim = now + TRIM_INTERVAL_SECONDS
+        self._store(key, feature, model, entry, now)
+        if trim:
+            self.trim()
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit and miss counters and the size of both tiers."""
+        disk: dict[str, Any] | None = None
+        if self.path:
+            with closing(self._connect()) as connection:
+                count, size = connection.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses",
+                ).fetchone()
+            disk = {"entries": count, "bytes": size, "max_bytes": self.max_bytes}
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk": disk,
+            }
+
+
+llm_cache = LLMCache()
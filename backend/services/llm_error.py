@@ -1,67 +1,110 @@
 """LLM Error Explain Model."""
 
+from collections.abc import Generator
+
 import mlflow
 
-from .query_llm import chat_with_llm
+from .query_llm import chat_with_llm, stream_chat_with_llm
 
+# Resource usage differs on every run and says nothing about the error, so
+# it is left out of the prompt, which keeps it cacheable
+MEASUREMENTS = {"wall_time_ms", "cpu_time_ms", "peak_memory_kb"}
 
-def generate_error_explanation(error_list: list[dict],
-                               question_title: str,
-                               question_description: str,
-                               user_code: str) -> str:
-    """Generate error explanation."""
-    with mlflow.start_run():
-        # Log input parameters
-        mlflow.log_param("feature", "explain_error")
-        mlflow.log_param("question_title", question_title)
-        mlflow.log_param("num_errors", len(error_list))
 
-        # Log input artifacts
-        mlflow.log_text(question_description, "question_description.txt")
-        mlflow.log_text(user_code, "user_code.py")
-        mlflow.log_text(str(error_list), "error_list.txt")
+def prepare_prompt(error_list: list[dict], question_title: str,
+                   question_description: str, user_code: str) -> str:
+    """Prepare Prompt for the LLM."""
+    errors = [
+        {key: value for key, value in error.items() if key not in MEASUREMENTS}
+        for error in error_list
+    ]
 
-        # Construct prompt
-        prompt = f"""
-        You are a Python error analyst.
+    return f"""
+    You are a Python error analyst.
+
+    PROBLEM:
+    Title: {question_title}
+    Description: {question_description}
+
+    STUDENT CODE:
+    {user_code}
+
+    "Errors":
+    {errors}
+
+    TASK:
+    Explain the errors according to the testcases occurred for
+    the question and also identify and
+    explain any runtime or compile-time errors in the code.
+    Focus only on explaining what the errors mean in simple terms.
+
+    FORMAT (use exactly this format):
 
-        PROBLEM:
-        Title: {question_title}
-        Description: {question_description}
+    Error Detected
+    [Name of the error type]
 
-        STUDENT CODE:
-        {user_code}
+    Error Explanation
+    [2-3 sentences explaining what the error means in plain language]
 
-        "Errors":
-        {error_list}
+    Cause
+    [1-2 sentences identifying the specific part of code causing the error]
 
-        TASK:
-        Explain the errors according to the testcases occurred for
-        the question and also identify and
-        explain any runtime or compile-time errors in the code.
-        Focus only on explaining what the errors mean in simple terms.
+    Fix
+    [Brief fix to correct the errors. Don't give the code, just give an idea.]
 
-        FORMAT (use exactly this format):
+    """
 
-        Error Detected
-        [Name of the error type]
 
-        Error Explanation
-        [2-3 sentences explaining what the error means in plain language]
+def log_inputs(error_list: list[dict], question_title: str,
+               question_description: str, user_code: str) -> None:
+    """Log the inputs of an explanation to the active MLflow run."""
+    # Log input parameters
+    mlflow.log_param("feature", "explain_error")
+    mlflow.log_param("question_title", question_title)
+    mlflow.log_param("num_errors", len(error_list))
 
-        Cause
-        [1-2 sentences identifying the specific part of code causing the error]
+    # Log input artifacts
+    mlflow.log_text(question_description, "question_description.txt")
+    mlflow.log_text(user_code, "user_code.py")
+    mlflow.log_text(str(error_list), "error_list.txt")
 
-        Fix
-        [Brief fix to correct the errors. Don't give the code, just give an idea.]
 
-        """
+def generate_error_explanation(error_list: list[dict],
+                               question_title: str,
+                               question_description: str,
+                               user_code: str, *,
+                               use_cache: bool = True) -> str:
+    """Generate error explanation."""
+    with mlflow.start_run():
+        log_inputs(error_list, question_title, question_description, user_code)
+
+        # Construct prompt
+        prompt = prepare_prompt(error_list, question_title,
+                                question_description, user_code)
 
         # Run LLM
-        response = chat_with_llm(prompt)
+        response = chat_with_llm(prompt, feature="explain_error",
+                                 use_cache=use_cache)
 
         # Log response
         mlflow.log_text(response, "llm_response.txt")
         mlflow.log_metric("response_length", len(response))
 
         return response
+
+
+def stream_error_explanation(error_list: list[dict],
+                             question_title: str,
+                             question_description: str,
+                             user_code: str, *,
+                             use_cache: bool = True) -> Generator[str, None, str]:
+    """Stream the error explanation as the model writes it."""
+    prompt = prepare_prompt(error_list, question_title,
+                            question_description, user_code)
+    response = yield from stream_chat_with_llm(prompt, feature="explain_error",
+                                               use_cache=use_cache)
+    with mlflow.start_run():
+        log_inputs(error_list, question_title, question_description, user_code)
+        mlflow.log_text(response, "llm_response.txt")
+        mlflow.log_metric("response_length", len(response))
+    return response
@@ -1,9 +1,11 @@
 """Progressive LLM Hint Module."""
 
+from collections.abc import Generator
+
 import mlflow
 from prefect import flow, task
 
-from .query_llm import chat_with_llm
+from .query_llm import chat_with_llm, stream_chat_with_llm
 
 
 @task(name="prepare_prompt")
@@ -50,16 +52,29 @@ def log_mlflow_data(question_title: str, question_description: str,
 @flow(name="Generate Progressive Hints")
 def generate_progressive_hints(question_title: str,
                                question_description: str,
-                               user_code: str) -> str:
+                               user_code: str, *,
+                               use_cache: bool = True) -> str:
     """Generate three progressive hints for the problem."""
     with mlflow.start_run(run_name="LLM_Feature: Progressive Hints"):
         # Prepare the prompt
         prompt = prepare_prompt(question_title, question_description, user_code)
 
         # Get LLM response
-        response = chat_with_llm(prompt)
+        response = chat_with_llm(prompt, feature="hint",
+                                 use_cache=use_cache)
 
         # Log MLflow metrics and data
         log_mlflow_data(question_title, question_description, user_code, response)
 
         return response
+
+def stream_progressive_hints(question_title: str,
+                             question_description: str, user_code: str, *,
+                             use_cache: bool = True) -> Generator[str, None, str]:
+    """Stream the three progressive hints as the model writes them."""
+    prompt = prepare_prompt.fn(question_title, question_description, user_code)
+    response = yield from stream_chat_with_llm(prompt, feature="hint",
+                                               use_cache=use_cache)
+    with mlflow.start_run(run_name="LLM_Feature: Progressive Hints"):
+        log_mlflow_data.fn(question_title, question_description, user_code, response)
+    return response
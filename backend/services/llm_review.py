@@ -1,9 +1,11 @@
 """LLM Review Module."""
 
+from collections.abc import Generator
+
 import mlflow
 from prefect import flow, task
 
-from .query_llm import chat_with_llm
+from .query_llm import chat_with_llm, stream_chat_with_llm
 
 
 @task(name="prepare_review_prompt")
@@ -48,16 +50,29 @@ def log_mlflow_data(question_title: str, question_description: str,
 
 @flow(name="Generate Code Review")
 def generate_code_review(question_title: str,
-                        question_description: str, user_code: str) -> str:
+                        question_description: str, user_code: str, *,
+                        use_cache: bool = True) -> str:
     """generate_code_review."""
     with mlflow.start_run(run_name="LLM_Feature: Code Review"):
         # Prepare the prompt
         prompt = prepare_prompt(question_title, question_description, user_code)
 
         # Get LLM response
-        response = chat_with_llm(prompt)
+        response = chat_with_llm(prompt, feature="code_review",
+                                 use_cache=use_cache)
 
         # Log MLflow metrics and data
         log_mlflow_data(question_title, question_description, user_code, response)
 
         return response
+
+def stream_code_review(question_title: str,
+                       question_description: str, user_code: str, *,
+                       use_cache: bool = True) -> Generator[str, None, str]:
+    """Stream the code review as the model writes it."""
+    prompt = prepare_prompt.fn(question_title, question_description, user_code)
+    response = yield from stream_chat_with_llm(prompt, feature="code_review",
+                                               use_cache=use_cache)
+    with mlflow.start_run(run_name="LLM_Feature: Code Review"):
+        log_mlflow_data.fn(question_title, question_description, user_code, response)
+    return response
@@ -1,9 +1,11 @@
 """Conceptual Scaffold Module."""
 
+from collections.abc import Generator
+
 import mlflow
 from prefect import flow, task
 
-from .query_llm import chat_with_llm
+from .query_llm import chat_with_llm, stream_chat_with_llm
 
 
 @task(name="prepare_scaffold_prompt")
@@ -58,16 +60,29 @@ def log_mlflow_data(question_title: str, question_description: str,
 
 @flow(name="Scaffold Question")
 def scaffold_question(question_title: str,
-                      question_description: str, user_code: str) -> str:
+                      question_description: str, user_code: str, *,
+                      use_cache: bool = True) -> str:
     """Write conceptual scaffolding of the question."""
     with mlflow.start_run(run_name="LLM_Feature: Scaffold Question"):
         # Prepare the prompt
         prompt = prepare_prompt(question_title, question_description, user_code)
 
         # Get LLM response
-        response = chat_with_llm(prompt)
+        response = chat_with_llm(prompt, feature="scaffold",
+                                 use_cache=use_cache)
 
         # Log MLflow metrics and data
         log_mlflow_data(question_title, question_description, user_code, response)
 
         return response
+
+def stream_question_scaffold(question_title: str,
+                             question_description: str, user_code: str, *,
+                             use_cache: bool = True) -> Generator[str, None, str]:
+    """Stream the conceptual scaffolding as the model writes it."""
+    prompt = prepare_prompt.fn(question_title, question_description, user_code)
+    response = yield from stream_chat_with_llm(prompt, feature="scaffold",
+                                               use_cache=use_cache)
+    with mlflow.start_run(run_name="LLM_Feature: Scaffold Question"):
+        log_mlflow_data.fn(question_title, question_description, user_code, response)
+    return response
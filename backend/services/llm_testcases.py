@@ -1,9 +1,11 @@
 """LLM testcase generation module."""
 
+from collections.abc import Generator
+
 import mlflow
 from prefect import flow, task
 
-from .query_llm import chat_with_llm
+from .query_llm import chat_with_llm, stream_chat_with_llm
 
 
 @task(name="prepare_testcase_prompt")
@@ -56,16 +58,29 @@ def log_mlflow_data(question_title: str, question_description: str,
 
 @flow(name="Generate Test Cases")
 def generate_test_cases(question_title: str,
-                        question_description: str, user_code: str) -> str:
+                        question_description: str, user_code: str, *,
+                        use_cache: bool = True) -> str:
     """Generate test cases using LLM."""
     with mlflow.start_run(run_name="LLM_Feature: Generate Test Cases"):
         # Prepare the prompt
         prompt = prepare_prompt(question_title, question_description, user_code)
 
         # Get LLM response
-        response = chat_with_llm(prompt)
+        response = chat_with_llm(prompt, feature="test_cases",
+                                 use_cache=use_cache)
 
         # Log MLflow metrics and data
         log_mlflow_data(question_title, question_description, user_code, response)
 
         return response
+
+def stream_test_cases(question_title: str,
+                      question_description: str, user_code: str, *,
+                      use_cache: bool = True) -> Generator[str, None, str]:
+    """Stream the generated test cases as the model writes them."""
+    prompt = prepare_prompt.fn(question_title, question_description, user_code)
+    response = yield from stream_chat_with_llm(prompt, feature="test_cases",
+                                               use_cache=use_cache)
+    with mlflow.start_run(run_name="LLM_Feature: Generate Test Cases"):
+        log_mlflow_data.fn(question_title, question_description, user_code, response)
+    return response
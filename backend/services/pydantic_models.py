@@ -1,6 +1,8 @@
 """Pydantic Models."""
 
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
 
 
 class LLMRequest(BaseModel):
@@ -9,9 +11,37 @@ class LLMRequest(BaseModel):
     title: str
     description: str
     code: str
+    bypass_cache: bool = False
+    # Returned by a run endpoint; names the run the explain-error feature explains
+    submission_id: str | None = None
+
 
 class RunCodeRequest(BaseModel):
     """Code run model."""
 
     code: str
     question_id: str
+    fail_fast: bool = False
+    executor: Literal["local", "remote", "sandbox"] | None = None
+
+
+class SubmissionRequest(RunCodeRequest):
+    """Queued code run model."""
+
+    language: Literal["python", "javascript"] = "python"
+    hidden: bool = False
+
+
+class CatalogHeaders(BaseModel):
+    """Request headers the cached catalog endpoints answer to."""
+
+    if_none_match: str | None = None
+    accept_encoding: str | None = None
+
+
+class CatalogPage(BaseModel):
+    """Projection and page of a catalog list."""
+
+    fields: str | None = None
+    offset: int = Field(0, ge=0)
+    limit: int | None = Field(None, ge=1)
@@ -1,9 +1,14 @@
 """LLM Query."""
 
+import time
+from collections.abc import Generator, Iterator
+
 import mlflow
 import ollama
 from prefect import flow, task
 
+from .llm_cache import llm_cache
+
 
 @task(name="query_llm_model",
       retries=3,
@@ -18,6 +23,19 @@ def query_model(prompt: str, model: str) -> str:
     )
     return response["message"]["content"]
 
+def stream_model(prompt: str, model: str) -> Iterator[str]:
+    """Yield the LLM model's answer piece by piece as it is generated."""
+    for chunk in ollama.chat(
+        model=model,
+        messages=[
+            {"role": "user", "content": prompt},
+        ],
+        stream=True,
+    ):
+        content = chunk["message"]["content"]
+        if content:
+            yield content
+
 @task(name="log_mlflow_metrics")
 def log_mlflow_metrics(prompt: str, output: str, model: str) -> None:
     """Log metrics and artifacts to MLflow."""
@@ -27,8 +45,17 @@ def log_mlflow_metrics(prompt: str, output: str, model: str) -> None:
     mlflow.log_metric("response_length", len(output))
 
 @flow(name="LLM Chat Flow")
-def chat_with_llm(prompt: str, model: str = "qwen2.5") -> str:
-    """Chat with LLM and log results."""
+def chat_with_llm(prompt: str, model: str = "qwen2.5", *,
+                  feature: str = "chat", use_cache: bool = True) -> str:
+    """Chat with LLM and log results.
+
+    Answers are cached per feature, model and prompt; ``use_cache=False``
+    asks the model again and replaces the cached answer.
+    """
+    cached = llm_cache.get(feature, model, prompt, bypass=not use_cache)
+    if cached is not None:
+        return cached
+
     with mlflow.start_run(run_name="LLM_Model_Response", nested=True):
         # Query the model
         output = query_model(prompt, model)
@@ -36,4 +63,44 @@ def chat_with_llm(prompt: str, model: str = "qwen2.5") -> str:
         # Log metrics and artifacts
         log_mlflow_metrics(prompt, output, model)
 
+        llm_cache.put(feature, model, prompt, output)
         return output
+
+def stream_chat_with_llm(prompt: str, model: str = "qwen2.5", *,
+                         feature: str = "chat",
+                         use_cache: bool = True) -> Generator[str, None, str]:
+    """Stream an LLM answer and return the full text when it ends.
+
+    A cached answer arrives as one piece. The answer is logged, with its
+    time to first token, and cached only once the model has finished, so
+    an interrupted stream leaves no partial answer behind. Streams run
+    outside Prefect: a generator cannot be a flow, and task runs created
+    outside a flow would delay the first token, so tasks are called
+    through ``.fn``.
+    """
+    cached = llm_cache.get(feature, model, prompt, bypass=not use_cache)
+    if cached is not None:
+        yield cached
+        return cached
+
+    started = time.perf_counter()
+    first_token_ms = None
+    pieces = []
+    for piece in stream_model(prompt, model):
+        if first_token_ms is None:
+            first_token_ms = (time.perf_counter() - started) * 1000
+        pieces.append(piece)
+        yield piece
+    output = "".join(pieces)
+
+    with mlflow.start_run(run_name="LLM_Model_Response", nested=True):
+        log_mlflow_metrics.fn(prompt, output, model)
+        mlflow.log_param("streamed", value=True)
+        if first_token_ms is not None:
+            mlflow.log_metric("time_to_first_token_ms", first_token_ms)
+        mlflow.log_metric(
+            "generation_time_ms", (time.perf_counter() - started) * 1000,
+        )
+
+    llm_cache.put(feature, model, prompt, output)
+    return output
@@ -0,0 +1,113 @@
+"""Per-submission event streams relayed to clients while tests run."""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from typing import Any
+
+EVENT_RETENTION_SECONDS = float(
+    os.environ.get("CODE_GYM_EVENT_RETENTION_SECONDS", "3600"),
+)
+
+
+class EventStream:
+    """Append-only list of events for one submission.
+
+    Worker threads publish; any number of asyncio readers can replay the
+    events from any position and then wait for new ones.
+    """
+
+    def __init__(self, stream_id: str) -> None:
+        """Create an open, empty stream."""
+        self.stream_id = stream_id
+        self.closed_at: float | None = None
+        self._events: list[dict[str, Any]] = []
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the submission has finished and no more events will come."""
+        return self.closed_at is not None
+
+    def publish(self, event: dict[str, Any]) -> None:
+        """Append an event and wake every waiting reader."""
+        with self._lock:
+            if self.closed:
+                return
+            self._events.append(event)
+            self._wake()
+
+    def close(self) -> None:
+        """Mark the stream finished and wake every waiting reader."""
+        with self._lock:
+            if self.closed_at is None:
+                self.closed_at = time.time()
+            self._wake()
+
+    def _wake(self) -> None:
+        for loop, waiter in self._waiters:
+            loop.call_soon_threadsafe(waiter.set)
+
+    def has(self, event_type: str) -> bool:
+        """Whether any event of ``event_type`` has been published."""
+        with self._lock:
+            return any(event["type"] == event_type for event in self._events)
+
+    def since(self, cursor: int) -> list[dict[str, Any]]:
+        """Return the events published after the first ``cursor`` ones."""
+        with self._lock:
+            return self._events[cursor:]
+
+    async def wait(self, cursor: int) -> None:
+        """Wait until there are more than ``cursor`` events or the stream closes.
+
+        Bound the wait with ``asyncio.timeout``; a cancelled wait leaves no
+        waiter behind.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if len(self._events) > cursor or self.closed:
+                return
+            self._waiters.append(waiter)
+        try:
+            await waiter[1].wait()
+        finally:
+            with self._lock:
+                self._waiters.remove(waiter)
+
+
+_streams: dict[str, EventStream] = {}
+_streams_lock = threading.Lock()
+
+
+def create_stream() -> EventStream:
+    """Register a new stream, forgetting streams closed too long ago."""
+    stream = EventStream(str(uuid.uuid4()))
+    cutoff = time.time() - EVENT_RETENTION_SECONDS
+    with _streams_lock:
+        expired = [
+            stream_id for stream_id, old in _streams.items()
+            if old.closed_at is not None and old.closed_at < cutoff
+        ]
+        for stream_id in expired:
+            del _streams[stream_id]
+        _streams[stream.stream_id] = stream
+    return stream
+
+
+def get_stream(stream_id: str | None) -> EventStream | None:
+    """Return the stream with ``stream_id``, or None."""
+    if stream_id is None:
+        return None
+    with _streams_lock:
+        return _streams.get(stream_id)
+
+
+def publish(stream_id: str | None, event: dict[str, Any]) -> None:
+    """Publish to the stream with ``stream_id``; a no-op without a stream."""
+    stream = get_stream(stream_id)
+    if stream is not None:
+        stream.publish(event)
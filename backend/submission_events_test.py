@@ -0,0 +1,87 @@
+"""Tests for per-submission event streams and their Server-Sent Events relay."""
+
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+from main import app, relay_events
+from submission_events import create_stream, get_stream, publish
+
+
+def parse(body: str) -> list[tuple[int, str, dict]]:
+    """Return the ID, type and data of each Server-Sent Event in ``body``."""
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if ": " in line
+        )
+        if "id" in fields:
+            events.append(
+                (int(fields["id"]), fields["event"], json.loads(fields["data"])),
+            )
+    return events
+
+
+def test_events_replay_from_any_position() -> None:
+    """Readers see every event in publish order, from where they start."""
+    stream = create_stream()
+    assert get_stream(stream.stream_id) is stream
+    for index in range(3):
+        publish(stream.stream_id, {"type": "case", "index": index})
+    assert [event["index"] for event in stream.since(0)] == [0, 1, 2]
+    assert [event["index"] for event in stream.since(2)] == [2]
+    stream.close()
+    publish(stream.stream_id, {"type": "case", "index": 3})
+    assert len(stream.since(0)) == 3
+    publish(None, {"type": "case"})
+
+
+def test_relay_follows_events_from_another_thread() -> None:
+    """Events published by a worker thread are relayed in order as they come."""
+    stream = create_stream()
+
+    def run() -> None:
+        stream.publish({"type": "status", "status": "running"})
+        for index in range(20):
+            stream.publish({"type": "case", "index": index})
+        stream.publish({"type": "done"})
+        stream.close()
+
+    async def follow() -> list[str]:
+        relayed = []
+        worker = threading.Thread(target=run)
+        async with asyncio.timeout(5):
+            async for message in relay_events(stream, 0):
+                if not relayed:
+                    worker.start()
+                relayed.append(message)
+        worker.join()
+        return relayed
+
+    events = parse("".join(asyncio.run(follow())))
+    assert [event_id for event_id, _, _ in events] == list(range(1, 23))
+    assert events[0][1] == "status"
+    assert [data["index"] for _, kind, data in events if kind == "case"] == list(
+        range(20),
+    )
+    assert events[-1][1] == "done"
+
+
+def test_endpoint_resumes_after_last_event_id() -> None:
+    """A reconnecting client gets only the events after the last one it saw."""
+    stream = create_stream()
+    for index in range(4):
+        stream.publish({"type": "case", "index": index})
+    stream.close()
+    client = TestClient(app)
+    url = f"/submissions/{stream.stream_id}/events"
+    response = client.get(url)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [event_id for event_id, _, _ in parse(response.text)] == [1, 2, 3, 4]
+    resumed = parse(client.get(url, headers={"Last-Event-ID": "2"}).text)
+    assert [(event_id, data["index"]) for event_id, _, data in resumed] == [
+        (3, 2),
+        (4, 3),
+    ]
+    assert client.get("/submissions/unknown/events").status_code == 404
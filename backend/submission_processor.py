@@ -1,66 +1,87 @@
-"""Module for processing code submissions with Docker."""
+"""Module for processing code submissions with Docker, in any language.
+
+Every language goes through the same stages: workspace setup, config
+load, case preparation, manifest rendering, the run on an executor and
+result processing. What differs per language lives in its plugin in
+``languages``.
+"""
 
 import json
-import shutil
+import os
 import subprocess
-import textwrap
 import uuid
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
-import yaml
+import mlflow
+from admission import case_workers
+from case_history import case_history
+from catalog import catalog
+from container_pool import PoolError, PoolJobError, get_pool
+from executors import EXECUTOR_BACKEND, get_executor
+from languages import LANGUAGES, Language
 from prefect import flow, task
+from submission_events import publish
+from workspace import create_workspace, release_workspace
+
+# Python only: "fork" runs cases in children of a fork server, "pytest" runs
+# the pytest harness
+RUNNER_MODE = os.environ.get("CODE_GYM_RUNNER_MODE", "fork")
+# "bind" mounts the workspace into the tester, "archive" streams it in from memory;
+# remote executors always receive the files from memory
+TRANSFER_MODE = os.environ.get("CODE_GYM_TRANSFER_MODE", "bind")
+
+
+class RunOptions:
+    """How one submission runs, as given to ``process_submission_flow``."""
+
+    def __init__(
+        self,
+        *,  # Force keyword arguments after this point
+        hidden: bool,
+        fail_fast: bool,
+        event_stream: str | None,
+        executor: str | None,
+        submission_id: str | None,
+    ) -> None:
+        """Hold the flow's run parameters."""
+        self.hidden = hidden
+        self.fail_fast = fail_fast
+        self.event_stream = event_stream
+        self.executor = executor
+        self.submission_id = submission_id
 
 
 @task(name="setup_directories")
 def setup_directories(submission_id: str) -> tuple[Path, Path, Path]:
-    """Set up directories for submission processing."""
-    current_dir = Path.cwd()
-    submissions_dir = current_dir / "submissions"
-
-    # Empty the submissions folder if it exists
-    if submissions_dir.exists():
-        for item in submissions_dir.iterdir():
-            if item.is_dir():
-                shutil.rmtree(item)
-            else:
-                item.unlink()
-    else:
-        submissions_dir.mkdir(exist_ok=True)
-
-    base_dir = submissions_dir / f"submission_{submission_id}"
+    """Set up a private workspace for submission processing."""
+    base_dir = create_workspace(submission_id)
     code_dir = base_dir / "code"
     tests_dir = base_dir / "tests"
     results_dir = base_dir / "results"
 
     code_dir.mkdir(parents=True, exist_ok=True)
     tests_dir.mkdir(parents=True, exist_ok=True)
-    (tests_dir / "expected_outputs").mkdir(parents=True, exist_ok=True)
     results_dir.mkdir(parents=True, exist_ok=True)
 
     return code_dir, tests_dir, results_dir
 
 
 @task(name="write_user_code")
-def write_user_code(code_dir: Path, user_code: str) -> None:
+def write_user_code(code_dir: Path, user_code: str, solution_file: str) -> None:
     """Write user code to a file."""
-    code_file = code_dir / "solution.py"
+    code_file = code_dir / solution_file
     with code_file.open("w", encoding="utf-8") as f:
         f.write(user_code)
 
 
 @task(name="load_problem_config")
 def load_problem_config(problem_id: str) -> tuple[dict[str, Any], str]:
-    """Load problem configuration from YAML file."""
-    config_path = Path(__file__).parent / "config.yaml"
-    with config_path.open(encoding="utf-8") as f:
-        config = yaml.safe_load(f)
-
-    for course in config.get("courses", []):
-        for topic in course.get("topics", []):
-            for question in topic.get("questions", []):
-                if question.get("id") == problem_id:
-                    return question, question.get("title", "")
+    """Look up the problem's configuration in the course catalog."""
+    question = catalog.question(problem_id)
+    if question is not None:
+        return question, question.get("title", "")
 
     error_msg = f"Problem with ID {problem_id} not found in config"
     raise ValueError(error_msg)
@@ -97,95 +118,187 @@ def prepare_test_cases(
     return all_test_cases
 
 
-@task(name="generate_test_files")
-def generate_test_files(
-    tests_dir: Path,
+@task(name="order_test_cases")
+def order_test_cases(
+    problem_id: str,
+    all_test_cases: list[dict[str, Any]],
+) -> list[int]:
+    """Pick the order a fail-fast run executes the cases in.
+
+    Cases that failed most often for this problem run first, then the
+    cheapest ones. Results are still reported in the original case order.
+    """
+    return case_history.run_order(problem_id, all_test_cases)
+
+
+@task(name="render_test_files")
+def render_test_files(
     all_test_cases: list[dict[str, Any]],
     time_limit_seconds: int,
-) -> None:
-    """Generate test files for each test case."""
-    for test_case in all_test_cases:
-        test_id = test_case["id"]
-        test_content = textwrap.dedent(f"""
-        import sys
-        import io
-        import runpy
-        import pytest
-        import json
-        import signal
-        sys.path.append('/code')
-
-        class TimeoutException(Exception):
-            pass
-
-        def timeout_handler(signum, frame):
-            raise TimeoutException("Test case exceeded time limit")
-
-        signal.signal(signal.SIGALRM, timeout_handler)
-
-        def test_{test_id}():
-            signal.alarm({time_limit_seconds})
-            captured_output = io.StringIO()
-            sys.stdout = captured_output
-            sys.stdin = io.StringIO('''{test_case["input"]}''')
-            try:
-                import solution
-                if hasattr(solution, 'main'):
-                    solution.main()
-                else:
-                    runpy.run_module('solution', run_name='__main__')
-            except TimeoutException:
-                signal.alarm(0)
-                pytest.fail("Time Limit Exceeded")
-            except Exception as e:
-                signal.alarm(0)
-                pytest.fail(type(e).__name__)
-            else:
-                signal.alarm(0)
-            finally:
-                sys.stdout = sys.__stdout__
-            output = captured_output.getvalue().strip()
-            expected = '''{test_case["expected_output"]}'''.strip()
-            if output != expected:
-                error_info = {{
-                    "error_type": "AssertionError",
-                    "expected": expected,
-                    "actual": output
-                }}
-                pytest.fail(json.dumps(error_info))
-        """)
-
-        test_file = tests_dir / f"test_{test_id}.py"
-        with test_file.open("w", encoding="utf-8") as f:
-            f.write(test_content)
-
-        output_file = tests_dir / "expected_outputs" / f"output_{test_id}.txt"
-        with output_file.open("w", encoding="utf-8") as f:
-            f.write(test_case["expected_output"])
+    *,  # Force keyword arguments after this point
+    memory_limit_mb: float | None = None,
+    run_order: list[int] | None = None,
+    workers: int = 1,
+) -> dict[str, str]:
+    """Serialize the test cases into the manifest read by the tester.
+
+    Returns file contents keyed by path relative to the tests directory.
+    ``manifest.jsonl`` holds a header line with the run settings followed by
+    one JSON line per case, read by the tester image of every language; the
+    Python one picks the fixed harness or the fork server by ``RUNNER_MODE``.
+    JSON escaping keeps any input or expected output intact.
+
+    Passing ``run_order`` (case indices) turns on fail-fast: the tester runs
+    the cases in that order and skips the rest after the first failure.
+    ``workers`` is how many cases the tester may run at once.
+    """
+    header = {
+        "mode": RUNNER_MODE,
+        "workers": workers,
+        "time_limit_seconds": time_limit_seconds,
+        "memory_limit_mb": memory_limit_mb,
+    }
+    if run_order is not None:
+        header["fail_fast"] = True
+        header["run_order"] = run_order
+    lines = [json.dumps(header)]
+    lines.extend(
+        json.dumps({
+            "id": test_case["id"],
+            "is_hidden": test_case["is_hidden"],
+            "input": test_case["input"],
+            "expected_output": test_case["expected_output"],
+        })
+        for test_case in all_test_cases
+    )
+    return {"manifest.jsonl": "\n".join(lines) + "\n"}
+
+
+@task(name="generate_test_files")
+def generate_test_files(tests_dir: Path, test_files: dict[str, str]) -> None:
+    """Write the rendered test files into the tests directory."""
+    for name, content in test_files.items():
+        with (tests_dir / name).open("w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def event_publisher(
+    event_stream: str | None,
+) -> Callable[[dict[str, Any]], None] | None:
+    """Return a callback publishing tester events to a stream, if there is one."""
+    if event_stream is None:
+        return None
+    return lambda event: publish(event_stream, event)
 
 
 @task(name="run_tests")
 def run_tests(
+    image: str,
     code_dir: Path,
     tests_dir: Path,
     results_dir: Path,
+    event_stream: str | None = None,
 ) -> subprocess.CompletedProcess:
-    """Run tests in Docker container.
+    """Run tests in a container of the tester ``image``.
+
+    The submission is copied into a warm container from the pool when
+    pooling is enabled; otherwise, or if the pool cannot take the job, a
+    one-off container mounting only its own directories is started for it.
+    A job that fails once a warm container has it is not run again, unless
+    the container stopped answering in time. Either way, case events are
+    published to ``event_stream`` while the tests run, when one is given.
 
     Security note: The command is constructed from:
     - Hardcoded strings ("docker", "run", etc.)
     - Resolved absolute paths from the submission process
-    - A constant container name ("code-gym-tester")
+    - A constant image name from the language plugins
     All components are trusted and not user-provided.
     """
+    submission_dir = code_dir.parent
+    on_event = event_publisher(event_stream)
+    try:
+        pool = get_pool(image)
+        if pool is not None:
+            passed = pool.run_job(submission_dir, on_event)
+            return subprocess.CompletedProcess(
+                args=[image, submission_dir.name],
+                returncode=0 if passed else 1,
+                stdout="",
+                stderr="",
+            )
+    except PoolJobError as e:
+        # The job may have run already; do not run the submission twice
+        error_msg = f"Warm container failed the job: {e}"
+        raise RuntimeError(error_msg) from e
+    except (PoolError, OSError):
+        # Fall back to a one-off container below, also after a timeout:
+        # the pool replaces a container that stopped answering
+        pass
+
     cmd = [
         "docker", "run", "--rm",
         "-v", f"{code_dir.resolve()}:/code:ro",
         "-v", f"{tests_dir.resolve()}:/tests:ro",
         "-v", f"{results_dir.resolve()}:/results",
-        "code-gym-tester",
+        image,
     ]
-    return subprocess.run(cmd, capture_output=True, text=True, check=False)
+    if on_event is None:
+        return subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+    # The runner writes one JSON event per line on stdout with --events
+    cmd.append("--events")
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    ) as process:
+        stdout = []
+        for line in process.stdout:
+            stdout.append(line)
+            try:
+                on_event(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        stderr = process.stderr.read()
+    return subprocess.CompletedProcess(
+        args=cmd,
+        returncode=process.returncode,
+        stdout="".join(stdout),
+        stderr=stderr,
+    )
+
+
+@task(name="run_tests_in_memory")
+def run_tests_in_memory(
+    language: Language,
+    user_code: str,
+    test_files: dict[str, str],
+    results_dir: Path,
+    options: RunOptions,
+) -> None:
+    """Run tests without staging files on disk.
+
+    The code and tests are handed to the configured executor: the local one
+    copies them into a tester container as an in-memory tar, the remote one
+    queues them for a worker node. The report comes back the same way and
+    is saved as ``results.json`` for ``process_results``. Case events are
+    published to ``options.event_stream`` as the executor relays them.
+    ``options.executor`` names the backend to use instead of the
+    deployment's.
+    """
+    files = {f"code/{language.solution_file}": user_code}
+    files.update({f"tests/{name}": content for name, content in test_files.items()})
+
+    report = get_executor(options.executor).execute(
+        language.image,
+        results_dir.parent.name,
+        files,
+        event_publisher(options.event_stream),
+    )
+    if report is not None:
+        with (results_dir / "results.json").open("w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
 
 
 @task(name="process_results")
@@ -201,24 +314,6 @@ def process_results(
         with results_file.open(encoding="utf-8") as f:
             results = json.load(f)
 
-        for test_result in results.get("test_results", []):
-            if not test_result["passed"] and test_result.get("error"):
-                error_msg = test_result["error"]
-                lines = error_msg.splitlines()
-                t = 3
-                if len(lines) >= t:
-                    last_line = lines[-t]
-                    if "Failed: " in last_line:
-                        json_str = last_line.split("Failed: ", 1)[1].strip()
-                        try:
-                            error_data = json.loads(json_str)
-                            if error_data.get("error_type") == "AssertionError":
-                                test_result["expected"] = error_data["expected"]
-                                test_result["actual"] = error_data["actual"]
-                                test_result["error"] = "Wrong Answer"
-                        except json.JSONDecodeError:
-                            test_result["error"] = json_str
-
         results["problem_id"] = problem_id
         results["problem_title"] = problem_title
 
@@ -238,43 +333,192 @@ def process_results(
     return results
 
 
-@flow(name="process_code_submission")
-def process_code_submission_flow(
+@task(name="record_case_history")
+def record_case_history(
+    language: Language,
+    problem_id: str,
+    results: dict[str, Any],
+) -> None:
+    """Remember which cases this submission failed, ignoring skipped ones."""
+    case_history.record(problem_id, {
+        language.case_id(test_result): test_result["passed"]
+        for test_result in results.get("test_results", [])
+        if not test_result.get("skipped")
+    })
+
+
+@task(name="log_submission_metrics")
+def log_submission_metrics(
+    language: Language,
+    results: dict[str, Any],
     user_code: str,
     problem_id: str,
-    *,  # Force keyword arguments after this point
-    hidden: bool = True,
+) -> None:
+    """Log metrics and artifacts for a submission."""
+    mlflow.log_param("problem_id", problem_id)
+    mlflow.log_param("total_tests", results["total"])
+
+    # Log metrics
+    mlflow.log_metric("tests_passed", results["passed"])
+    mlflow.log_metric("tests_failed", results["failed"])
+    success_rate = (
+        results["passed"] / results["total"] if results["total"] > 0 else 0
+    )
+    mlflow.log_metric("success_rate", success_rate)
+
+    # Log artifacts
+    mlflow.log_text(user_code, f"submitted_{language.solution_file}")
+    if "error" in results:
+        mlflow.log_text(results["error"], "error.txt")
+
+    # Log test results
+    if "test_results" in results:
+        test_results_str = json.dumps(results["test_results"], indent=2)
+        mlflow.log_text(test_results_str, "test_results.json")
+
+
+def log_cached_submission(
+    language: str,
+    results: dict[str, Any],
+    user_code: str,
+    problem_id: str,
+) -> None:
+    """Log a run answered from the result cache like one that executed.
+
+    Only languages with ``log_metrics`` set are logged; the MLflow run is
+    tagged ``result_cache=hit``.
+    """
+    plugin = LANGUAGES[language]
+    if not plugin.log_metrics:
+        return
+    with mlflow.start_run(run_name=f"{plugin.name}_submission_{problem_id}"):
+        mlflow.set_tag("result_cache", "hit")
+        log_submission_metrics.fn(plugin, results, user_code, problem_id)
+
+
+def run_stages(
+    language: Language,
+    user_code: str,
+    problem_id: str,
+    options: RunOptions,
 ) -> dict[str, Any]:
-    """Process code submission flow."""
+    """Run the submission through every stage and return its results."""
+    code_dir = None
     try:
-        submission_id = str(uuid.uuid4())
+        submission_id = options.submission_id or str(uuid.uuid4())
 
         # Setup directories
         code_dir, tests_dir, results_dir = setup_directories(submission_id)
 
-        # Write user code
-        write_user_code(code_dir, user_code)
-
         # Load problem configuration
         problem_config, problem_title = load_problem_config(problem_id)
 
         # Prepare test cases
-        all_test_cases = prepare_test_cases(problem_config, hidden=hidden)
+        all_test_cases = prepare_test_cases(problem_config, hidden=options.hidden)
 
-        # Generate test files
+        # Render test files
         time_limit_seconds = problem_config.get("time_limit_seconds", 5)
-        generate_test_files(tests_dir, all_test_cases, time_limit_seconds)
-
-        # Run tests
-        run_tests(code_dir, tests_dir, results_dir)
+        run_order = (
+            order_test_cases(problem_id, all_test_cases)
+            if options.fail_fast
+            else None
+        )
+        test_files = render_test_files(
+            all_test_cases,
+            time_limit_seconds,
+            memory_limit_mb=problem_config.get("memory_limit_mb"),
+            run_order=run_order,
+            workers=case_workers(language.name),
+        )
+
+        backend = options.executor or EXECUTOR_BACKEND
+        if TRANSFER_MODE == "archive" or backend != "local":
+            # Run tests with code and tests streamed from memory
+            run_tests_in_memory(
+                language,
+                user_code,
+                test_files,
+                results_dir,
+                options,
+            )
+        else:
+            # Write user code and test files
+            write_user_code(code_dir, user_code, language.solution_file)
+            generate_test_files(tests_dir, test_files)
+
+            # Run tests
+            run_tests(
+                language.image,
+                code_dir,
+                tests_dir,
+                results_dir,
+                options.event_stream,
+            )
 
         # Process results
-        return process_results(results_dir, all_test_cases, problem_id, problem_title)
+        results = process_results(
+            results_dir,
+            all_test_cases,
+            problem_id,
+            problem_title,
+        )
+        results["submission_id"] = submission_id
+        record_case_history(language, problem_id, results)
+        return results
+
+    finally:
+        if code_dir is not None:
+            release_workspace(code_dir.parent)
+
+
+@flow(name="process_submission")
+def process_submission_flow(  # noqa: PLR0913 - Prefect records each parameter
+    user_code: str,
+    problem_id: str,
+    *,  # Force keyword arguments after this point
+    language: str = "python",
+    hidden: bool = True,
+    fail_fast: bool = False,
+    event_stream: str | None = None,
+    executor: str | None = None,
+    submission_id: str | None = None,
+) -> dict[str, Any]:
+    """Process a code submission in any of the ``LANGUAGES``.
+
+    With ``fail_fast`` the run stops at the first failing case and the
+    remaining cases are reported as skipped. Per-case events are published
+    to the ``event_stream`` with that ID as the cases run. ``executor``
+    overrides the deployment's execution backend for this run. Languages
+    with ``log_metrics`` set log each run to MLflow.
+
+    The run's workspace, and the ``submission_id`` in its results, use the
+    given ID or a fresh one.
+    """
+    plugin = LANGUAGES[language]
+    options = RunOptions(
+        hidden=hidden,
+        fail_fast=fail_fast,
+        event_stream=event_stream,
+        executor=executor,
+        submission_id=submission_id,
+    )
+    try:
+        if not plugin.log_metrics:
+            return run_stages(plugin, user_code, problem_id, options)
+        with mlflow.start_run(run_name=f"{plugin.name}_submission_{problem_id}"):
+            results = run_stages(plugin, user_code, problem_id, options)
+            log_submission_metrics(plugin, results, user_code, problem_id)
+            return results
 
     except (ValueError, RuntimeError) as e:
-        return {
+        error_result = {
             "error": f"Error processing submission: {e!s}",
             "passed": 0,
             "failed": 0,
             "total": 0,
         }
+        if plugin.log_metrics:
+            run_name = f"{plugin.name}_submission_error_{problem_id}"
+            with mlflow.start_run(run_name=run_name):
+                log_submission_metrics(plugin, error_result, user_code, problem_id)
+        return error_result
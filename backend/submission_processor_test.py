@@ -0,0 +1,69 @@
+"""Tests for how a submission's tests are handed to a tester container."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+import submission_processor
+from container_pool import PoolJobError, PoolTimeoutError
+
+
+class FailingPool:
+    """A pool whose every job fails with ``error``."""
+
+    def __init__(self, error: Exception) -> None:
+        """Fail jobs with ``error``."""
+        self.error = error
+
+    def run_job(self, *_args: object) -> bool:
+        """Fail the job."""
+        raise self.error
+
+
+@pytest.fixture
+def docker_runs(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    """Record one-off container runs instead of starting them."""
+    commands = []
+
+    def run(cmd: list[str], **_kwargs: object) -> subprocess.CompletedProcess:
+        commands.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(submission_processor.subprocess, "run", run)
+    return commands
+
+
+def run_tests(tmp_path: Path) -> subprocess.CompletedProcess:
+    """Run the task body for a workspace under ``tmp_path``."""
+    return submission_processor.run_tests.fn(
+        "code-gym-tester",
+        tmp_path / "code",
+        tmp_path / "tests",
+        tmp_path / "results",
+    )
+
+
+def test_pool_timeout_falls_back_to_docker_run(
+    tmp_path: Path,
+    docker_runs: list[list[str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A warm container that stops answering is retried in a one-off one."""
+    pool = FailingPool(PoolTimeoutError("timed out"))
+    monkeypatch.setattr(submission_processor, "get_pool", lambda _image: pool)
+    assert run_tests(tmp_path).returncode == 0
+    assert len(docker_runs) == 1
+    assert docker_runs[0][:3] == ["docker", "run", "--rm"]
+
+
+def test_failed_pool_job_is_not_run_again(
+    tmp_path: Path,
+    docker_runs: list[list[str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A job that failed on a warm container fails the run."""
+    pool = FailingPool(PoolJobError("bad reply"))
+    monkeypatch.setattr(submission_processor, "get_pool", lambda _image: pool)
+    with pytest.raises(RuntimeError, match="bad reply"):
+        run_tests(tmp_path)
+    assert docker_runs == []
@@ -0,0 +1,55 @@
+"""Execution worker that runs jobs from the shared execution queue.
+
+Start one per machine that should grade submissions, next to a Docker
+daemon with the tester images built; point it and the API nodes (run with
+``CODE_GYM_EXECUTOR=remote``) at the same ``CODE_GYM_EXECUTION_QUEUE_PATH``::
+
+    python worker.py
+"""
+
+import argparse
+import os
+import socket
+import time
+
+from execution_queue import ExecutionQueue
+from executors import Executor, LocalDockerExecutor
+
+WORKER_POLL_SECONDS = float(os.environ.get("CODE_GYM_WORKER_POLL_SECONDS", "0.2"))
+
+
+def run_next_job(queue: ExecutionQueue, executor: Executor, worker: str) -> bool:
+    """Claim and run one job; return False if the queue was empty."""
+    job = queue.claim(worker)
+    if job is None:
+        return False
+    try:
+        report = executor.execute(
+            job["image"],
+            job["job_name"],
+            job["files"],
+            on_event=lambda event: queue.add_event(job["id"], event),
+        )
+    except Exception as e:  # noqa: BLE001 - the failure is the job's report
+        queue.fail(job["id"], f"{type(e).__name__}: {e!s}")
+    else:
+        queue.complete(job["id"], report)
+    return True
+
+
+def work_forever(queue: ExecutionQueue, executor: Executor, worker: str) -> None:
+    """Run jobs as they arrive, polling the queue while it is empty."""
+    while True:
+        if not run_next_job(queue, executor, worker):
+            time.sleep(WORKER_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--name",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="worker name recorded on claimed jobs",
+    )
+    args = parser.parse_args()
+    work_forever(ExecutionQueue(), LocalDockerExecutor(), args.name)
@@ -0,0 +1,181 @@
+"""Per-submission workspaces with background garbage collection.
+
+A workspace in use holds an exclusive ``flock`` on its ``.lock`` file, so
+the reaper of any API process leaves it alone. The kernel drops the lock
+when its owner exits, so a crashed run's workspace is still evicted.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+
+def _default_root() -> Path:
+    """Prefer tmpfs for workspaces, falling back to ./submissions."""
+    shm = Path("/dev/shm")  # noqa: S108 - a directory of our own on tmpfs
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm / "code-gym-submissions"
+    return Path.cwd() / "submissions"
+
+
+WORKSPACE_ROOT = Path(
+    os.environ.get("CODE_GYM_WORKSPACE_ROOT", str(_default_root())),
+).resolve()
+WORKSPACE_MAX_AGE_SECONDS = float(
+    os.environ.get("CODE_GYM_WORKSPACE_MAX_AGE_SECONDS", "900"),
+)
+WORKSPACE_MAX_COUNT = int(os.environ.get("CODE_GYM_WORKSPACE_MAX_COUNT", "200"))
+WORKSPACE_GC_INTERVAL_SECONDS = float(
+    os.environ.get("CODE_GYM_WORKSPACE_GC_INTERVAL_SECONDS", "60"),
+)
+LOCK_FILE = ".lock"
+
+# Lock file descriptors of the workspaces in use by this process
+_active: dict[Path, int] = {}
+_lock = threading.Lock()
+_reaper: threading.Thread | None = None
+
+
+def create_workspace(submission_id: str) -> Path:
+    """Create an empty workspace owned by one submission.
+
+    Workspaces are never shared, so concurrent submissions cannot touch each
+    other's files. They stay on disk after the run (the error explanation
+    endpoint reads a run's results by its submission ID) until the reaper
+    evicts them.
+    """
+    base_dir = WORKSPACE_ROOT / f"submission_{submission_id}"
+    base_dir.mkdir(parents=True)
+    lock_fd = os.open(base_dir / LOCK_FILE, os.O_CREAT | os.O_RDWR, 0o600)
+    fcntl.flock(lock_fd, fcntl.LOCK_EX)
+    with _lock:
+        _active[base_dir] = lock_fd
+    _start_reaper()
+    return base_dir
+
+
+def release_workspace(base_dir: Path) -> None:
+    """Mark a workspace as finished so the reaper may evict it."""
+    with _lock:
+        lock_fd = _active.pop(base_dir, None)
+    if lock_fd is not None:
+        # Closing the descriptor releases the lock
+        os.close(lock_fd)
+
+
+def _in_use(path: Path, *, expired: bool) -> bool:
+    """Whether a process holds the lock of the workspace at ``path``.
+
+    A workspace without a lock file counts as in use until it expires: it
+    is either being created or was created before workspaces had locks.
+    """
+    try:
+        lock_fd = os.open(path / LOCK_FILE, os.O_RDONLY)
+    except FileNotFoundError:
+        return not expired and path.exists()
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(lock_fd)
+    return False
+
+
+def save_results(results: dict[str, Any], submission_id: str) -> Path:
+    """Store a report produced without a run in a workspace of its own.
+
+    Reports answered from the API process (syntax errors, cache hits) are
+    saved like a normal run so the error explanation endpoint can find them.
+    """
+    base_dir = create_workspace(submission_id)
+    try:
+        results_dir = base_dir / "results"
+        results_dir.mkdir()
+        with (results_dir / "results.json").open("w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    finally:
+        release_workspace(base_dir)
+    return base_dir
+
+
+def load_results(submission_id: str) -> dict[str, Any] | None:
+    """Return the report saved for ``submission_id``, or None.
+
+    Only canonical UUIDs are accepted, so an ID cannot name a path outside
+    the workspace root.
+    """
+    try:
+        if str(uuid.UUID(submission_id)) != submission_id:
+            return None
+    except ValueError:
+        return None
+    base_dir = WORKSPACE_ROOT / f"submission_{submission_id}"
+    results_file = base_dir / "results" / "results.json"
+    try:
+        with results_file.open(encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def list_workspaces() -> list[Path]:
+    """Return all workspaces, oldest first."""
+    if not WORKSPACE_ROOT.exists():
+        return []
+    workspaces = []
+    for path in WORKSPACE_ROOT.iterdir():
+        if path.is_dir() and path.name.startswith("submission_"):
+            try:
+                workspaces.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+    return [path for _, path in sorted(workspaces)]
+
+
+def collect_garbage() -> int:
+    """Evict workspaces older than the max age or beyond the max count.
+
+    Workspaces still in use by any process are kept. Returns the number of
+    workspaces removed.
+    """
+    workspaces = list_workspaces()
+    cutoff = time.time() - WORKSPACE_MAX_AGE_SECONDS
+    excess = len(workspaces) - WORKSPACE_MAX_COUNT
+    removed = 0
+    for path in workspaces:
+        try:
+            expired = path.stat().st_mtime < cutoff
+        except FileNotFoundError:
+            continue
+        if _in_use(path, expired=expired):
+            continue
+        if expired or removed < excess:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def _reap_forever() -> None:
+    while True:
+        time.sleep(WORKSPACE_GC_INTERVAL_SECONDS)
+        collect_garbage()
+
+
+def _start_reaper() -> None:
+    """Start the background reaper thread once per process."""
+    global _reaper  # noqa: PLW0603
+    with _lock:
+        if _reaper is None:
+            _reaper = threading.Thread(
+                target=_reap_forever,
+                name="workspace-reaper",
+                daemon=True,
+            )
+            _reaper.start()
@@ -0,0 +1,142 @@
+"""Tests for per-submission workspaces and their garbage collection."""
+
+import os
+import subprocess
+import sys
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+import workspace
+from workspace import (
+    collect_garbage,
+    create_workspace,
+    list_workspaces,
+    load_results,
+    release_workspace,
+    save_results,
+)
+
+SUBMISSION_ID = "9b2f6c1e-3d4a-4b5c-8d7e-0f1a2b3c4d5e"
+
+# Holds a workspace from another process until its stdin closes
+HOLD_WORKSPACE = """
+import sys
+from workspace import create_workspace
+create_workspace(sys.argv[1])
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+
+@pytest.fixture(autouse=True)
+def root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Keep workspaces under a temporary root with no reaper thread."""
+    monkeypatch.setattr(workspace, "WORKSPACE_ROOT", tmp_path)
+    # Stands in for a running reaper, so none is started
+    monkeypatch.setattr(workspace, "_reaper", threading.Thread())
+    yield tmp_path
+    for base_dir in workspace.list_workspaces():
+        release_workspace(base_dir)
+
+
+def age(path: Path, seconds: float) -> None:
+    """Make ``path`` look ``seconds`` old."""
+    mtime = path.stat().st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_workspaces_are_private(root: Path) -> None:
+    """Each submission gets a new directory; an ID cannot be reused."""
+    base_dir = create_workspace("a")
+    assert base_dir == root / "submission_a"
+    assert create_workspace("b") != base_dir
+    with pytest.raises(FileExistsError):
+        create_workspace("a")
+
+
+def test_saved_results_load_by_id() -> None:
+    """Saved reports load by their canonical submission ID only."""
+    save_results({"passed": 1}, SUBMISSION_ID)
+    assert load_results(SUBMISSION_ID) == {"passed": 1}
+    assert load_results(SUBMISSION_ID.upper()) is None
+    assert load_results("../etc") is None
+
+
+def test_gc_keeps_workspaces_in_use(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Expired and excess workspaces are evicted once they are released."""
+    monkeypatch.setattr(workspace, "WORKSPACE_MAX_COUNT", 0)
+    running = create_workspace("running")
+    finished = create_workspace("finished")
+    release_workspace(finished)
+    assert collect_garbage() == 1
+    assert list_workspaces() == [running]
+    age(running, workspace.WORKSPACE_MAX_AGE_SECONDS + 1)
+    assert collect_garbage() == 0
+    release_workspace(running)
+    assert collect_garbage() == 1
+    assert list_workspaces() == []
+
+
+def test_gc_evicts_oldest_beyond_count(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Beyond the max count the oldest finished workspaces go first."""
+    monkeypatch.setattr(workspace, "WORKSPACE_MAX_COUNT", 2)
+    for index, name in enumerate("abc"):
+        release_workspace(create_workspace(name))
+        age(workspace.WORKSPACE_ROOT / f"submission_{name}", 30 - index)
+    assert collect_garbage() == 1
+    assert [path.name for path in list_workspaces()] == [
+        "submission_b",
+        "submission_c",
+    ]
+
+
+def test_gc_keeps_workspaces_of_other_processes(
+    root: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A workspace held by another process survives until that process exits."""
+    monkeypatch.setattr(workspace, "WORKSPACE_MAX_COUNT", 0)
+    env = {
+        **os.environ,
+        "CODE_GYM_WORKSPACE_ROOT": str(root),
+        "PYTHONPATH": str(Path(workspace.__file__).parent),
+    }
+    # Security note: runs this interpreter on a constant script
+    with subprocess.Popen(
+        [sys.executable, "-c", HOLD_WORKSPACE, "other"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=env,
+        text=True,
+    ) as holder:
+        assert holder.stdout.readline() == "ready\n"
+        assert collect_garbage() == 0
+        holder.stdin.close()
+    # The lock went away with the process, without a release
+    assert collect_garbage() == 1
+
+
+def test_workspace_being_created_is_kept(
+    root: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A directory whose lock file is not there yet is kept until it expires."""
+    monkeypatch.setattr(workspace, "WORKSPACE_MAX_COUNT", 0)
+    unlocked = root / "submission_new"
+    unlocked.mkdir()
+    assert collect_garbage() == 0
+    age(unlocked, workspace.WORKSPACE_MAX_AGE_SECONDS + 1)
+    assert collect_garbage() == 1
+
+
+def test_reaper_starts_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The first workspace starts one reaper thread for the process."""
+    runs = threading.Semaphore(0)
+    monkeypatch.setattr(workspace, "_reaper", None)
+    monkeypatch.setattr(workspace, "_reap_forever", runs.release)
+    workspace._start_reaper()  # noqa: SLF001
+    workspace._start_reaper()  # noqa: SLF001
+    assert runs.acquire(timeout=5)
+    assert not runs.acquire(timeout=0.2)
@@ -15,6 +15,8 @@ const scaffoldBtn = document.getElementById("scaffold-btn");
 const testBtn = document.getElementById("test-btn");
 const llmContent = document.getElementById("llm-content");
 const llmResponse = document.getElementById("llm-response");
+const prevQuestionLink = document.getElementById("prev-question");
+const nextQuestionLink = document.getElementById("next-question");
 const params = new URLSearchParams(window.location.search);
 const courseId = params.get("course_id");
 const topicId = params.get("topic_id");
@@ -26,6 +28,8 @@ const question_id = params.get("question_id");
 
 
 let codeMirror; // we'll initialize this later globally
+// Submission ID of the latest run, which the error explanation is about
+let lastSubmissionId = null;
 
 // let rendered = false;
 
@@ -53,13 +57,9 @@ async function initializeEditorPage() {
     });
 
     try {
-        const [res, res1, res2] = await Promise.all([
-            fetch(`http://localhost:8080/courses/${courseId}/topics/${topicId}/questions/${question_id}`),
-            fetch(`http://localhost:8080/courses/${courseId}/topics/${topicId}`),
-            fetch(`http://localhost:8080/courses/${courseId}/`)
-        ]);
-
-        const [problem, topic, course] = await Promise.all([res.json(), res1.json(), res2.json()]);
+        const res = await fetch(`http://localhost:8080/courses/${courseId}/topics/${topicId}/questions/${question_id}/editor`);
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const { question: problem, topic, course, previous_question_id, next_question_id } = await res.json();
 
         // Populate UI
         problemTitle.textContent = problem.title;
@@ -73,7 +73,7 @@ async function initializeEditorPage() {
 
         // Test Cases
         testCasesContainer.innerHTML = '<h3>Visible Test Cases</h3>';
-        problem.test_cases.visible_cases.forEach((testCase, index) => {
+        problem.visible_cases.forEach((testCase, index) => {
             const div = document.createElement('div');
             div.className = 'test-case';
             div.innerHTML = `
@@ -86,6 +86,13 @@ async function initializeEditorPage() {
             testCasesContainer.appendChild(div);
         });
 
+        // Links to the neighbouring questions of the topic
+        [[prevQuestionLink, previous_question_id], [nextQuestionLink, next_question_id]].forEach(([link, id]) => {
+            if (!link || !id) return;
+            link.href = `editor.html?course_id=${courseId}&topic_id=${topicId}&question_id=${id}`;
+            link.hidden = false;
+        });
+
     } catch (err) {
         console.error("Error loading problem:", err);
         problemTitle.textContent = "Error loading problem";
@@ -93,6 +100,45 @@ async function initializeEditorPage() {
     }
 }
 
+// Show an assistant answer while the model writes it; resolves to the full text
+async function streamLLM(feature, payload) {
+    const response = await fetch(`http://localhost:8080/llm/${feature}/stream`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(payload)
+    });
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let text = "";
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        // Server-Sent Events are separated by a blank line
+        let end;
+        while ((end = buffer.indexOf("\n\n")) !== -1) {
+            const block = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+            const data = block.split("\n").find(line => line.startsWith("data: "));
+            if (!data) continue;
+            const event = JSON.parse(data.slice(6));
+            if (event.type === "token") {
+                text += event.text;
+                llmContent.textContent = text;
+            } else if (event.type === "done") {
+                llmContent.textContent = event.text;
+                return event.text;
+            } else if (event.type === "error") {
+                throw new Error(event.error);
+            }
+        }
+    }
+    return text;
+}
+
 function setupHintFeature() {
     if (!hintBtn) return;
 
@@ -106,14 +152,7 @@ function setupHintFeature() {
         llmResponse.style.display = "block";
 
         try {
-            const response = await fetch("http://localhost:8080/llm/hint", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ title, description, code })
-            });
-
-            const data = await response.json();
-            llmContent.textContent = data.hints;
+            await streamLLM("hint", { title, description, code });
         } catch (error) {
             llmContent.textContent = "Failed to get hints. Please try again.";
             console.error("Error fetching hint:", error);
@@ -133,14 +172,12 @@ function setupErrorExplanationFeature() {
         llmResponse.style.display = "block";
 
         try {
-            const response = await fetch("http://localhost:8080/llm/explain-error", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ title, description, code })
+            await streamLLM("explain-error", {
+                title,
+                description,
+                code,
+                submission_id: lastSubmissionId,
             });
-
-            const data = await response.json();
-            llmContent.textContent = data.explanations;
         } catch (error) {
             llmContent.textContent = "Failed to analyze error. Please try again.";
             console.error("Error fetching error explanation:", error);
@@ -160,14 +197,7 @@ function setupTestCaseGenerationFeature() {
         llmResponse.style.display = "block";
 
         try {
-            const response = await fetch("http://localhost:8080/llm/test-cases", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ title, description, code })
-            });
-
-            const data = await response.json();
-            llmContent.textContent = data.test_cases;
+            await streamLLM("test-cases", { title, description, code });
         } catch (error) {
             llmContent.textContent = "Failed to generate test cases. Please try again.";
             console.error("Error generating test cases:", error);
@@ -187,14 +217,7 @@ function setupCodeReviewFeature() {
         llmResponse.style.display = "block";
 
         try {
-            const response = await fetch("http://localhost:8080/llm/code-review", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ title, description, code })
-            });
-
-            const data = await response.json();
-            llmContent.textContent = data.review;
+            await streamLLM("code-review", { title, description, code });
         } catch (error) {
             llmContent.textContent = "Failed to review code. Please try again.";
             console.error("Error fetching review:", error);
@@ -214,14 +237,7 @@ function setupQuestionScaffoldFeature() {
         llmResponse.style.display = "block";
 
         try {
-            const response = await fetch("http://localhost:8080/llm/question-scaffold", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ title, description, code })
-            });
-
-            const data = await response.json();
-            llmContent.textContent = data.scaffold_data;
+            await streamLLM("question-scaffold", { title, description, code });
         } catch (error) {
             llmContent.textContent = "Failed to scaffold question. Please try again.";
             console.error("Error fetching scaffold:", error);
@@ -259,6 +275,7 @@ async function runCode(){
             // console.log("hello")
             const data = await response.json();
             console.log(data);
+            lastSubmissionId = data.submission_id || null;
 
             let resultText = "";
             if (courseId.includes("python")) {
@@ -339,6 +356,7 @@ async function Submit() {
             });
 
             const data=await response.json();
+            lastSubmissionId = data.submission_id || null;
             // console.log("hello")
             console.log(data);
 
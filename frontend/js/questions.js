@@ -6,12 +6,15 @@ document.addEventListener("DOMContentLoaded", async () => {
     const container = document.getElementById("question-list");
     const titleEl = document.getElementById("topic-title");
     try {
-      const res = await fetch(`http://localhost:8080/courses/${courseId}/topics/${topicId}`);
-      const topic = await res.json();
+      const [res, questionsRes] = await Promise.all([
+        fetch(`http://localhost:8080/courses/${courseId}/topics/${topicId}?fields=topic_id,topic_title`),
+        fetch(`http://localhost:8080/courses/${courseId}/topics/${topicId}/questions?fields=id,title,complexity`)
+      ]);
+      const [topic, questions] = await Promise.all([res.json(), questionsRes.json()]);
       console.log(topic)
       titleEl.textContent = topic.topic_title;
   
-      topic.questions.forEach((q, index) => {
+      questions.forEach((q, index) => {
         const div = document.createElement("div");
         div.className = "question-bar";
         div.innerHTML = `
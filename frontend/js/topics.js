@@ -9,7 +9,7 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
   
     try {
-      const res = await fetch(`http://localhost:8080/courses/${courseId}/topics`);
+      const res = await fetch(`http://localhost:8080/courses/${courseId}/topics?fields=topic_id,topic_title`);
       const topics = await res.json();
       console.log("topics",topics)
       topics.forEach(topic => {